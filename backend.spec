@@ -21,6 +21,7 @@
 #   - pywebview / clr / clr_loader / tkinter 완전 제거 → 시스템 의존성 없음
 #   - 출력 이름 : backend  (→ dist/backend/backend.exe)
 
+import importlib.util
 from pathlib import Path
 
 # ---------------------------------------------------------------------------
@@ -71,10 +72,24 @@ hidden_imports = [
     "app.schemas",
     "app.parser",
     "app.analyzer",
+    "app.keyword_matcher",
+    "app.message_store",
     "app.logging_config",
     "app.chatlog_cache",
     "app.chatlog_fetcher",
+    "app.chatlog_sidecar",
+    "app.exporter",
+    "app.jobs",
+    "app.json_response",
+    "app.parsed_cache",
+    "app.progress_events",
+    "app.result_cache",
+    "app.token_index",
+    "app.trending",
 ]
+# parquet 내보내기는 선택 의존성: 빌드 환경에 pyarrow 가 있을 때만 포함한다 (exporter 가 지연 import)
+if importlib.util.find_spec("pyarrow") is not None:
+    hidden_imports += ["pyarrow", "pyarrow.parquet"]
 
 # ---------------------------------------------------------------------------
 # Analysis
@@ -92,7 +107,7 @@ a = Analysis(
     hooksconfig={},
     runtime_hooks=[],
     excludes=[
-        "matplotlib", "numpy", "scipy",
+        "matplotlib", "scipy",
         # GUI / WebView 관련 — Electron 전환으로 불필요
         "webview", "clr", "clr_loader",
         "tkinter", "tkinter.font", "tkinter.ttk",
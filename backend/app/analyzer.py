@@ -1,28 +1,94 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from datetime import datetime, timedelta
-from math import sqrt
+from collections import OrderedDict
+from functools import reduce
+from itertools import repeat, tee
+from math import gcd, sqrt
+from typing import Callable, Hashable, Iterable, Iterator, Literal, NamedTuple, TypeVar
 import re
+import threading
+import time
 
+from .keyword_matcher import AUTOMATON_MIN_KEYWORDS, KeywordMatcher, compile_keyword_patterns
+from .logging_config import get_logger
+from .message_store import OFFSET_MAX, ChatRecord, MessageStore, deep_nbytes, offset_to_datetime
 from .schemas import (
     AnalyzeOptions,
-    ChatMessage,
     HighlightRange,
+    KeywordSeriesColumnar,
+    KeywordSeriesFormat,
     KeywordSeriesPoint,
+    KeywordSeriesSparse,
     SummaryStats,
+    SweepCombination,
+    SweepHighlight,
+    TermBucketCount,
+    TermOccurrence,
+    TermSearchResult,
     TimeBucketPoint,
+    TrendingTerm,
+    trusted_constructor,
 )
+from .token_index import TokenIndex
+from .trending import TrendingTerms, TrendingTracker, merge_trending
 
-# playerMessageTime 기반으로 저장된 로그의 기준점 (VOD 시작 = epoch 0)
-_VOD_RELATIVE_BASE = datetime(1970, 1, 1, 0, 0, 0)
+try:
+    import numpy as np
+except ImportError:  # numpy 가 없으면 순수 Python 엔진만 사용
+    np = None
 
+AnalysisEngine = Literal["auto", "python", "numpy"]
+# keyword_series_format 에 따라 dense 목록 또는 압축 형태
+KeywordSeries = list[KeywordSeriesPoint] | KeywordSeriesColumnar | KeywordSeriesSparse
+# iter_analysis 가 내는 (섹션 이름, 값): summary → volume_series → highlights → keyword_series
+AnalysisSection = tuple[str, SummaryStats | list[TimeBucketPoint] | list[HighlightRange] | KeywordSeries]
 
-def _bucket_start(ts: datetime, bucket_size_seconds: int) -> datetime:
-    # .timestamp() 은 Windows에서 1970년 근처 datetime에 OSError 발생 → timedelta 사용
-    offset_sec = int((ts - _VOD_RELATIVE_BASE).total_seconds())
-    bucket_offset = offset_sec // bucket_size_seconds * bucket_size_seconds
-    return _VOD_RELATIVE_BASE + timedelta(seconds=bucket_offset)
+logger = get_logger(__name__)
+_T = TypeVar("_T")
+# 저장소별·단계별로 유지할 단계 캐시 항목 수 (버킷 크기/키워드 조합)
+_STAGE_CACHE_ENTRIES = 4
+_stage_cache_lock = threading.Lock()
+# 버킷 × 키워드 개수만큼 만드는 시계열 모델은 값의 타입이 보장되므로 검증 없이 만든다
+_time_bucket_point = trusted_constructor(TimeBucketPoint)
+_keyword_series_point = trusted_constructor(KeywordSeriesPoint)
+
+# playerMessageTime 기반으로 저장된 로그는 VOD 시작 = epoch 0 (1970-01-01).
+# MessageStore 의 오프셋은 모두 이 기준점으로부터의 초 단위 정수다.
+_SECONDS_IN_1970 = 365 * 86400
+
+
+def _is_vod_relative(offset_sec: int) -> bool:
+    """year == 1970 인 타임스탬프(playerMessageTime 기반 로그)인지 여부."""
+    return 0 <= offset_sec < _SECONDS_IN_1970
+
+
+def vod_offset(offset_sec: int, first_offset: int) -> int:
+    """로그 오프셋 → VOD 재생 위치(초). playerMessageTime 로그는 그대로, 레거시 벽시계 로그는
+    첫 채팅(first_offset) 기준 (시계열의 *_offset_sec 와 같은 규칙)."""
+    return max(offset_sec - (0 if _is_vod_relative(first_offset) else first_offset), 0)
+
+
+def message_window(messages: MessageStore, start_offset_sec: int, end_offset_sec: int | None) -> tuple[int, int]:
+    """VOD 재생 위치 [start_offset_sec, end_offset_sec) 에 든 메시지의 인덱스 범위.
+
+    vod_offset 의 역변환으로 로그 오프셋 구간을 구해 이진 탐색하므로 비용은 구간 크기와
+    무관하다 (end_offset_sec 가 None 이면 끝까지).
+    """
+    if not messages:
+        return 0, 0
+    first_offset = messages.offsets[0]
+    base_offset = 0 if _is_vod_relative(first_offset) else first_offset
+    end_offset = OFFSET_MAX + 1 if end_offset_sec is None else base_offset + end_offset_sec
+    return messages.index_range(base_offset + start_offset_sec, end_offset)
+
+
+def offset_label(seconds: int) -> str:
+    """재생 위치(초) → "HH:MM:SS" (시계열의 *_offset_label 과 같은 형식)."""
+    return _format_offset(seconds)
+
+
+def _bucket_start(offset_sec: int, bucket_size_seconds: int) -> int:
+    return offset_sec // bucket_size_seconds * bucket_size_seconds
 
 
 def _format_offset(seconds: int) -> str:
@@ -34,6 +100,7 @@ def _format_offset(seconds: int) -> str:
 
 
 def _count_keyword(content: str, keyword: str, mode: str) -> int:
+    # 키워드 하나의 기준 의미. 집계는 같은 의미의 KeywordMatcher 로 모든 키워드를 한 번에 센다.
     if not keyword:
         return 0
     if mode == "exact":
@@ -41,14 +108,65 @@ def _count_keyword(content: str, keyword: str, mode: str) -> int:
     return content.count(keyword)
 
 
+# 반복 반응 정규화를 한 번의 스캔으로 처리한다. 기존 6개 정규식을 순서대로 적용한 결과와 같다.
+# - ㅋ/ㅎ/ㅠ/ㅜ 3개 이상 반복 → 2개 (정확히 2개는 바뀌지 않으므로 매치하지 않는다)
+# - 허+어+억+ 과 허+억+ → 헉 (두 패턴의 합집합이 허+어*억+)
+_REPEATED_REACTION_PATTERN = re.compile(r"([ㅋㅎㅠㅜ])\1\1+|허+어*억+")
+
+
+def _replace_repeated_reaction(match: re.Match[str]) -> str:
+    jamo = match.group(1)
+    return jamo + jamo if jamo else "헉"
+
+
 def _normalize_repeated_reactions(text: str) -> str:
-    normalized = re.sub(r"ㅋ{2,}", "ㅋㅋ", text)
-    normalized = re.sub(r"ㅎ{2,}", "ㅎㅎ", normalized)
-    normalized = re.sub(r"ㅠ{2,}", "ㅠㅠ", normalized)
-    normalized = re.sub(r"ㅜ{2,}", "ㅜㅜ", normalized)
-    normalized = re.sub(r"허+어+억+", "헉", normalized)
-    normalized = re.sub(r"허+억+", "헉", normalized)
-    return normalized
+    return _REPEATED_REACTION_PATTERN.sub(_replace_repeated_reaction, text)
+
+
+def _normalize_content(content: str, options: AnalyzeOptions) -> str:
+    if not options.keyword_options.case_sensitive:
+        content = content.lower()
+    if options.normalize_repeated_reactions:
+        content = _normalize_repeated_reactions(content)
+    return content
+
+
+def normalized_contents(messages: MessageStore, options: AnalyzeOptions) -> list[str]:
+    """키워드 매칭용으로 정규화한 본문 목록. 결과는 (case_sensitive, normalize) 조합별로
+    저장소의 파생 열에 캐시되어, 같은 VOD 에 키워드만 바꾼 요청은 정규화를 다시 하지 않는다."""
+    case_sensitive = options.keyword_options.case_sensitive
+    normalize = options.normalize_repeated_reactions
+    if case_sensitive and not normalize:
+        return list(messages.iter_contents())
+
+    key = ("normalized_content", case_sensitive, normalize)
+    cached = messages.derived.get(key)
+    if cached is None:
+        started = time.perf_counter()
+        if "\n" in messages.content_text:
+            # 개행이 든 본문이 있으면 이어붙인 문자열로는 메시지 경계를 되찾을 수 없어 목록으로 둔다
+            cached = [_normalize_content(content, options) for content in messages.iter_contents()]
+        else:
+            # 본문은 로그 한 줄에서 나오므로 개행이 없다. 개행으로 이어붙여 한 번에 처리해도
+            # lower()/정규식 모두 개행을 넘지 않으므로 메시지별 처리와 결과가 같다.
+            cached = _normalize_content("\n".join(messages.iter_contents()), options)
+        messages.derived[key] = cached
+        logger.info(
+            "Normalized content column built: messages=%s case_sensitive=%s normalize=%s elapsed=%.3fs",
+            len(messages),
+            case_sensitive,
+            normalize,
+            time.perf_counter() - started,
+        )
+    return list(cached) if isinstance(cached, list) else cached.split("\n")
+
+
+def _keyword_contents(messages: MessageStore, options: AnalyzeOptions) -> list[str]:
+    """키워드를 셀 본문. regex 모드는 정규화 전 원문에 매치한다 (반응 정규화가 ㅋ{3,} 같은 반복
+    패턴의 대상을 지우므로. 대소문자 무시는 IGNORECASE), 그 외 모드는 정규화 본문."""
+    if options.keyword_options.mode == "regex":
+        return list(messages.iter_contents())
+    return normalized_contents(messages, options)
 
 
 def _dedupe_preserve_order(items: list[str]) -> list[str]:
@@ -62,109 +180,486 @@ def _dedupe_preserve_order(items: list[str]) -> list[str]:
     return deduped
 
 
-def build_analysis(
-    messages: list[ChatMessage], keywords: list[str], options: AnalyzeOptions
-) -> tuple[SummaryStats, list[TimeBucketPoint], list[KeywordSeriesPoint], list[HighlightRange]]:
-    if not messages:
-        return (
-            SummaryStats(
-                total_messages=0,
-                unique_users=0,
-                start_time=None,
-                end_time=None,
-                vod_duration_sec=0,
-                vod_duration_label="00:00:00",
-                avg_messages_per_minute=0.0,
-            ),
-            [],
-            [],
-            [],
-        )
-
+def _normalize_keywords(keywords: list[str], options: AnalyzeOptions) -> list[str]:
     normalized_keywords = [keyword.strip() for keyword in keywords if keyword.strip()]
+    if options.keyword_options.mode == "regex":
+        # 패턴은 바꾸지 않는다 (소문자화/반응 정규화가 \D 같은 이스케이프나 반복을 깨뜨리므로).
+        # 대소문자 무시는 IGNORECASE 로 처리하고, 여기서 미리 컴파일해 잘못된 패턴은 ValueError
+        normalized_keywords = _dedupe_preserve_order(normalized_keywords)
+        if normalized_keywords:
+            compile_keyword_patterns(tuple(normalized_keywords), options.keyword_options.case_sensitive)
+        return normalized_keywords
     if not options.keyword_options.case_sensitive:
         normalized_keywords = [keyword.lower() for keyword in normalized_keywords]
     if options.normalize_repeated_reactions:
         normalized_keywords = [_normalize_repeated_reactions(keyword) for keyword in normalized_keywords]
-    normalized_keywords = _dedupe_preserve_order(normalized_keywords)
+    return _dedupe_preserve_order(normalized_keywords)
 
-    by_bucket_total: dict[datetime, int] = defaultdict(int)
-    by_bucket_users: dict[datetime, set[str]] = defaultdict(set)
-    by_bucket_keyword: dict[tuple[datetime, str], int] = defaultdict(int)
 
-    for message in messages:
-        bucket = _bucket_start(message.timestamp, options.bucket_size_seconds)
-        by_bucket_total[bucket] += 1
-        by_bucket_users[bucket].add(message.user_id_hash)
+class _BucketAggregates(NamedTuple):
+    """버킷 집계 결과. 두 엔진(순수 Python / NumPy) 이 같은 형태로 만든다."""
 
-        content = message.content
-        if not options.keyword_options.case_sensitive:
-            content = content.lower()
-        if options.normalize_repeated_reactions:
-            content = _normalize_repeated_reactions(content)
+    normalized_keywords: list[str]
+    buckets: list[int]
+    totals: list[int]
+    unique_users: list[int]
+    # keyword_counts[bucket_index][keyword_index]
+    keyword_counts: list[list[int]]
+    total_messages: int
+    first_offset: int
+    last_offset: int
+    # 버킷별 떠오르는 단어 (options.trending_terms > 0 일 때만, 누산기 집계에서 함께 계산)
+    trending: list[TrendingTerms] | None = None
 
-        for keyword in normalized_keywords:
-            count = _count_keyword(content, keyword, options.keyword_options.mode)
-            if count > 0:
-                by_bucket_keyword[(bucket, keyword)] += count
 
-    buckets = sorted(by_bucket_total.keys())
-    # playerMessageTime 기반 로그(year=1970): epoch을 기준점으로 사용 → VOD 직접 offset
-    # 레거시 벽시계 로그: 첫 채팅을 기준점으로 사용 (기존 동작 유지)
-    if messages[0].timestamp.year == 1970:
-        base_time = _VOD_RELATIVE_BASE
+def _resolve_engine(engine: AnalysisEngine) -> str:
+    if engine == "auto":
+        return "numpy" if np is not None else "python"
+    if engine == "numpy" and np is None:
+        raise RuntimeError("numpy engine requested but numpy is not installed")
+    return engine
+
+
+class _BucketAccumulator:
+    """오프셋 순으로 들어오는 메시지를 버킷 단위로 집계한다.
+
+    입력이 정렬되어 있으므로 버킷이 바뀌는 순간 직전 버킷의 사용자 집합을 개수로
+    확정하고 버린다. 메모리는 버킷 수 (+ track_users 시 전체 고유 사용자 수) 에 비례한다.
+    options.trending_terms > 0 이면 같은 루프에서 TrendingTracker 에 본문을 넣고 버킷을 닫을 때
+    버킷별 떠오르는 단어를 확정한다 (추가 메모리는 스케치 크기 + 버킷 수 × trending_terms).
+    """
+
+    def __init__(self, normalized_keywords: list[str], options: AnalyzeOptions, track_users: bool) -> None:
+        self.normalized_keywords = normalized_keywords
+        self.options = options
+        self.matcher = KeywordMatcher(
+            normalized_keywords, options.keyword_options.mode, options.keyword_options.case_sensitive
+        )
+        self.buckets: list[int] = []
+        self.totals: list[int] = []
+        self.unique_users: list[int] = []
+        # keyword_counts[bucket_index][keyword_index]
+        self.keyword_counts: list[list[int]] = []
+        self.all_users: set | None = set() if track_users else None
+        self.trending = TrendingTracker(options.trending_terms) if options.trending_terms else None
+        self.trending_per_bucket: list[TrendingTerms] | None = [] if self.trending is not None else None
+        self.total_messages = 0
+        self.first_offset: int | None = None
+        self.last_offset: int | None = None
+
+    def consume(
+        self, records: Iterable[tuple[int, Hashable, str]], keyword_contents: Iterable[str] | None = None
+    ) -> None:
+        """(offset_sec, user, content) 레코드를 소비한다. user 는 인턴 코드 또는 해시 문자열,
+        content 는 `_normalize_content` 로 정규화된 본문이어야 한다. keyword_contents 를 주면
+        (regex 모드 + 떠오르는 단어) 키워드는 레코드와 같은 순서의 그 본문으로 센다."""
+        bucket_size_seconds = self.options.bucket_size_seconds
+        keywords = self.normalized_keywords
+        count_keywords = self.matcher.count
+        all_users = self.all_users
+        add_trending = self.trending.add if self.trending is not None else None
+        next_keyword_content = iter(keyword_contents).__next__ if keyword_contents is not None else None
+
+        current_bucket: int | None = None
+        total = 0
+        users: set = set()
+        counts: list[int] = []
+        offset_sec: int | None = None
+
+        for offset_sec, user, content in records:
+            bucket = _bucket_start(offset_sec, bucket_size_seconds)
+            if bucket != current_bucket:
+                if current_bucket is not None:
+                    self._close_bucket(current_bucket, total, users, counts)
+                else:
+                    self.first_offset = offset_sec
+                current_bucket = bucket
+                total = 0
+                users = set()
+                counts = [0] * len(keywords)
+
+            total += 1
+            users.add(user)
+            if all_users is not None:
+                all_users.add(user)
+            if add_trending is not None:
+                add_trending(content)
+            if next_keyword_content is not None:
+                content = next_keyword_content()
+
+            if not keywords:
+                continue
+            for index, count in count_keywords(content).items():
+                counts[index] += count
+
+        if current_bucket is not None:
+            self._close_bucket(current_bucket, total, users, counts)
+            self.last_offset = offset_sec
+
+    def _close_bucket(self, bucket: int, total: int, users: set, counts: list[int]) -> None:
+        self.buckets.append(bucket)
+        self.totals.append(total)
+        self.unique_users.append(len(users))
+        self.keyword_counts.append(counts)
+        self.total_messages += total
+        if self.trending is not None:
+            self.trending_per_bucket.append(self.trending.close_bucket(total))
+
+    def result(self) -> _BucketAggregates:
+        return _BucketAggregates(
+            normalized_keywords=self.normalized_keywords,
+            buckets=self.buckets,
+            totals=self.totals,
+            unique_users=self.unique_users,
+            keyword_counts=self.keyword_counts,
+            total_messages=self.total_messages,
+            first_offset=self.first_offset or 0,
+            last_offset=self.last_offset or 0,
+            trending=self.trending_per_bucket,
+        )
+
+
+def _empty_analysis(
+    normalized_keywords: list[str], keyword_series_format: KeywordSeriesFormat
+) -> tuple[SummaryStats, list[TimeBucketPoint], KeywordSeries, list[HighlightRange]]:
+    if keyword_series_format == "dense":
+        keyword_series: KeywordSeries = []
+    else:
+        keyword_series = _compact_keyword_series(normalized_keywords, [], keyword_series_format)
+    return (
+        SummaryStats(
+            total_messages=0,
+            unique_users=0,
+            start_time=None,
+            end_time=None,
+            vod_duration_sec=0,
+            vod_duration_label="00:00:00",
+            avg_messages_per_minute=0.0,
+        ),
+        [],
+        keyword_series,
+        [],
+    )
+
+
+def build_analysis(
+    messages: MessageStore,
+    keywords: list[str],
+    options: AnalyzeOptions,
+    engine: AnalysisEngine = "auto",
+    keyword_series_format: KeywordSeriesFormat = "dense",
+) -> tuple[SummaryStats, list[TimeBucketPoint], KeywordSeries, list[HighlightRange]]:
+    """MessageStore 를 분석한다.
+
+    engine="auto" 는 numpy 가 있으면 벡터화 엔진을, 없으면 순수 Python 기준 구현을 쓴다.
+    두 엔진의 결과는 동일하다.
+
+    집계 → 시계열 → 스코어링 단계의 수치 결과는 각 단계가 실제로 의존하는 옵션(버킷 크기,
+    키워드, 키워드 모드/정규화)을 키로 저장소에 캐시된다. min_highlight_score / max_highlights /
+    max_merge_buckets 만 바뀐 재분석은 후보 병합과 응답 모델 생성부터 다시 한다.
+
+    keyword_options.mode="regex" 의 잘못된 패턴은 메시지가 없어도 ValueError.
+
+    options.trending_terms > 0 이면 떠오르는 단어를 집계와 같은 패스에서 찾아야 하므로
+    engine 과 무관하게 누산기로 집계한다 (engine 은 스코어링에 적용).
+
+    keyword_series_format 이 columnar/sparse 면 세 번째 값은 KeywordSeriesPoint 목록 대신
+    압축 형태다 (버킷 × 키워드 개수만큼 객체를 만들지 않는다).
+    """
+    return _collect_sections(iter_analysis(messages, keywords, options, engine, keyword_series_format))
+
+
+def iter_analysis(
+    messages: MessageStore,
+    keywords: list[str],
+    options: AnalyzeOptions,
+    engine: AnalysisEngine = "auto",
+    keyword_series_format: KeywordSeriesFormat = "dense",
+) -> Iterator[AnalysisSection]:
+    """build_analysis 와 같은 결과를 준비되는 순서대로 (섹션 이름, 값) 으로 낸다.
+
+    summary / volume_series 는 집계 직후, 그다음 highlights, 가장 큰 keyword_series 는 마지막이다.
+    검증 오류(잘못된 정규식 등)는 첫 섹션을 꺼낼 때 올라온다.
+    """
+    normalized_keywords = _normalize_keywords(keywords, options)
+    if not messages:
+        yield from _empty_sections(normalized_keywords, keyword_series_format)
+        return
+
+    engine = _resolve_engine(engine)
+    stage_key = _stage_key(normalized_keywords, options)
+
+    def stage(name: str, compute: Callable[[], _T]) -> _T:
+        return _cached_stage(messages, name, stage_key, compute)
+
+    def aggregate() -> _BucketAggregates:
+        if engine == "numpy" and not options.trending_terms:
+            return _aggregate_store_numpy(messages, normalized_keywords, options)
+        accumulator = _BucketAccumulator(normalized_keywords, options, track_users=False)
+        keyword_contents = None
+        if options.trending_terms:
+            contents = normalized_contents(messages, options)
+            if normalized_keywords and options.keyword_options.mode == "regex":
+                keyword_contents = _keyword_contents(messages, options)
+        elif normalized_keywords:
+            contents = _keyword_contents(messages, options)
+        else:
+            contents = repeat("")
+        accumulator.consume(zip(messages.offsets, messages.user_codes, contents), keyword_contents)
+        return accumulator.result()
+
+    aggregates = stage("aggregates", aggregate)
+    yield from _iter_sections(aggregates, messages.user_count, options, engine, keyword_series_format, stage)
+
+
+def build_analysis_streaming(
+    records: Iterable[ChatRecord],
+    keywords: list[str],
+    options: AnalyzeOptions,
+    engine: AnalysisEngine = "auto",
+    keyword_series_format: KeywordSeriesFormat = "dense",
+) -> tuple[SummaryStats, list[TimeBucketPoint], KeywordSeries, list[HighlightRange]]:
+    """파서 레코드 스트림을 그대로 집계한다. records 는 오프셋 순이어야 한다
+    (`parser.iter_chat_records` 가 보장). 전체 메시지 목록을 만들지 않으므로 집계는 항상
+    누산기로 하고, engine 은 하이라이트 스코어링에만 적용된다. 단계 캐시는 쓰지 않는다."""
+    return _collect_sections(iter_analysis_streaming(records, keywords, options, engine, keyword_series_format))
+
+
+def iter_analysis_streaming(
+    records: Iterable[ChatRecord],
+    keywords: list[str],
+    options: AnalyzeOptions,
+    engine: AnalysisEngine = "auto",
+    keyword_series_format: KeywordSeriesFormat = "dense",
+) -> Iterator[AnalysisSection]:
+    """build_analysis_streaming 의 섹션 생성기 (순서는 iter_analysis 와 같다).
+    records 는 첫 섹션을 꺼낼 때 모두 소비된다."""
+    normalized_keywords = _normalize_keywords(keywords, options)
+    accumulator = _BucketAccumulator(normalized_keywords, options, track_users=True)
+    if options.trending_terms and normalized_keywords and options.keyword_options.mode == "regex":
+        # 떠오르는 단어는 정규화 본문, regex 키워드는 원문 (두 소비자가 나란히 읽어 tee 버퍼는 한 건)
+        records, raw_records = tee(records)
+        accumulator.consume(
+            (
+                (offset_sec, user_id_hash, _normalize_content(content, options))
+                for offset_sec, _, content, user_id_hash in records
+            ),
+            (content for _, _, content, _ in raw_records),
+        )
+    elif options.keyword_options.mode == "regex" and not options.trending_terms:
+        accumulator.consume((offset_sec, user_id_hash, content) for offset_sec, _, content, user_id_hash in records)
+    elif normalized_keywords or options.trending_terms:
+        accumulator.consume(
+            (offset_sec, user_id_hash, _normalize_content(content, options))
+            for offset_sec, _, content, user_id_hash in records
+        )
     else:
-        base_time = messages[0].timestamp
-    volume_series = [
-        TimeBucketPoint(
-            bucket_start=bucket,
-            bucket_start_offset_sec=max(int((bucket - base_time).total_seconds()), 0),
-            bucket_start_offset_label=_format_offset(max(int((bucket - base_time).total_seconds()), 0)),
-            total_messages=by_bucket_total[bucket],
-            unique_users=len(by_bucket_users[bucket]),
+        accumulator.consume((offset_sec, user_id_hash, "") for offset_sec, _, _, user_id_hash in records)
+    if not accumulator.total_messages:
+        yield from _empty_sections(normalized_keywords, keyword_series_format)
+        return
+
+    engine = _resolve_engine(engine)
+    yield from _iter_sections(
+        accumulator.result(), len(accumulator.all_users or ()), options, engine, keyword_series_format
+    )
+
+
+def _uncached_stage(name: str, compute: Callable[[], _T]) -> _T:
+    return compute()
+
+
+def _iter_sections(
+    aggregates: _BucketAggregates,
+    unique_users: int,
+    options: AnalyzeOptions,
+    engine: str,
+    keyword_series_format: KeywordSeriesFormat,
+    stage: Callable[[str, Callable[[], _T]], _T] = _uncached_stage,
+) -> Iterator[AnalysisSection]:
+    # 단계 캐시에는 수치 중간값만 두고, 버킷 × 키워드 개수만큼의 모델은 매번 만든다
+    # (완성된 응답은 분석 결과 캐시가 보관한다)
+    summary, bucket_offsets, labels = stage("series", lambda: _series_columns(aggregates, unique_users))
+    volume_series = _build_volume_series(aggregates, bucket_offsets, labels)
+    yield "summary", summary
+    yield "volume_series", volume_series
+    scores, representative_per_bucket = stage("scores", lambda: _score_aggregates(aggregates, engine))
+    yield "highlights", _detect_highlights(aggregates, scores, representative_per_bucket, options, engine)
+    yield "keyword_series", _build_keyword_series(aggregates, volume_series, keyword_series_format)
+
+
+def _empty_sections(
+    normalized_keywords: list[str], keyword_series_format: KeywordSeriesFormat
+) -> Iterator[AnalysisSection]:
+    summary, volume_series, keyword_series, highlights = _empty_analysis(normalized_keywords, keyword_series_format)
+    yield "summary", summary
+    yield "volume_series", volume_series
+    yield "highlights", highlights
+    yield "keyword_series", keyword_series
+
+
+def _collect_sections(
+    sections: Iterable[AnalysisSection],
+) -> tuple[SummaryStats, list[TimeBucketPoint], KeywordSeries, list[HighlightRange]]:
+    collected = dict(sections)
+    return collected["summary"], collected["volume_series"], collected["keyword_series"], collected["highlights"]
+
+
+def _stage_key(normalized_keywords: list[str], options: AnalyzeOptions) -> tuple:
+    # 집계/시계열/스코어링이 의존하는 옵션만 (하이라이트 임계값/개수/병합 폭은 제외)
+    return (
+        options.bucket_size_seconds,
+        tuple(normalized_keywords),
+        options.keyword_options.mode,
+        options.keyword_options.case_sensitive,
+        options.normalize_repeated_reactions,
+        options.trending_terms,
+    )
+
+
+def _cached_stage(messages: MessageStore, stage: str, key: tuple, compute: Callable[[], _T]) -> _T:
+    """저장소별·단계별 작은 LRU (`_STAGE_CACHE_ENTRIES` 개). 동시 요청이 같은 키를 계산하면
+    둘 다 계산하고 나중 결과가 남는다 (결과는 같다). 항목은 (값, 바이트 수) 로 두고 넣고 뺄 때마다
+    파싱 결과 LRU 에 과금한다."""
+    derived_key = ("analysis_stage", stage)
+    with _stage_cache_lock:
+        entries = messages.derived.get(derived_key)
+        if entries is None:
+            entries = messages.derived[derived_key] = OrderedDict()
+        cached = entries.get(key)
+        if cached is not None:
+            entries.move_to_end(key)
+    logger.info(
+        "Analysis stage cache %s: stage=%s bucket=%s keywords=%s mode=%s case_sensitive=%s normalize=%s "
+        "trending=%s",
+        "miss" if cached is None else "hit",
+        stage,
+        key[0],
+        len(key[1]),
+        *key[2:],
+    )
+    if cached is not None:
+        return cached[0]
+
+    value = compute()
+    nbytes = deep_nbytes(key) + deep_nbytes(value)
+    with _stage_cache_lock:
+        previous = entries.get(key)
+        entries[key] = (value, nbytes)
+        delta = nbytes - (0 if previous is None else previous[1])
+        while len(entries) > _STAGE_CACHE_ENTRIES:
+            delta -= entries.popitem(last=False)[1][1]
+    messages.derived.charge(derived_key, delta)
+    return value
+
+
+def _series_columns(
+    aggregates: _BucketAggregates, unique_users: int
+) -> tuple[SummaryStats, tuple[int, ...], tuple[str, ...]]:
+    """요약과 버킷별 (기준점부터의 오프셋, 라벨). 단계 캐시에 남으므로 모델 목록 대신 튜플로 둔다."""
+    first_offset = aggregates.first_offset
+    last_offset = aggregates.last_offset
+    base_offset = _base_offset(aggregates)
+    bucket_offsets = tuple(max(bucket - base_offset, 0) for bucket in aggregates.buckets)
+    labels = tuple(_format_offset(bucket_offset) for bucket_offset in bucket_offsets)
+
+    total_messages = aggregates.total_messages
+    duration_sec = last_offset - first_offset
+    duration_minutes = max(duration_sec / 60.0, 1 / 60)
+
+    summary = SummaryStats(
+        total_messages=total_messages,
+        unique_users=unique_users,
+        start_time=offset_to_datetime(first_offset),
+        end_time=offset_to_datetime(last_offset),
+        vod_duration_sec=max(duration_sec, 0),
+        vod_duration_label=_format_offset(max(duration_sec, 0)),
+        avg_messages_per_minute=round(total_messages / duration_minutes, 2),
+    )
+    return summary, bucket_offsets, labels
+
+
+def _build_volume_series(
+    aggregates: _BucketAggregates, bucket_offsets: tuple[int, ...], labels: tuple[str, ...]
+) -> list[TimeBucketPoint]:
+    return [
+        _time_bucket_point(
+            bucket_start=offset_to_datetime(bucket),
+            bucket_start_offset_sec=bucket_offset,
+            bucket_start_offset_label=label,
+            total_messages=total,
+            unique_users=bucket_users,
+        )
+        for bucket, bucket_offset, label, total, bucket_users in zip(
+            aggregates.buckets, bucket_offsets, labels, aggregates.totals, aggregates.unique_users
         )
-        for bucket in buckets
     ]
 
+
+def _build_keyword_series(
+    aggregates: _BucketAggregates,
+    volume_series: list[TimeBucketPoint],
+    keyword_series_format: KeywordSeriesFormat = "dense",
+) -> KeywordSeries:
+    normalized_keywords = aggregates.normalized_keywords
+    if keyword_series_format != "dense":
+        return _compact_keyword_series(normalized_keywords, aggregates.keyword_counts, keyword_series_format)
+
+    # 버킷 시각/라벨은 volume_series 의 같은 버킷 값을 그대로 쓴다
     keyword_series: list[KeywordSeriesPoint] = []
-    for bucket in buckets:
-        for keyword in normalized_keywords:
+    for point, counts in zip(volume_series, aggregates.keyword_counts):
+        for keyword, count in zip(normalized_keywords, counts):
             keyword_series.append(
-                KeywordSeriesPoint(
-                    bucket_start=bucket,
-                    bucket_start_offset_sec=max(int((bucket - base_time).total_seconds()), 0),
-                    bucket_start_offset_label=_format_offset(max(int((bucket - base_time).total_seconds()), 0)),
+                _keyword_series_point(
+                    bucket_start=point.bucket_start,
+                    bucket_start_offset_sec=point.bucket_start_offset_sec,
+                    bucket_start_offset_label=point.bucket_start_offset_label,
                     keyword=keyword,
-                    count=by_bucket_keyword.get((bucket, keyword), 0),
+                    count=count,
                 )
             )
+    return keyword_series
 
-    total_messages = len(messages)
-    unique_users = len({message.user_id_hash for message in messages})
-    start_time = messages[0].timestamp
-    end_time = messages[-1].timestamp
-    duration_minutes = max((end_time - start_time).total_seconds() / 60.0, 1 / 60)
 
-    summary = SummaryStats(
-        total_messages=total_messages,
-        unique_users=unique_users,
-        start_time=start_time,
-        end_time=end_time,
-        vod_duration_sec=max(int((end_time - start_time).total_seconds()), 0),
-        vod_duration_label=_format_offset(max(int((end_time - start_time).total_seconds()), 0)),
-        avg_messages_per_minute=round(total_messages / duration_minutes, 2),
-    )
+def _compact_keyword_series(
+    normalized_keywords: list[str], keyword_counts: list[list[int]], keyword_series_format: KeywordSeriesFormat
+) -> KeywordSeriesColumnar | KeywordSeriesSparse:
+    # keyword_counts[bucket_index][keyword_index] → 키워드별 열 / 0이 아닌 칸
+    if keyword_series_format == "columnar":
+        if keyword_counts:
+            counts = [list(column) for column in zip(*keyword_counts)]
+        else:
+            counts = [[] for _ in normalized_keywords]
+        return KeywordSeriesColumnar(keywords=normalized_keywords, counts=counts)
 
-    highlights = _detect_highlights(
-        buckets=buckets,
-        base_time=base_time,
-        by_bucket_total=by_bucket_total,
-        by_bucket_keyword=by_bucket_keyword,
-        normalized_keywords=normalized_keywords,
-        options=options,
+    bucket_indices: list[int] = []
+    keyword_indices: list[int] = []
+    nonzero_counts: list[int] = []
+    for bucket_index, counts in enumerate(keyword_counts):
+        for keyword_index, count in enumerate(counts):
+            if count:
+                bucket_indices.append(bucket_index)
+                keyword_indices.append(keyword_index)
+                nonzero_counts.append(count)
+    return KeywordSeriesSparse(
+        keywords=normalized_keywords,
+        bucket_indices=bucket_indices,
+        keyword_indices=keyword_indices,
+        counts=nonzero_counts,
     )
 
-    return summary, volume_series, keyword_series, highlights
+
+def _base_offset(aggregates: _BucketAggregates) -> int:
+    # playerMessageTime 기반 로그(year=1970): epoch을 기준점으로 사용 → VOD 직접 offset
+    # 레거시 벽시계 로그: 첫 채팅을 기준점으로 사용 (기존 동작 유지)
+    return 0 if _is_vod_relative(aggregates.first_offset) else aggregates.first_offset
+
+
+def _score_aggregates(aggregates: _BucketAggregates, engine: str) -> tuple[list[float], list[int | None]]:
+    keyword_count = len(aggregates.normalized_keywords)
+    if engine == "numpy":
+        return _score_buckets_numpy(aggregates.totals, aggregates.keyword_counts, keyword_count)
+    return _score_buckets(aggregates.totals, aggregates.keyword_counts, keyword_count)
 
 
 def _zscore(values: list[int]) -> list[float]:
@@ -179,37 +674,33 @@ def _zscore(values: list[int]) -> list[float]:
     return [(value - mean) / std for value in float_values]
 
 
-def _detect_highlights(
-    buckets: list[datetime],
-    base_time: datetime,
-    by_bucket_total: dict[datetime, int],
-    by_bucket_keyword: dict[tuple[datetime, str], int],
-    normalized_keywords: list[str],
-    options: AnalyzeOptions,
-) -> list[HighlightRange]:
-    if not buckets:
-        return []
-
-    volume_values = [by_bucket_total[bucket] for bucket in buckets]
-    volume_z = _zscore(volume_values)
+def _score_buckets(
+    bucket_totals: list[int], keyword_counts: list[list[int]], keyword_count: int
+) -> tuple[list[float], list[int | None]]:
+    """버킷별 점수와 대표 키워드 인덱스 (키워드가 없거나 0회면 None)."""
+    volume_z = _zscore(bucket_totals)
 
     keyword_peak_per_bucket: list[int] = []
-    representative_keyword_per_bucket: list[str | None] = []
-
-    for bucket in buckets:
-        if not normalized_keywords:
+    representative_per_bucket: list[int | None] = []
+    for counts in keyword_counts:
+        if not keyword_count:
             keyword_peak_per_bucket.append(0)
-            representative_keyword_per_bucket.append(None)
+            representative_per_bucket.append(None)
             continue
 
-        counts = {keyword: by_bucket_keyword.get((bucket, keyword), 0) for keyword in normalized_keywords}
-        best_keyword, best_count = max(counts.items(), key=lambda item: item[1])
+        # 동률이면 먼저 입력된 키워드 (max 는 첫 최댓값을 반환)
+        best_index = max(range(keyword_count), key=counts.__getitem__)
+        best_count = counts[best_index]
         keyword_peak_per_bucket.append(best_count)
-        representative_keyword_per_bucket.append(best_keyword if best_count > 0 else None)
+        representative_per_bucket.append(best_index if best_count > 0 else None)
 
     keyword_z = _zscore(keyword_peak_per_bucket)
-    scores = [0.6 * volume_z[idx] + 0.4 * keyword_z[idx] for idx in range(len(buckets))]
+    scores = [0.6 * volume_z[idx] + 0.4 * keyword_z[idx] for idx in range(len(bucket_totals))]
+    return scores, representative_per_bucket
+
 
+def _merge_candidates(scores: list[float], options: AnalyzeOptions) -> list[tuple[int, int, int]]:
+    """임계값 이상 버킷을 max_merge_buckets 단위로 병합해 (start, end, peak) 인덱스를 반환한다."""
     candidate_indices = [
         idx for idx, score in enumerate(scores) if score >= options.min_highlight_score
     ]
@@ -226,35 +717,542 @@ def _detect_highlights(
         else:
             merged_ranges[-1][1] = idx
 
+    return [
+        (start_idx, end_idx, max(range(start_idx, end_idx + 1), key=lambda idx: scores[idx]))
+        for start_idx, end_idx in merged_ranges
+    ]
+
+
+def _detect_highlights(
+    aggregates: _BucketAggregates,
+    scores: list[float],
+    representative_per_bucket: list[int | None],
+    options: AnalyzeOptions,
+    engine: str = "python",
+) -> list[HighlightRange]:
+    buckets = aggregates.buckets
+    if not buckets:
+        return []
+
+    base_offset = _base_offset(aggregates)
+    bucket_totals = aggregates.totals
+    normalized_keywords = aggregates.normalized_keywords
     highlights: list[HighlightRange] = []
-    bucket_delta = timedelta(seconds=options.bucket_size_seconds)
 
-    for start_idx, end_idx in merged_ranges:
-        peak_idx = max(range(start_idx, end_idx + 1), key=lambda idx: scores[idx])
+    for start_idx, end_idx, peak_idx in _ranked_ranges(scores, options, engine):
         start_bucket = buckets[start_idx]
-        end_bucket = buckets[end_idx] + bucket_delta
+        end_bucket = buckets[end_idx] + options.bucket_size_seconds
         peak_bucket = buckets[peak_idx]
 
-        start_offset_sec = max(int((start_bucket - base_time).total_seconds()), 0)
-        end_offset_sec = max(int((end_bucket - base_time).total_seconds()), 0)
-        peak_offset_sec = max(int((peak_bucket - base_time).total_seconds()), 0)
+        start_offset_sec = max(start_bucket - base_offset, 0)
+        end_offset_sec = max(end_bucket - base_offset, 0)
+        peak_offset_sec = max(peak_bucket - base_offset, 0)
+        representative_index = representative_per_bucket[peak_idx]
 
         highlights.append(
             HighlightRange(
-                start=start_bucket,
+                start=offset_to_datetime(start_bucket),
                 start_offset_sec=start_offset_sec,
                 start_offset_label=_format_offset(start_offset_sec),
-                end=end_bucket,
+                end=offset_to_datetime(end_bucket),
                 end_offset_sec=end_offset_sec,
                 end_offset_label=_format_offset(end_offset_sec),
                 score=round(scores[peak_idx], 3),
-                peak_bucket=peak_bucket,
+                peak_bucket=offset_to_datetime(peak_bucket),
                 peak_offset_sec=peak_offset_sec,
                 peak_offset_label=_format_offset(peak_offset_sec),
-                peak_total_messages=by_bucket_total[peak_bucket],
-                representative_keyword=representative_keyword_per_bucket[peak_idx],
+                peak_total_messages=bucket_totals[peak_idx],
+                representative_keyword=(
+                    None if representative_index is None else normalized_keywords[representative_index]
+                ),
+                trending_terms=(
+                    None
+                    if aggregates.trending is None
+                    else [
+                        TrendingTerm(term=term, count=count, score=score)
+                        for term, count, score in merge_trending(
+                            aggregates.trending[start_idx : end_idx + 1], options.trending_terms
+                        )
+                    ]
+                ),
+            )
+        )
+    return highlights
+
+
+def _ranked_ranges(scores: list[float], options: AnalyzeOptions, engine: str) -> list[tuple[int, int, int]]:
+    """병합된 (start_idx, end_idx, peak_idx) 를 반올림한 점수 내림차순(동점은 시간 순)으로 max_highlights 개."""
+    if engine == "numpy":
+        merged_ranges = _merge_candidates_numpy(scores, options)
+    else:
+        merged_ranges = _merge_candidates(scores, options)
+    merged_ranges.sort(key=lambda item: round(scores[item[2]], 3), reverse=True)
+    return merged_ranges[: options.max_highlights]
+
+
+def build_highlight_sweep(
+    messages: MessageStore,
+    keywords: list[str],
+    options: AnalyzeOptions,
+    bucket_sizes_seconds: list[int],
+    min_highlight_scores: list[float],
+    max_merge_buckets: list[int],
+    engine: AnalysisEngine = "auto",
+) -> list[SweepCombination]:
+    """버킷 크기 × min_highlight_score × max_merge_buckets 격자의 하이라이트를 한 번에 구한다.
+
+    기준 해상도(numpy: 1초, python: 버킷 크기들의 최대공약수)로 한 번 집계한 뒤 버킷 크기별로
+    합치고(rollup), 버킷 크기마다 한 번 스코어링한 점수로 나머지 조합의 병합만 반복한다.
+    각 조합의 결과는 같은 옵션으로 build_analysis 한 highlights 와 같다.
+    하이라이트는 고유 사용자 수를 쓰지 않으므로 집계하지 않고, 단계 캐시에도 넣지 않는다
+    (격자가 사용자 분석 캐시를 밀어내지 않도록).
+    """
+    combinations = [
+        (bucket_size, min_score, merge)
+        for bucket_size in bucket_sizes_seconds
+        for min_score in min_highlight_scores
+        for merge in max_merge_buckets
+    ]
+    normalized_keywords = _normalize_keywords(keywords, options)
+    if not messages:
+        return [
+            SweepCombination(
+                bucket_size_seconds=bucket_size, min_highlight_score=min_score, max_merge_buckets=merge, highlights=[]
+            )
+            for bucket_size, min_score, merge in combinations
+        ]
+
+    engine = _resolve_engine(engine)
+    if engine == "numpy":
+        bins = _second_bins(messages)
+        keyword_hits = _keyword_second_hits(messages, bins, normalized_keywords, options)
+
+        def aggregates_for(bucket_size: int) -> _BucketAggregates:
+            buckets, totals, keyword_matrix = _rollup_seconds_numpy(bins, keyword_hits, bucket_size)
+            return _BucketAggregates(
+                normalized_keywords=normalized_keywords,
+                buckets=buckets.tolist(),
+                totals=totals.tolist(),
+                unique_users=[],
+                keyword_counts=keyword_matrix.tolist(),
+                total_messages=len(messages),
+                first_offset=messages.offsets[0],
+                last_offset=messages.offsets[-1],
+            )
+
+    else:
+        base_size = reduce(gcd, bucket_sizes_seconds)
+        # 기준 버킷은 요청 범위(5~300초) 밖일 수 있으므로 검증 없이 복사한다 (스윕은 떠오르는 단어를 쓰지 않는다)
+        accumulator = _BucketAccumulator(
+            normalized_keywords,
+            options.model_copy(update={"bucket_size_seconds": base_size, "trending_terms": 0}),
+            track_users=False,
+        )
+        contents = _keyword_contents(messages, options) if normalized_keywords else repeat("")
+        accumulator.consume(zip(messages.offsets, messages.user_codes, contents))
+        base = accumulator.result()
+
+        def aggregates_for(bucket_size: int) -> _BucketAggregates:
+            return _rollup_aggregates(base, bucket_size)
+
+    results: list[SweepCombination] = []
+    by_bucket_size: dict[int, tuple[_BucketAggregates, list[float], list[int | None]]] = {}
+    for bucket_size, min_score, merge in combinations:
+        if bucket_size not in by_bucket_size:
+            aggregates = aggregates_for(bucket_size)
+            by_bucket_size[bucket_size] = (aggregates, *_score_aggregates(aggregates, engine))
+        aggregates, scores, representative_per_bucket = by_bucket_size[bucket_size]
+
+        combination_options = options.model_copy(
+            update={"bucket_size_seconds": bucket_size, "min_highlight_score": min_score, "max_merge_buckets": merge}
+        )
+        buckets = aggregates.buckets
+        base_offset = _base_offset(aggregates)
+        highlights: list[SweepHighlight] = []
+        for start_idx, end_idx, peak_idx in _ranked_ranges(scores, combination_options, engine):
+            representative_index = representative_per_bucket[peak_idx]
+            highlights.append(
+                SweepHighlight(
+                    start_offset_sec=max(buckets[start_idx] - base_offset, 0),
+                    end_offset_sec=max(buckets[end_idx] + bucket_size - base_offset, 0),
+                    peak_offset_sec=max(buckets[peak_idx] - base_offset, 0),
+                    score=round(scores[peak_idx], 3),
+                    peak_total_messages=aggregates.totals[peak_idx],
+                    representative_keyword=(
+                        None if representative_index is None else normalized_keywords[representative_index]
+                    ),
+                )
+            )
+        results.append(
+            SweepCombination(
+                bucket_size_seconds=bucket_size,
+                min_highlight_score=min_score,
+                max_merge_buckets=merge,
+                highlights=highlights,
+            )
+        )
+    return results
+
+
+def _rollup_aggregates(base: _BucketAggregates, bucket_size_seconds: int) -> _BucketAggregates:
+    """base 버킷(크기가 bucket_size_seconds 의 약수)을 큰 버킷으로 합친다.
+    고유 사용자 수는 합칠 수 없으므로 비운다."""
+    buckets: list[int] = []
+    totals: list[int] = []
+    keyword_counts: list[list[int]] = []
+    for bucket, total, counts in zip(base.buckets, base.totals, base.keyword_counts):
+        target = _bucket_start(bucket, bucket_size_seconds)
+        if buckets and buckets[-1] == target:
+            totals[-1] += total
+            keyword_counts[-1] = [left + right for left, right in zip(keyword_counts[-1], counts)]
+        else:
+            buckets.append(target)
+            totals.append(total)
+            keyword_counts.append(list(counts))
+    return base._replace(
+        buckets=buckets, totals=totals, unique_users=[], keyword_counts=keyword_counts, trending=None
+    )
+
+
+def search_terms(
+    messages: MessageStore,
+    index: TokenIndex,
+    terms: list[str],
+    options: AnalyzeOptions,
+    include_occurrences: bool = False,
+    max_occurrences: int = 200,
+) -> list[TermSearchResult]:
+    """역색인으로 검색어별 버킷 횟수(와 선택적으로 출현 위치)를 구한다.
+
+    검색어는 키워드와 같은 규칙(strip, 대소문자, 반복 반응 정규화)으로 정규화하고,
+    횟수 의미도 keyword_options.mode 를 따른다. index 는 같은 옵션으로 정규화한 본문의 역색인이어야 한다.
+    - contains + 공백 없는 검색어: 본문을 보지 않고 역색인만으로 센다
+    - 그 외(exact, 공백 포함): 역색인으로 후보 메시지를 고른 뒤 그 본문만 확인한다
+    """
+    mode = options.keyword_options.mode
+    bucket_size_seconds = options.bucket_size_seconds
+    offsets = messages.offsets
+    base_offset = 0 if not messages or _is_vod_relative(offsets[0]) else offsets[0]
+    contents: list[str] | None = None
+
+    results: list[TermSearchResult] = []
+    for term in terms:
+        normalized_term = _normalize_content(term.strip(), options)
+        if not normalized_term:
+            raise ValueError("search term must not be blank")
+
+        pieces = normalized_term.split()
+        per_message: dict[int, int] = {}
+        if mode == "contains" and pieces == [normalized_term]:
+            for token_id in index.tokens_containing(normalized_term):
+                multiplicity = index.token(token_id).count(normalized_term)
+                for message_index in index.postings_of(token_id):
+                    per_message[message_index] = per_message.get(message_index, 0) + multiplicity
+        else:
+            if contents is None:
+                contents = normalized_contents(messages, options)
+            # 가장 드문 조각으로 후보를 줄인다. exact 면 조각이 모두 온전한 토큰이어야 하고,
+            # contains 면 각 조각이 어떤 토큰의 부분 문자열이어야 한다.
+            candidate_sets = []
+            for piece in pieces:
+                if mode == "exact":
+                    token_id = index.token_id(piece)
+                    token_ids = [] if token_id is None else [token_id]
+                else:
+                    token_ids = index.tokens_containing(piece)
+                candidate_sets.append({m for token_id in token_ids for m in index.postings_of(token_id)})
+            for message_index in sorted(min(candidate_sets, key=len)):
+                content = contents[message_index]
+                count = int(content == normalized_term) if mode == "exact" else content.count(normalized_term)
+                if count:
+                    per_message[message_index] = count
+
+        bucket_counts: dict[int, int] = {}
+        for message_index, count in per_message.items():
+            bucket = _bucket_start(offsets[message_index], bucket_size_seconds)
+            bucket_counts[bucket] = bucket_counts.get(bucket, 0) + count
+
+        buckets: list[TermBucketCount] = []
+        for bucket in sorted(bucket_counts):
+            bucket_offset = max(bucket - base_offset, 0)
+            buckets.append(
+                TermBucketCount(
+                    bucket_start=offset_to_datetime(bucket),
+                    bucket_start_offset_sec=bucket_offset,
+                    bucket_start_offset_label=_format_offset(bucket_offset),
+                    count=bucket_counts[bucket],
+                )
+            )
+
+        occurrences: list[TermOccurrence] = []
+        if include_occurrences:
+            for message_index in sorted(per_message)[:max_occurrences]:
+                offset_sec = max(offsets[message_index] - base_offset, 0)
+                occurrences.append(
+                    TermOccurrence(
+                        timestamp=offset_to_datetime(offsets[message_index]),
+                        offset_sec=offset_sec,
+                        offset_label=_format_offset(offset_sec),
+                        count=per_message[message_index],
+                    )
+                )
+
+        results.append(
+            TermSearchResult(
+                term=term,
+                normalized_term=normalized_term,
+                total_count=sum(per_message.values()),
+                message_count=len(per_message),
+                buckets=buckets,
+                occurrences=occurrences,
+                occurrences_truncated=include_occurrences and len(per_message) > max_occurrences,
             )
         )
+    return results
+
+
+# ---------------------------------------------------------------------------
+# NumPy 엔진 — 위의 순수 Python 구현이 기준(reference) 이며 결과는 동일해야 한다
+# (tests/test_analyzer.py 의 엔진 동등성 테스트).
+# ---------------------------------------------------------------------------
+
+
+# 버킷 피라미드: 초 단위 기본 집계를 저장소 파생 열(`MessageStore.derived`)에 캐시하고,
+# 요청된 bucket_size_seconds 는 기본 집계를 합산(rollup)해 만든다. 버킷 크기만 바꾼
+# 재분석은 메시지를 다시 훑지 않고 "메시지가 있는 초" 개수에 비례하는 비용만 든다.
+#
+# 고유 사용자 수는 합산할 수 없으므로 (구간, 사용자) 쌍을 중복 제거해 레벨별로 캐시하고
+# 정확히 센다. 버킷은 0 기준 정렬이므로 레벨 L 이 버킷 크기를 나누면 L 초 구간은 항상 한
+# 버킷 안에 들어간다. L == 버킷 크기면 쌍 개수가 곧 고유 사용자 수이고, 아니면 버킷
+# 단위로 한 번 더 중복 제거한다.
+_USER_PAIR_LEVELS = (60, 30, 15, 10, 5, 1)
+# 저장소당 캐시할 키워드 열 개수 상한 (편집자가 키워드를 계속 바꿔도 무한히 쌓이지 않게)
+_MAX_CACHED_KEYWORD_COLUMNS = 256
+
+
+class _SecondBins(NamedTuple):
+    seconds: "np.ndarray"  # 메시지가 있는 초 (오름차순, int64)
+    totals: "np.ndarray"  # 초별 메시지 수
+
+
+def _second_bins(messages: MessageStore) -> _SecondBins:
+    key = ("second_bins",)
+    bins = messages.derived.get(key)
+    if bins is None:
+        offsets = np.frombuffer(messages.offsets, dtype=np.int64)
+        # 입력이 오프셋 순이므로 초 경계는 값이 바뀌는 위치
+        starts = np.concatenate(([0], np.flatnonzero(offsets[1:] != offsets[:-1]) + 1))
+        bins = _SecondBins(
+            seconds=offsets[starts],
+            totals=np.diff(np.append(starts, len(offsets))),
+        )
+        messages.derived[key] = bins
+    return bins
+
+
+def _keyword_second_hits(
+    messages: MessageStore, bins: _SecondBins, normalized_keywords: list[str], options: AnalyzeOptions
+) -> "np.ndarray":
+    """초별 키워드 횟수 행렬 (초 × 키워드). 키워드 열은 (키워드, 모드, 정규화 옵션) 별로 캐시되어
+    키워드 하나만 바꾸면 그 열만 새로 센다."""
+    mode = options.keyword_options.mode
+    case_sensitive = options.keyword_options.case_sensitive
+    normalize = options.normalize_repeated_reactions
+    derived = messages.derived
+
+    def column_key(keyword: str) -> tuple:
+        key = ("keyword_hits", keyword, mode, case_sensitive, normalize)
+        # regex 는 한 스캔에서 패턴들이 매치를 나눠 가지므로 열이 패턴 목록 전체에 의존한다
+        return key + (tuple(normalized_keywords),) if mode == "regex" else key
+
+    missing = [keyword for keyword in normalized_keywords if column_key(keyword) not in derived]
+    if missing and mode == "regex":
+        # 일부 열만 다시 세면 빠진 패턴끼리만 매치를 나눠 가져 결과가 달라지므로 그룹 전체를 다시 센다
+        missing = list(normalized_keywords)
+    if missing:
+        contents = _keyword_contents(messages, options)
+        second_index = np.repeat(np.arange(len(bins.seconds)), bins.totals)
+        # 키워드가 적으면 키워드별 map(str.count) 를 C 루프로 돌리고, 많으면 KeywordMatcher 로
+        # 메시지당 한 번 스캔한 (셀, 횟수) 를 모은다. 어느 쪽이든 bincount(weights=) 로 합산하며,
+        # 가중치는 float64 지만 카운트 합은 2**53 미만이라 정확하다.
+        if len(missing) < AUTOMATON_MIN_KEYWORDS and mode != "regex":
+            for keyword in missing:
+                if mode == "exact":
+                    hits = map(keyword.__eq__, contents)
+                else:
+                    hits = map(str.count, contents, repeat(keyword))
+                per_message = np.fromiter(hits, dtype=np.int64, count=len(contents))
+                derived[column_key(keyword)] = np.bincount(
+                    second_index, weights=per_message, minlength=len(bins.seconds)
+                ).astype(np.int64)
+        else:
+            count_keywords = KeywordMatcher(missing, mode, case_sensitive).count
+            cell_base = (second_index * len(missing)).tolist()
+            hit_cells: list[int] = []
+            hit_counts: list[int] = []
+            for cell, content in zip(cell_base, contents):
+                for index, count in count_keywords(content).items():
+                    hit_cells.append(cell + index)
+                    hit_counts.append(count)
+            matrix = np.bincount(
+                np.asarray(hit_cells, dtype=np.int64),
+                weights=np.asarray(hit_counts, dtype=np.float64),
+                minlength=len(bins.seconds) * len(missing),
+            ).astype(np.int64).reshape(len(bins.seconds), len(missing))
+            for index, keyword in enumerate(missing):
+                derived[column_key(keyword)] = matrix[:, index].copy()
+
+    columns = [derived[column_key(keyword)] for keyword in normalized_keywords]
+    _evict_keyword_columns(derived, keep={column_key(keyword) for keyword in normalized_keywords})
+    if not columns:
+        return np.zeros((len(bins.seconds), 0), dtype=np.int64)
+    return np.stack(columns, axis=1)
+
+
+def _evict_keyword_columns(derived: dict, keep: set) -> None:
+    # regex 열은 패턴 목록(키의 마지막 요소) 전체에 의존하므로 같은 목록의 열을 한 그룹으로 묶어
+    # 함께 축출한다. 나머지 모드는 열 하나가 한 그룹이다.
+    groups: dict[tuple, list[tuple]] = {}
+    for key in derived:
+        if key[0] == "keyword_hits":
+            groups.setdefault(key[:1] + key[2:] if len(key) > 5 else key, []).append(key)
+    excess = sum(len(keys) for keys in groups.values()) - _MAX_CACHED_KEYWORD_COLUMNS
+    # dict 는 삽입 순서를 유지하므로 앞쪽이 오래된 그룹
+    for keys in groups.values():
+        if excess <= 0:
+            break
+        if keep.isdisjoint(keys):
+            for key in keys:
+                del derived[key]
+            excess -= len(keys)
+
+
+def _user_pairs(messages: MessageStore, level: int) -> tuple["np.ndarray", "np.ndarray"]:
+    """level 초 구간별로 중복 제거한 (구간 시작 오프셋, 사용자 코드) 쌍. (구간, 사용자) 순 정렬."""
+    key = ("user_pairs", level)
+    pairs = messages.derived.get(key)
+    if pairs is None:
+        user_count = max(messages.user_count, 1)
+        pair_keys = np.frombuffer(messages.offsets, dtype=np.int64).copy()
+        # 정수 // 는 NumPy 에서도 floor 나눗셈 → 음수 오프셋도 Python 과 동일
+        pair_keys //= level
+        pair_keys *= user_count
+        pair_keys += np.frombuffer(messages.user_codes, dtype=np.int32)
+        pair_keys.sort()  # 정렬 후 인접 비교가 np.unique 보다 빠르다
+        pair_keys = pair_keys[_first_of_runs(pair_keys)]
+        bin_index = pair_keys // user_count
+        pairs = (bin_index * level, (pair_keys - bin_index * user_count).astype(np.int32))
+        messages.derived[key] = pairs
+    return pairs
+
+
+def _first_of_runs(sorted_values: "np.ndarray") -> "np.ndarray":
+    mask = np.empty(len(sorted_values), dtype=bool)
+    mask[:1] = True
+    np.not_equal(sorted_values[1:], sorted_values[:-1], out=mask[1:])
+    return mask
+
+
+def _rollup_seconds_numpy(
+    bins: _SecondBins, keyword_hits: "np.ndarray", bucket_size_seconds: int
+) -> tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """초 → 버킷 rollup: (버킷 시작, 버킷별 메시지 수, 버킷 × 키워드 횟수)."""
+    # seconds 가 오름차순이므로 버킷 경계는 값이 바뀌는 위치
+    second_buckets = bins.seconds // bucket_size_seconds * bucket_size_seconds
+    bucket_starts = np.concatenate(([0], np.flatnonzero(second_buckets[1:] != second_buckets[:-1]) + 1))
+    buckets = second_buckets[bucket_starts]
+    totals = np.add.reduceat(bins.totals, bucket_starts)
+    if keyword_hits.shape[1]:
+        keyword_matrix = np.add.reduceat(keyword_hits, bucket_starts, axis=0)
+    else:
+        keyword_matrix = keyword_hits[: len(buckets)]
+    return buckets, totals, keyword_matrix
+
+
+def _aggregate_store_numpy(
+    messages: MessageStore, normalized_keywords: list[str], options: AnalyzeOptions
+) -> _BucketAggregates:
+    bucket_size_seconds = options.bucket_size_seconds
+    bins = _second_bins(messages)
+    keyword_hits = _keyword_second_hits(messages, bins, normalized_keywords, options)
+    buckets, totals, keyword_matrix = _rollup_seconds_numpy(bins, keyword_hits, bucket_size_seconds)
+
+    level = next(level for level in _USER_PAIR_LEVELS if bucket_size_seconds % level == 0)
+    pair_bins, pair_users = _user_pairs(messages, level)
+    pair_bucket_index = np.searchsorted(buckets, pair_bins // bucket_size_seconds * bucket_size_seconds)
+    if level == bucket_size_seconds:
+        unique_users = np.bincount(pair_bucket_index, minlength=len(buckets))
+    else:
+        user_count = max(messages.user_count, 1)
+        pair_keys = pair_bucket_index * user_count
+        pair_keys += pair_users
+        pair_keys.sort()
+        unique_users = np.bincount(pair_keys[_first_of_runs(pair_keys)] // user_count, minlength=len(buckets))
+
+    return _BucketAggregates(
+        normalized_keywords=normalized_keywords,
+        buckets=buckets.tolist(),
+        totals=totals.tolist(),
+        unique_users=unique_users.tolist(),
+        keyword_counts=keyword_matrix.tolist(),
+        total_messages=len(messages),
+        first_offset=messages.offsets[0],
+        last_offset=messages.offsets[-1],
+    )
+
+
+def _zscore_numpy(values: "np.ndarray") -> "np.ndarray":
+    """`_zscore` 와 비트 단위로 같은 값. 분산은 파이썬 엔진과 같은 식/순서로 더한다
+    (np.sum 의 pairwise 합, x * x 와 x ** 2(libm pow) 는 마지막 자리가 다를 수 있다).
+    버킷 수만큼의 반복이라 집계에 비하면 무시할 수 있다."""
+    count = len(values)
+    # 정수 버킷 값의 부분합은 모두 정확히 표현되므로 파이썬 엔진의 float 합과 같다
+    mean = int(values.sum()) / count
+    deviations = values.astype(np.float64) - mean
+    variance = sum(deviation**2 for deviation in deviations.tolist()) / count
+    std = sqrt(variance)
+    if std == 0:
+        return np.zeros(count, dtype=np.float64)
+    return deviations / std
+
+
+def _score_buckets_numpy(
+    bucket_totals: list[int], keyword_counts: list[list[int]], keyword_count: int
+) -> tuple[list[float], list[int | None]]:
+    volume_z = _zscore_numpy(np.asarray(bucket_totals, dtype=np.int64))
+    if keyword_count:
+        matrix = np.asarray(keyword_counts, dtype=np.int64).reshape(len(bucket_totals), keyword_count)
+        best_index = matrix.argmax(axis=1)  # 동률이면 첫 키워드
+        keyword_peak = matrix[np.arange(len(bucket_totals)), best_index]
+        representative = [
+            index if peak > 0 else None for index, peak in zip(best_index.tolist(), keyword_peak.tolist())
+        ]
+    else:
+        keyword_peak = np.zeros(len(bucket_totals), dtype=np.int64)
+        representative = [None] * len(bucket_totals)
+    scores = 0.6 * volume_z + 0.4 * _zscore_numpy(keyword_peak)
+    return scores.tolist(), representative
+
+
+def _merge_candidates_numpy(scores: list[float], options: AnalyzeOptions) -> list[tuple[int, int, int]]:
+    score_array = np.asarray(scores, dtype=np.float64)
+    candidates = np.flatnonzero(score_array >= options.min_highlight_score)
+    if not len(candidates):
+        return []
+
+    # 연속 후보 구간(run) 안에서 max_merge_buckets 개씩 잘라 하나의 범위로 만든다
+    run_breaks = np.flatnonzero(np.diff(candidates) != 1) + 1
+    run_starts = np.concatenate(([0], run_breaks))
+    run_id = np.zeros(len(candidates), dtype=np.int64)
+    run_id[run_breaks] = 1
+    np.cumsum(run_id, out=run_id)
+    position_in_run = np.arange(len(candidates)) - run_starts[run_id]
+    new_range = position_in_run % options.max_merge_buckets == 0
+    range_starts = np.flatnonzero(new_range)
+    range_ends = np.append(range_starts[1:], len(candidates)) - 1
 
-    highlights.sort(key=lambda item: item.score, reverse=True)
-    return highlights[: options.max_highlights]
+    merged: list[tuple[int, int, int]] = []
+    for start_idx, end_idx in zip(candidates[range_starts].tolist(), candidates[range_ends].tolist()):
+        peak_idx = start_idx + int(score_array[start_idx : end_idx + 1].argmax())
+        merged.append((start_idx, end_idx, peak_idx))
+    return merged
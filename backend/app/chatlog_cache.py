@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+import hashlib
 import os
 import sys
+import threading
+from collections import Counter
 from pathlib import Path
 
 from .logging_config import get_logger
+from .parsed_cache import parsed_log_cache
 
 
 logger = get_logger(__name__)
 CACHE_MAX_FILES = 5
+# 메모리에서 밀려나 디스크에 저장된 분석 결과 파일 최대 개수
+RESULT_MAX_FILES = 32
+# 지문 해시에 사용하는 파일 앞/뒤 샘플 크기. 전체 해시는 큰 로그에서 매 요청마다 부담이므로
+# 크기 + 앞/뒤 샘플 해시로 재수집/수정 여부를 판별한다.
+_FINGERPRINT_SAMPLE_BYTES = 64 * 1024
 
 
 def get_chatlog_cache_dir() -> Path:
@@ -41,12 +50,63 @@ def get_chatlog_cache_path(vod_id: str) -> Path:
     return get_chatlog_cache_dir() / f"chatLog-{vod_id}.log"
 
 
+def get_chatlog_sidecar_path(log_path: Path) -> Path:
+    """캐시된 로그 옆에 저장되는 사전 파싱 사이드카 경로 (`chatLog-{vod_id}.parsed`)."""
+    return log_path.with_suffix(".parsed")
+
+
+def get_chatlog_index_path(log_path: Path, case_sensitive: bool, normalize: bool) -> Path:
+    """정규화 옵션 조합별 토큰 역색인 경로 (예: `chatLog-{vod_id}.ci-nr.index`)."""
+    variant = ("cs" if case_sensitive else "ci") + ("-nr" if normalize else "")
+    return log_path.with_name(f"{log_path.stem}.{variant}.index")
+
+
+def get_chatlog_result_path(vod_id: str, key: str) -> Path:
+    """메모리에서 밀려난 분석 결과 JSON 경로 (`chatLog-{vod_id}.{key}.result`)."""
+    return get_chatlog_cache_dir() / f"chatLog-{vod_id}.{key}.result"
+
+
+def log_fingerprint(path: Path) -> str:
+    """로그 파일 지문: `{size}-{앞/뒤 샘플 blake2b}`.
+
+    mtime 은 `mark_recent` 가 LRU 용도로 매 요청마다 갱신하므로 지문에 넣지 않는다.
+    재수집으로 내용이 바뀌면 크기나 샘플 해시가 달라진다. 사이드카/메모리 캐시의 유효성 키.
+    """
+    stat = path.stat()
+    digest = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as handle:
+        digest.update(handle.read(_FINGERPRINT_SAMPLE_BYTES))
+        if stat.st_size > _FINGERPRINT_SAMPLE_BYTES:
+            handle.seek(max(stat.st_size - _FINGERPRINT_SAMPLE_BYTES, _FINGERPRINT_SAMPLE_BYTES))
+            digest.update(handle.read(_FINGERPRINT_SAMPLE_BYTES))
+    return f"{stat.st_size}-{digest.hexdigest()}"
+
+
 def mark_recent(path: Path) -> None:
     if not path.exists():
         return
     os.utime(path, None)
 
 
+# 분석이 끝날 때까지 prune 하지 않을 로그 파일 이름 → 고정 횟수 (배치 분석처럼 먼저 받은 로그를
+# 나중 수집의 prune 이 지우면 다시 수집하게 된다)
+_pinned_logs: Counter[str] = Counter()
+_pinned_lock = threading.Lock()
+
+
+def pin_log(path: Path) -> None:
+    """prune_cache 가 path 를 지우지 않게 한다. unpin_log 와 같은 횟수로 짝지어 호출한다."""
+    with _pinned_lock:
+        _pinned_logs[path.name] += 1
+
+
+def unpin_log(path: Path) -> None:
+    with _pinned_lock:
+        _pinned_logs[path.name] -= 1
+        if _pinned_logs[path.name] <= 0:
+            del _pinned_logs[path.name]
+
+
 def prune_cache(max_files: int = CACHE_MAX_FILES) -> None:
     cache_dir = get_chatlog_cache_dir()
     files = [path for path in cache_dir.glob("chatLog-*.log") if path.is_file()]
@@ -60,11 +120,18 @@ def prune_cache(max_files: int = CACHE_MAX_FILES) -> None:
         return
 
     files.sort(key=lambda item: item.stat().st_mtime, reverse=True)
-    to_delete = files[max_files:]
+    with _pinned_lock:
+        pinned = set(_pinned_logs)
+    # 고정된 로그는 오래됐어도 남긴다 (그만큼 잠시 max_files 를 넘을 수 있다)
+    to_delete = [path for path in files[max_files:] if path.name not in pinned]
     deleted_names: list[str] = []
     for path in to_delete:
         try:
             path.unlink(missing_ok=True)
+            get_chatlog_sidecar_path(path).unlink(missing_ok=True)
+            for derived_path in (*cache_dir.glob(f"{path.stem}.*.index"), *cache_dir.glob(f"{path.stem}.*.result")):
+                derived_path.unlink(missing_ok=True)
+            parsed_log_cache.invalidate(path.stem.removeprefix("chatLog-"))
             deleted_names.append(path.name)
         except Exception:
             logger.exception("Failed to prune cached chat log: %s", path)
@@ -78,3 +145,17 @@ def prune_cache(max_files: int = CACHE_MAX_FILES) -> None:
         max_files,
         deleted_names,
     )
+
+
+def prune_result_files(max_files: int = RESULT_MAX_FILES) -> None:
+    """디스크로 밀려난 분석 결과(`*.result`)를 최근 사용 순으로 max_files 개만 남긴다."""
+    files = [path for path in get_chatlog_cache_dir().glob("chatLog-*.result") if path.is_file()]
+    if len(files) <= max_files:
+        return
+    files.sort(key=lambda item: item.stat().st_mtime, reverse=True)
+    for path in files[max_files:]:
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            logger.exception("Failed to prune analysis result file: %s", path)
+    logger.info("Result file prune completed: pruned_count=%s max_files=%s", len(files) - max_files, max_files)
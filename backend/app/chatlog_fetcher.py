@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
 import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
@@ -9,6 +11,7 @@ from typing import TypedDict
 import requests
 
 from .logging_config import get_logger
+from .progress_events import publish_progress
 
 
 logger = get_logger(__name__)
@@ -18,6 +21,12 @@ REQUEST_TIMEOUT_SECONDS = 10
 _MIN_PAGE_DELAY = 0.05        # 초, 정상 응답 시 최소 대기 (기존 0.2s의 1/4)
 _RATE_LIMIT_BASE_DELAY = 1.0   # 초, 429 첫 번째 재시도
 _RATE_LIMIT_MAX_RETRIES = 5    # 최대 재시도 횟수
+_RETRY_AFTER_MAX_DELAY = 60.0  # 초, Retry-After 헤더를 따를 최대 대기
+
+# 프로세스 안의 모든 수집(배치의 여러 VOD 포함)이 공유하는 다음 요청 가능 시각 (monotonic).
+# 429 를 받으면 이 시각을 뒤로 미뤄 다른 수집도 함께 기다리게 한다.
+_pacing_lock = threading.Lock()
+_next_request_at = 0.0
 
 
 class FetchProgress(TypedDict):
@@ -27,17 +36,63 @@ class FetchProgress(TypedDict):
 
 
 # vod_id → 현재 수집 진행도. analyze 엔드포인트가 실행되는 동안 갱신된다.
+# 같은 vod_id 의 수집은 한 번에 하나뿐이므로(single-flight) 한 수집만 이 값을 쓴다.
 _progress: dict[str, FetchProgress] = {}
 
 
+class _InFlightFetch:
+    __slots__ = ("finished", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.finished = threading.Event()
+        self.result: tuple[int, int] | None = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+# vod_id → 진행 중인 수집. 같은 VOD 의 동시 요청은 새로 수집하지 않고 이 수집을 기다린다.
+_in_flight_lock = threading.Lock()
+_in_flight: dict[str, _InFlightFetch] = {}
+
+
 def get_progress(vod_id: str) -> FetchProgress:
     """현재 수집 진행도를 반환한다. 수집 중이 아니면 done=True로 반환."""
     return _progress.get(vod_id, FetchProgress(pages=0, messages=0, done=True))
 
 
+def _wait_for_request_slot() -> None:
+    """직전 요청과 최소 _MIN_PAGE_DELAY 간격, 429 back-off 중이면 그 시각까지 기다린다."""
+    global _next_request_at
+    with _pacing_lock:
+        now = time.monotonic()
+        wait = _next_request_at - now
+        _next_request_at = max(now, _next_request_at) + _MIN_PAGE_DELAY
+    if wait > 0:
+        time.sleep(wait)
+
+
+def _defer_requests(delay: float) -> None:
+    global _next_request_at
+    with _pacing_lock:
+        _next_request_at = max(_next_request_at, time.monotonic() + delay)
+
+
+def _retry_after_seconds(response: requests.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    try:
+        return min(max(float(value), 0.0), _RETRY_AFTER_MAX_DELAY) if value is not None else None
+    except ValueError:
+        # HTTP-date 형식은 지원하지 않는다 (exponential back-off 사용)
+        return None
+
+
 def _get_page(session: requests.Session, url: str, headers: dict) -> requests.Response:
-    """단일 페이지 요청. 429/타임아웃 시 exponential back-off 후 재시도."""
+    """단일 페이지 요청. 429/타임아웃 시 exponential back-off 후 재시도.
+
+    429 back-off 는 프로세스 전역 요청 간격에 반영되어 동시에 도는 다른 수집도 함께 늦춘다.
+    """
     for attempt in range(_RATE_LIMIT_MAX_RETRIES + 1):
+        _wait_for_request_slot()
         try:
             response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
         except requests.exceptions.Timeout:
@@ -51,12 +106,14 @@ def _get_page(session: requests.Session, url: str, headers: dict) -> requests.Re
             time.sleep(delay)
             continue
         if response.status_code == 429:
-            delay = _RATE_LIMIT_BASE_DELAY * (2 ** attempt)
+            delay = _retry_after_seconds(response)
+            if delay is None:
+                delay = _RATE_LIMIT_BASE_DELAY * (2 ** attempt)
             logger.warning(
                 "Rate limited (429): url=%s attempt=%s/%s, retrying in %.1fs",
                 url, attempt + 1, _RATE_LIMIT_MAX_RETRIES, delay,
             )
-            time.sleep(delay)
+            _defer_requests(delay)
             continue
         response.raise_for_status()
         return response
@@ -64,20 +121,102 @@ def _get_page(session: requests.Session, url: str, headers: dict) -> requests.Re
 
 
 def fetch_chatlog_to_file(vod_id: str, destination: Path) -> tuple[int, int]:
+    """채팅 로그를 destination 에 수집하고 (메시지 수, 페이지 수) 를 반환한다.
+
+    같은 vod_id 의 수집이 이미 진행 중이면 새로 요청하지 않고 그 수집이 끝나기를 기다려
+    같은 결과(또는 같은 예외)를 받는다. 수집 중에는 `{destination}.part` 에 쓰고 끝나면
+    os.replace 로 바꿔 넣으므로, destination 은 없거나 완성된 파일이다.
+    """
+    with _in_flight_lock:
+        flight = _in_flight.get(vod_id)
+        if flight is not None:
+            flight.waiters += 1
+            waiters = flight.waiters
+        elif destination.exists():
+            # 존재 확인과 이 호출 사이에 다른 요청의 수집이 끝났다
+            progress = get_progress(vod_id)
+            logger.info("Chat log fetched by a concurrent request: vod_id=%s path=%s", vod_id, destination)
+            return progress["messages"], progress["pages"]
+        else:
+            flight = _in_flight[vod_id] = _InFlightFetch()
+            waiters = 0
+
+    if waiters:
+        logger.info("Joining in-flight chat log fetch: vod_id=%s waiters=%s", vod_id, waiters)
+        flight.finished.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = _download_chatlog(vod_id, destination)
+    except BaseException as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _in_flight_lock:
+            del _in_flight[vod_id]
+        flight.finished.set()
+    return flight.result
+
+
+def _fetch_video_duration(session: requests.Session, vod_id: str, headers: dict) -> int | None:
+    """VOD 길이(초). 수집 남은 시간 추정에만 쓰므로 재시도 없이 한 번 요청하고, 실패하면 None."""
+    _wait_for_request_slot()
+    try:
+        response = session.get(
+            f"https://api.chzzk.naver.com/service/v3/videos/{vod_id}",
+            headers=headers,
+            timeout=REQUEST_TIMEOUT_SECONDS,
+        )
+        response.raise_for_status()
+        duration = (response.json().get("content") or {}).get("duration")
+    except (requests.exceptions.RequestException, ValueError, AttributeError) as exc:
+        logger.warning("Cannot read VOD duration: vod_id=%s reason=%s", vod_id, exc)
+        return None
+    return int(duration) if isinstance(duration, (int, float)) and duration > 0 else None
+
+
+def _report_fetch_progress(
+    vod_id: str, pages: int, messages: int, position_ms: object, duration_sec: int | None, started: float
+) -> None:
+    """폴링용 _progress 와 진행 이벤트를 함께 갱신한다."""
+    _progress[vod_id] = FetchProgress(pages=pages, messages=messages, done=False)
+    position_sec = int(position_ms) // 1000 if isinstance(position_ms, (int, float)) and position_ms > 0 else None
+    eta_sec = None
+    if position_sec and duration_sec:
+        elapsed = time.monotonic() - started
+        eta_sec = round(elapsed * max(duration_sec - position_sec, 0) / position_sec, 1)
+    publish_progress(
+        vod_id,
+        "fetch",
+        pages=pages,
+        messages=messages,
+        position_sec=position_sec,
+        duration_sec=duration_sec,
+        eta_sec=eta_sec,
+    )
+
+
+def _download_chatlog(vod_id: str, destination: Path) -> tuple[int, int]:
     next_player_message_time = "0"
     page_count = 0
     written_count = 0
+    started = time.monotonic()
 
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/"
     }
 
     destination.parent.mkdir(parents=True, exist_ok=True)
+    part_path = destination.with_name(f"{destination.name}.part")
     logger.info("Start fetching chat log: vod_id=%s -> %s", vod_id, destination)
 
     _progress[vod_id] = FetchProgress(pages=0, messages=0, done=False)
     try:
-        with requests.Session() as session, destination.open("w", encoding="utf-8") as file:
+        with requests.Session() as session, part_path.open("w", encoding="utf-8") as file:
+            duration_sec = _fetch_video_duration(session, vod_id, headers)
+            _report_fetch_progress(vod_id, 0, 0, None, duration_sec, started)
             while True:
                 url = (
                     f"https://api.chzzk.naver.com/service/v1/videos/{vod_id}/chats"
@@ -125,16 +264,22 @@ def fetch_chatlog_to_file(vod_id: str, destination: Path) -> tuple[int, int]:
                 file.writelines(log_messages)
                 written_count += len(log_messages)
 
-                # 페이지 수집 완료 후 진행도 갱신
-                _progress[vod_id] = FetchProgress(pages=page_count, messages=written_count, done=False)
-
                 next_player_message_time = content.get("nextPlayerMessageTime")
+
+                # 페이지 수집 완료 후 진행도 갱신 (다음 페이지 시작 위치 = 지금까지 수집한 VOD 위치)
+                _report_fetch_progress(
+                    vod_id, page_count, written_count, next_player_message_time, duration_sec, started
+                )
                 if next_player_message_time is None:
                     logger.info("Reached last chat page: vod_id=%s page=%s", vod_id, page_count)
                     break
-                # 정상 응답 시 최소 딜레이 — 기존 0.2s 대비 1/4, 429 시 _get_page 내부에서 back-off
-                time.sleep(_MIN_PAGE_DELAY)
+                # 페이지 간 최소 딜레이와 429 back-off 는 _get_page 의 요청 간격이 맡는다
 
+        os.replace(part_path, destination)
+    except BaseException:
+        # 중간에 실패한 수집은 캐시로 남기지 않는다 (다음 요청이 처음부터 다시 수집)
+        part_path.unlink(missing_ok=True)
+        raise
     finally:
         _progress[vod_id] = FetchProgress(pages=page_count, messages=written_count, done=True)
 
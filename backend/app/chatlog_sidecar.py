@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Iterable
+
+from .chatlog_cache import get_chatlog_sidecar_path
+from .logging_config import get_logger
+from .message_store import ChatRecord, MessageStore
+from .schemas import ParseErrorItem
+
+
+logger = get_logger(__name__)
+
+# 사이드카 파일 구조
+#   MAGIC (8 bytes) | header 길이 (uint32 LE) | header JSON | 섹션 바이트들...
+# header 에는 로그 지문, byteorder, 각 섹션의 (offset, length) 가 들어 있다.
+# 숫자 열은 array.tobytes() 그대로(native byteorder) 저장하므로 로드는 frombytes 한 번이다.
+# mmap 은 쓰지 않는다: Windows 에서 매핑된 파일은 삭제/교체가 막혀 prune·재수집이 실패한다.
+_MAGIC = b"SGAKMSG\x00"
+_VERSION = 2
+_HEADER_LENGTH = struct.Struct("<I")
+_ARRAY_SECTIONS = {
+    "offsets": "q",
+    "user_codes": "i",
+    "nickname_codes": "i",
+    "content_ends": "q",
+}
+# SidecarWriter 가 열을 임시 파일로 흘려 쓰는 단위 (레코드 수)
+_WRITER_FLUSH_RECORDS = 64 * 1024
+
+
+def _encode_table(items: list[str]) -> bytes:
+    # user_id_hash / 닉네임은 로그 한 줄 안에서 나오므로 개행을 포함하지 않는다
+    return "\n".join(items).encode("utf-8")
+
+
+def _decode_table(raw: bytes, count: int) -> list[str]:
+    if count == 0:
+        return []
+    return raw.decode("utf-8").split("\n")
+
+
+def _encode_header(
+    fingerprint: str, message_count: int, user_count: int, nickname_count: int, section_lengths: dict[str, int]
+) -> tuple[bytes, int]:
+    """MAGIC 부터 header JSON 까지의 바이트와 본문(섹션들) 전체 길이."""
+    layout: dict[str, list[int]] = {}
+    position = 0
+    for name, length in section_lengths.items():
+        layout[name] = [position, length]
+        position += length
+
+    header = json.dumps(
+        {
+            "version": _VERSION,
+            "fingerprint": fingerprint,
+            "byteorder": sys.byteorder,
+            "message_count": message_count,
+            "user_count": user_count,
+            "nickname_count": nickname_count,
+            "sections": layout,
+        }
+    ).encode("utf-8")
+    return _MAGIC + _HEADER_LENGTH.pack(len(header)) + header, position
+
+
+def _is_current(header: dict, fingerprint: str) -> bool:
+    return (
+        header.get("version") == _VERSION
+        and header.get("fingerprint") == fingerprint
+        and header.get("byteorder") == sys.byteorder
+    )
+
+
+def write_sidecar(
+    log_path: Path,
+    fingerprint: str,
+    messages: MessageStore,
+    parse_errors: list[ParseErrorItem],
+) -> Path | None:
+    """파싱 결과를 로그 옆 사이드카에 기록한다. 실패해도 분석은 계속되므로 None 만 반환한다."""
+    sidecar_path = get_chatlog_sidecar_path(log_path)
+    sections: dict[str, bytes] = {
+        name: getattr(messages, name).tobytes() for name in _ARRAY_SECTIONS
+    }
+    sections["content_text"] = messages.content_text.encode("utf-8")
+    sections["user_ids"] = _encode_table(messages.user_ids)
+    sections["nicknames"] = _encode_table(messages.nicknames)
+    sections["parse_errors"] = json.dumps(
+        [[item.file_path, item.line_number, item.reason, item.raw_line] for item in parse_errors],
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+    header, position = _encode_header(
+        fingerprint,
+        len(messages),
+        len(messages.user_ids),
+        len(messages.nicknames),
+        {name: len(raw) for name, raw in sections.items()},
+    )
+
+    temp_path = sidecar_path.with_name(f"{sidecar_path.name}.tmp")
+    try:
+        with temp_path.open("wb") as handle:
+            handle.write(header)
+            for raw in sections.values():
+                handle.write(raw)
+        os.replace(temp_path, sidecar_path)
+    except OSError:
+        logger.exception("Failed to write parsed sidecar: %s", sidecar_path)
+        temp_path.unlink(missing_ok=True)
+        return None
+
+    logger.info(
+        "Wrote parsed sidecar: path=%s messages=%s parse_errors=%s bytes=%s",
+        sidecar_path,
+        len(messages),
+        len(parse_errors),
+        len(header) + position,
+    )
+    return sidecar_path
+
+
+def load_sidecar(log_path: Path, fingerprint: str) -> tuple[MessageStore, list[ParseErrorItem]] | None:
+    """지문이 일치하는 사이드카가 있으면 (MessageStore, parse_errors) 를, 아니면 None 을 반환한다."""
+    sidecar_path = get_chatlog_sidecar_path(log_path)
+    try:
+        raw = sidecar_path.read_bytes()
+    except FileNotFoundError:
+        return None
+    except OSError:
+        logger.exception("Failed to read parsed sidecar: %s", sidecar_path)
+        return None
+
+    try:
+        if raw[: len(_MAGIC)] != _MAGIC:
+            raise ValueError("bad magic")
+        (header_length,) = _HEADER_LENGTH.unpack_from(raw, len(_MAGIC))
+        body_start = len(_MAGIC) + _HEADER_LENGTH.size + header_length
+        header = json.loads(raw[len(_MAGIC) + _HEADER_LENGTH.size : body_start])
+        if not _is_current(header, fingerprint):
+            logger.info("Parsed sidecar is stale, reparsing: %s", sidecar_path)
+            return None
+
+        view = memoryview(raw)
+
+        def section(name: str) -> memoryview:
+            start, length = header["sections"][name]
+            return view[body_start + start : body_start + start + length]
+
+        columns: dict[str, array] = {}
+        for name, typecode in _ARRAY_SECTIONS.items():
+            column = array(typecode)
+            column.frombytes(section(name))
+            if len(column) != header["message_count"]:
+                raise ValueError(f"column length mismatch: {name}")
+            columns[name] = column
+
+        messages = MessageStore(
+            offsets=columns["offsets"],
+            user_codes=columns["user_codes"],
+            user_ids=_decode_table(bytes(section("user_ids")), header["user_count"]),
+            nickname_codes=columns["nickname_codes"],
+            nicknames=_decode_table(bytes(section("nicknames")), header["nickname_count"]),
+            content_text=str(section("content_text"), "utf-8"),
+            content_ends=columns["content_ends"],
+        )
+        parse_errors = [
+            ParseErrorItem(file_path=file_path, line_number=line_number, reason=reason, raw_line=raw_line)
+            for file_path, line_number, reason, raw_line in json.loads(bytes(section("parse_errors")))
+        ]
+    except (ValueError, KeyError, TypeError, struct.error):
+        logger.warning("Parsed sidecar is corrupted, reparsing: %s", sidecar_path, exc_info=True)
+        return None
+
+    logger.info(
+        "Loaded parsed sidecar: path=%s messages=%s parse_errors=%s",
+        sidecar_path,
+        len(messages),
+        len(parse_errors),
+    )
+    return messages, parse_errors
+
+
+def sidecar_is_current(log_path: Path, fingerprint: str) -> bool:
+    """사이드카 본문은 읽지 않고 header 의 버전/지문/byteorder 와 파일 길이만 확인한다."""
+    sidecar_path = get_chatlog_sidecar_path(log_path)
+    try:
+        with sidecar_path.open("rb") as handle:
+            prefix = handle.read(len(_MAGIC) + _HEADER_LENGTH.size)
+            if prefix[: len(_MAGIC)] != _MAGIC:
+                return False
+            (header_length,) = _HEADER_LENGTH.unpack_from(prefix, len(_MAGIC))
+            header = json.loads(handle.read(header_length))
+            size = os.fstat(handle.fileno()).st_size
+        body_length = sum(length for _, length in header["sections"].values())
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError, KeyError, TypeError, struct.error):
+        logger.warning("Parsed sidecar header is unreadable: %s", sidecar_path, exc_info=True)
+        return False
+    return _is_current(header, fingerprint) and size == len(_MAGIC) + _HEADER_LENGTH.size + header_length + body_length
+
+
+class SidecarWriter:
+    """MessageStore 를 만들지 않고 오프셋 순 레코드를 받아 사이드카를 쓴다.
+
+    숫자 열과 본문은 _WRITER_FLUSH_RECORDS 개씩 섹션별 임시 파일로 흘려 쓰고, commit 때 header 와
+    함께 한 파일로 이어붙인다. 메모리에는 인턴 테이블(사용자/닉네임 수 만큼)만 남는다.
+    입력은 MessageStoreBuilder.build() 결과와 같은 순서(오프셋 순 안정 정렬)여야 한다.
+    """
+
+    def __init__(self, log_path: Path, fingerprint: str) -> None:
+        self.sidecar_path = get_chatlog_sidecar_path(log_path)
+        self.fingerprint = fingerprint
+        self.message_count = 0
+        self._user_index: dict[str, int] = {}
+        self._nickname_index: dict[str, int] = {}
+        self._columns = {name: array(typecode) for name, typecode in _ARRAY_SECTIONS.items()}
+        self._contents: list[str] = []
+        self._content_length = 0
+        self._spools = {
+            name: tempfile.TemporaryFile(dir=self.sidecar_path.parent)
+            for name in (*_ARRAY_SECTIONS, "content_text")
+        }
+
+    def append(self, offset_sec: int, nickname: str, content: str, user_id_hash: str) -> None:
+        user_code = self._user_index.setdefault(user_id_hash, len(self._user_index))
+        nickname_code = self._nickname_index.setdefault(nickname, len(self._nickname_index))
+        columns = self._columns
+        columns["offsets"].append(offset_sec)
+        columns["user_codes"].append(user_code)
+        columns["nickname_codes"].append(nickname_code)
+        self._contents.append(content)
+        self._content_length += len(content)
+        columns["content_ends"].append(self._content_length)
+        self.message_count += 1
+        if len(self._contents) >= _WRITER_FLUSH_RECORDS:
+            self._flush()
+
+    def extend(self, records: Iterable[ChatRecord]) -> None:
+        append = self.append
+        for offset_sec, nickname, content, user_id_hash in records:
+            append(offset_sec, nickname, content, user_id_hash)
+
+    def commit(self, parse_errors: list[ParseErrorItem]) -> Path | None:
+        """임시 파일들을 사이드카 하나로 합친다. 실패해도 분석은 계속되므로 None 만 반환한다."""
+        temp_path = self.sidecar_path.with_name(f"{self.sidecar_path.name}.tmp")
+        try:
+            self._flush()
+            tail = {
+                "user_ids": _encode_table(list(self._user_index)),
+                "nicknames": _encode_table(list(self._nickname_index)),
+                "parse_errors": json.dumps(
+                    [[item.file_path, item.line_number, item.reason, item.raw_line] for item in parse_errors],
+                    ensure_ascii=False,
+                ).encode("utf-8"),
+            }
+            section_lengths = {name: spool.tell() for name, spool in self._spools.items()}
+            section_lengths.update((name, len(raw)) for name, raw in tail.items())
+            header, position = _encode_header(
+                self.fingerprint,
+                self.message_count,
+                len(self._user_index),
+                len(self._nickname_index),
+                section_lengths,
+            )
+            with temp_path.open("wb") as handle:
+                handle.write(header)
+                for spool in self._spools.values():
+                    spool.seek(0)
+                    shutil.copyfileobj(spool, handle)
+                for raw in tail.values():
+                    handle.write(raw)
+            os.replace(temp_path, self.sidecar_path)
+        except OSError:
+            logger.exception("Failed to write parsed sidecar: %s", self.sidecar_path)
+            temp_path.unlink(missing_ok=True)
+            return None
+        finally:
+            self.close()
+
+        logger.info(
+            "Wrote parsed sidecar (streamed): path=%s messages=%s parse_errors=%s bytes=%s",
+            self.sidecar_path,
+            self.message_count,
+            len(parse_errors),
+            len(header) + position,
+        )
+        return self.sidecar_path
+
+    def close(self) -> None:
+        """임시 파일을 지운다 (commit 하지 않고 멈춘 스트림도 호출한다)."""
+        for spool in self._spools.values():
+            spool.close()
+
+    def _flush(self) -> None:
+        for name, column in self._columns.items():
+            column.tofile(self._spools[name])
+            del column[:]
+        self._spools["content_text"].write("".join(self._contents).encode("utf-8"))
+        self._contents = []
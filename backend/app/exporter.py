@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import functools
+import io
+import json
+from itertools import islice
+from operator import attrgetter
+from typing import Any, Iterable, Iterator, NamedTuple
+
+from pydantic import BaseModel, TypeAdapter
+
+from .analyzer import offset_label, vod_offset
+from .json_response import dumps
+from .message_store import MessageStore, offset_to_datetime
+from .schemas import AnalyzeResponse, RawMessage, trusted_constructor
+
+
+# CSV/JSON 은 이 행 수마다, parquet 은 row group 마다 한 조각씩 내보낸다
+EXPORT_CHUNK_ROWS = 4096
+PARQUET_ROW_GROUP_ROWS = 65536
+
+# 데이터셋 → 열 (CSV 헤더 / parquet 열 이름). 분석 데이터셋은 응답 모델의 같은 이름 필드 값
+_ANALYSIS_COLUMNS: dict[str, tuple[str, ...]] = {
+    "summary": (
+        "total_messages",
+        "unique_users",
+        "start_time",
+        "end_time",
+        "vod_duration_sec",
+        "vod_duration_label",
+        "avg_messages_per_minute",
+    ),
+    "highlights": (
+        "start",
+        "start_offset_sec",
+        "start_offset_label",
+        "end",
+        "end_offset_sec",
+        "end_offset_label",
+        "score",
+        "peak_bucket",
+        "peak_offset_sec",
+        "peak_offset_label",
+        "peak_total_messages",
+        "representative_keyword",
+    ),
+    "volume": (
+        "bucket_start",
+        "bucket_start_offset_sec",
+        "bucket_start_offset_label",
+        "total_messages",
+        "unique_users",
+    ),
+    "keywords": (
+        "bucket_start",
+        "bucket_start_offset_sec",
+        "bucket_start_offset_label",
+        "keyword",
+        "count",
+    ),
+    "parse_errors": ("file_path", "line_number", "reason", "raw_line"),
+}
+MESSAGE_COLUMNS = ("timestamp", "offset_sec", "offset_label", "nickname", "user_id_hash", "content")
+# 데이터셋 → AnalyzeResponse 필드
+_RESPONSE_FIELDS = {
+    "summary": "summary",
+    "highlights": "highlights",
+    "volume": "volume_series",
+    "keywords": "keyword_series",
+    "parse_errors": "parse_errors",
+}
+PARQUET_DATASETS = ("volume", "keywords", "messages")
+# 메시지 행은 값의 타입이 보장되므로 검증 없이 만든다
+_raw_message = trusted_constructor(RawMessage)
+
+
+class ParquetUnavailableError(RuntimeError):
+    """pyarrow(선택 의존성, backend/requirements-parquet.txt) 가 설치되지 않아 parquet 을 만들 수 없다."""
+
+
+class ExportStream(NamedTuple):
+    chunks: Iterator[bytes]
+    media_type: str
+    file_name: str
+
+
+def export_stream(
+    format: str, dataset: str, analyzed: AnalyzeResponse | None = None, messages: MessageStore | None = None
+) -> ExportStream:
+    """내보내기 본문을 조각 단위로 만드는 생성기와 응답 정보를 돌려준다.
+
+    dataset="messages" 는 messages 를, 그 외는 analyzed 를 쓴다. 지원하지 않는 조합은 생성기를
+    만들기 전에 ValueError (응답을 시작하기 전에 400 으로 돌려주도록).
+    """
+    if format == "parquet":
+        if dataset not in PARQUET_DATASETS:
+            raise ValueError("parquet export는 dataset=volume / keywords / messages 만 지원합니다.")
+        pa, pq = _pyarrow()
+        columns, rows = _dataset_rows(dataset, analyzed, messages)
+        return ExportStream(
+            _iter_parquet(pa, pq, dataset, columns, rows),
+            "application/vnd.apache.parquet",
+            f"analysis-{dataset}.parquet",
+        )
+
+    if format == "csv":
+        if dataset == "all":
+            raise ValueError("csv export는 dataset=all을 지원하지 않습니다.")
+        if dataset != "messages" and dataset not in _ANALYSIS_COLUMNS:
+            raise ValueError("지원하지 않는 dataset입니다.")
+        columns, rows = _dataset_rows(dataset, analyzed, messages)
+        return ExportStream(_iter_csv(columns, rows), "text/csv", f"analysis-{dataset}.csv")
+
+    if dataset == "messages":
+        value: Any = (_message_object(row) for row in message_rows(messages))
+    elif dataset == "all":
+        # model_dump 와 같은 키/순서 (요청하지 않은 압축 시계열 필드는 빠진다)
+        value = {
+            name: getattr(analyzed, name)
+            for name in AnalyzeResponse.model_fields
+            if getattr(analyzed, name) is not None
+        }
+    elif dataset in _RESPONSE_FIELDS:
+        value = getattr(analyzed, _RESPONSE_FIELDS[dataset])
+    else:
+        raise ValueError("지원하지 않는 dataset입니다.")
+    return ExportStream(_chunked(_iter_json(value)), "application/json", f"analysis-{dataset}.json")
+
+
+def message_rows(messages: MessageStore, start: int = 0, stop: int | None = None) -> Iterator[tuple]:
+    """원본 메시지 행 (MESSAGE_COLUMNS 순서). 재생 위치는 시계열과 같은 규칙."""
+    if not messages:
+        return
+    first_offset = messages.offsets[0]
+    previous = None
+    for offset_sec, nickname, content, user_id_hash in messages.iter_records(start, stop):
+        # 시간순이라 같은 초의 메시지가 이어진다: 시각/위치 계산을 초마다 한 번만 한다
+        if offset_sec != previous:
+            previous = offset_sec
+            position = vod_offset(offset_sec, first_offset)
+            timing = (offset_to_datetime(offset_sec), position, offset_label(position))
+        yield *timing, nickname, user_id_hash, content
+
+
+def raw_messages(messages: MessageStore, start: int, stop: int) -> list[RawMessage]:
+    """인덱스 [start, stop) 메시지를 응답 모델로 만든다."""
+    return [_raw_message(**dict(zip(MESSAGE_COLUMNS, row))) for row in message_rows(messages, start, stop)]
+
+
+def iter_message_lines(messages: MessageStore, start: int, stop: int) -> Iterator[bytes]:
+    """인덱스 [start, stop) 메시지를 RawMessage 한 줄씩의 NDJSON 으로, 행 묶음마다 내보낸다."""
+    rows = message_rows(messages, start, stop)
+    while chunk := list(islice(rows, EXPORT_CHUNK_ROWS)):
+        yield b"".join(dumps(_raw_message(**dict(zip(MESSAGE_COLUMNS, row)))) + b"\n" for row in chunk)
+
+
+def _dataset_rows(
+    dataset: str, analyzed: AnalyzeResponse | None, messages: MessageStore | None
+) -> tuple[tuple[str, ...], Iterable[tuple]]:
+    if dataset == "messages":
+        return MESSAGE_COLUMNS, message_rows(messages)
+    columns = _ANALYSIS_COLUMNS[dataset]
+    source = [analyzed.summary] if dataset == "summary" else getattr(analyzed, _RESPONSE_FIELDS[dataset])
+    values = attrgetter(*columns)
+    return columns, (values(row) for row in source)
+
+
+def _message_object(row: tuple) -> dict:
+    return dict(zip(MESSAGE_COLUMNS, (row[0].isoformat(), *row[1:])))
+
+
+def _iter_csv(columns: tuple[str, ...], rows: Iterable[tuple]) -> Iterator[bytes]:
+    """UTF-8 BOM + CSV. 통째로 만든 뒤 utf-8-sig 로 인코딩한 것과 같은 바이트다."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    prefix = codecs.BOM_UTF8
+    rows = iter(rows)
+    while chunk := list(islice(rows, EXPORT_CHUNK_ROWS)):
+        writer.writerows(chunk)
+        yield prefix + buffer.getvalue().encode("utf-8")
+        prefix = b""
+        buffer.seek(0)
+        buffer.truncate()
+    if prefix or buffer.tell():
+        yield prefix + buffer.getvalue().encode("utf-8")
+
+
+def _iter_json(value: Any, indent: str = "", top: bool = True) -> Iterator[str]:
+    """json.dumps(value, ensure_ascii=False, indent=2) 와 같은 텍스트를 조각으로 낸다.
+
+    최상위 dict 는 키마다, 목록(생성기 포함)은 EXPORT_CHUNK_ROWS 행 묶음마다 나눠 낸다. 묶음은
+    한 번에 json.dumps 한 뒤 바깥 괄호를 떼고 현재 들여쓰기를 붙인다 (문자열 안의 개행은
+    이스케이프되므로 안전하다). 모델은 묶음 단위로 변환해 전체 dict 를 한 번에 만들지 않는다.
+    """
+    if isinstance(value, BaseModel):
+        value = value.model_dump(mode="json")
+    if top and isinstance(value, dict) and value:
+        inner = indent + "  "
+        separator = "{"
+        for key, item in value.items():
+            yield f"{separator}\n{inner}{json.dumps(key, ensure_ascii=False)}: "
+            yield from _iter_json(item, inner, top=False)
+            separator = ","
+        yield f"\n{indent}}}"
+    elif isinstance(value, (list, Iterator)):
+        rows = iter(value)
+        separator = "[\n"
+        while batch := list(islice(rows, EXPORT_CHUNK_ROWS)):
+            if isinstance(batch[0], BaseModel):
+                batch = _rows_adapter(type(batch[0])).dump_python(batch, mode="json")
+            body = json.dumps(batch, ensure_ascii=False, indent=2)[2:-2]
+            yield separator + indent + body.replace("\n", "\n" + indent)
+            separator = ",\n"
+        yield "[]" if separator == "[\n" else f"\n{indent}]"
+    else:
+        yield json.dumps(value, ensure_ascii=False, indent=2).replace("\n", "\n" + indent)
+
+
+@functools.lru_cache(maxsize=None)
+def _rows_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+def _chunked(pieces: Iterable[str], size: int = 64 * 1024) -> Iterator[bytes]:
+    buffered: list[str] = []
+    length = 0
+    for piece in pieces:
+        buffered.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield "".join(buffered).encode("utf-8")
+            buffered.clear()
+            length = 0
+    if buffered:
+        yield "".join(buffered).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """ParquetWriter 가 쓴 바이트를 모아 두었다가 drain() 으로 넘기는 출력 대상."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _pyarrow() -> tuple[Any, Any]:
+    """(pyarrow, pyarrow.parquet). 무거운 선택 의존성이라 parquet 을 처음 요청할 때 불러온다."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ParquetUnavailableError("parquet export에는 pyarrow 가 필요합니다.") from exc
+    return pyarrow, pyarrow.parquet
+
+
+def _parquet_schema(pa: Any, dataset: str) -> Any:
+    timestamp = pa.timestamp("s")
+    if dataset == "messages":
+        fields = [
+            ("timestamp", timestamp),
+            ("offset_sec", pa.int64()),
+            ("offset_label", pa.string()),
+            ("nickname", pa.string()),
+            ("user_id_hash", pa.string()),
+            ("content", pa.string()),
+        ]
+    else:
+        last = [("keyword", pa.string()), ("count", pa.int64())]
+        if dataset == "volume":
+            last = [("total_messages", pa.int64()), ("unique_users", pa.int64())]
+        fields = [
+            ("bucket_start", timestamp),
+            ("bucket_start_offset_sec", pa.int64()),
+            ("bucket_start_offset_label", pa.string()),
+            *last,
+        ]
+    return pa.schema(fields)
+
+
+def _iter_parquet(
+    pa: Any, pq: Any, dataset: str, columns: tuple[str, ...], rows: Iterable[tuple]
+) -> Iterator[bytes]:
+    """row group 하나(PARQUET_ROW_GROUP_ROWS 행)를 쓸 때마다 그만큼의 바이트를 낸다."""
+    schema = _parquet_schema(pa, dataset)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    try:
+        rows = iter(rows)
+        while chunk := list(islice(rows, PARQUET_ROW_GROUP_ROWS)):
+            arrays = [pa.array(column, type=field.type) for column, field in zip(zip(*chunk), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()  # close 가 쓴 footer
+    finally:
+        if writer.is_open:  # 클라이언트가 끊겨 중간에 닫힌 경우: 정리만 하고 더 내지 않는다
+            writer.close()
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from fastapi import HTTPException
+
+from .chatlog_fetcher import get_progress
+from .logging_config import get_logger
+from .schemas import AnalyzeJobState, AnalyzeJobStatus, AnalyzeResponse
+
+
+logger = get_logger(__name__)
+# 동시에 실행할 분석 작업 수 (나머지는 대기열). 첫 요청 VOD 는 수집이 몇 분 걸릴 수 있다
+ANALYZE_JOB_CONCURRENCY = 2
+# 끝난 작업을 결과 조회용으로 보관하는 개수 (오래된 것부터 버린다)
+ANALYZE_JOB_HISTORY = 32
+
+
+class AnalysisJob:
+    __slots__ = (
+        "job_id",
+        "vod_id",
+        "dedup_key",
+        "status",
+        "created_at",
+        "started_at",
+        "finished_at",
+        "result",
+        "error_status",
+        "error_detail",
+        "listeners",
+    )
+
+    def __init__(self, job_id: str, vod_id: str, dedup_key: str) -> None:
+        self.job_id = job_id
+        self.vod_id = vod_id
+        self.dedup_key = dedup_key
+        self.status: AnalyzeJobState = "queued"
+        self.created_at = time.monotonic()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.result: AnalyzeResponse | None = None
+        self.error_status: int | None = None
+        self.error_detail: str | None = None
+        self.listeners: list[Callable[[AnalysisJob], None]] = []
+
+    def describe(self, deduplicated: bool = False) -> AnalyzeJobStatus:
+        progress = get_progress(self.vod_id)
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return AnalyzeJobStatus(
+            job_id=self.job_id,
+            vod_id=self.vod_id,
+            status=self.status,
+            deduplicated=deduplicated,
+            fetch_pages=progress["pages"],
+            fetch_messages=progress["messages"],
+            elapsed_sec=round(end - self.created_at, 3),
+            error_status=self.error_status,
+            error_detail=self.error_detail,
+        )
+
+
+class AnalysisJobManager:
+    """분석 작업 대기열. 제출은 즉시 작업 id 를 돌려주고, 실행은 max_workers 개 스레드가 맡는다.
+
+    대기 중/실행 중인 작업과 dedup_key(정규화한 요청)가 같은 제출은 새 작업을 만들지 않고
+    기존 작업을 돌려준다. 끝난 작업은 결과 조회를 위해 최근 ANALYZE_JOB_HISTORY 개만 남긴다
+    (같은 요청을 다시 제출하면 새 작업이 되지만 결과 캐시에 적중한다).
+
+    on_finished 를 넘기면 작업이 끝난 뒤 (중복 제출이면 기존 작업이 끝난 뒤) 실행 스레드에서
+    그 작업으로 호출한다. submit_future 는 실행을 호출자의 Future(배치의 프로세스 풀)에 맡기고
+    중복 제거와 결과 보관만 같이 쓴다.
+    """
+
+    def __init__(self, max_workers: int = ANALYZE_JOB_CONCURRENCY, history: int = ANALYZE_JOB_HISTORY) -> None:
+        self.max_workers = max_workers
+        self.history = history
+        self._executor: ThreadPoolExecutor | None = None
+        self._jobs: OrderedDict[str, AnalysisJob] = OrderedDict()
+        self._active: dict[str, AnalysisJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        vod_id: str,
+        dedup_key: str,
+        run: Callable[[], AnalyzeResponse],
+        on_finished: Callable[[AnalysisJob], None] | None = None,
+    ) -> AnalyzeJobStatus:
+        with self._lock:
+            active = self._deduplicate(vod_id, dedup_key, on_finished)
+            if active is not None:
+                return active
+            job = self._register(vod_id, dedup_key, on_finished)
+            if self._executor is None:
+                # 서버 시작 후 max_workers 를 바꿀 수 있도록 첫 제출 때 만든다
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="analyze-job")
+            self._executor.submit(self._run, job, run)
+            queued = len(self._active)
+        logger.info("Analyze job queued: job_id=%s vod_id=%s active=%s", job.job_id, vod_id, queued)
+        return job.describe()
+
+    def submit_future(
+        self,
+        vod_id: str,
+        dedup_key: str,
+        start: Callable[[], Future],
+        on_finished: Callable[[AnalysisJob], None] | None = None,
+    ) -> AnalyzeJobStatus:
+        """실행을 대기열 스레드 대신 start() 가 돌려준 Future(예: 프로세스 풀)에 맡긴다.
+
+        대기열은 중복 제거와 상태/결과 보관만 하므로 max_workers 한도를 쓰지 않는다.
+        Future 의 결과는 AnalyzeResponse, 예외는 submit 의 run 과 같이 상태 코드로 바뀐다.
+        """
+        with self._lock:
+            active = self._deduplicate(vod_id, dedup_key, on_finished)
+            if active is not None:
+                return active
+            job = self._register(vod_id, dedup_key, on_finished)
+        self._mark_started(job)
+        try:
+            future = start()
+        except Exception as exc:
+            future = Future()
+            future.set_exception(exc)
+        future.add_done_callback(lambda done: self._finish(job, *_outcome(done.result, job.job_id)))
+        return job.describe()
+
+    def get(self, job_id: str) -> AnalysisJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self) -> None:
+        """대기 중인 작업은 취소하고 실행 중인 작업은 기다리지 않는다."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _deduplicate(
+        self, vod_id: str, dedup_key: str, on_finished: Callable[[AnalysisJob], None] | None
+    ) -> AnalyzeJobStatus | None:
+        active = self._active.get(dedup_key)
+        if active is None:
+            return None
+        if on_finished is not None:
+            active.listeners.append(on_finished)
+        logger.info("Analyze job deduplicated: job_id=%s vod_id=%s", active.job_id, vod_id)
+        return active.describe(deduplicated=True)
+
+    def _register(
+        self, vod_id: str, dedup_key: str, on_finished: Callable[[AnalysisJob], None] | None
+    ) -> AnalysisJob:
+        job = AnalysisJob(uuid.uuid4().hex, vod_id, dedup_key)
+        if on_finished is not None:
+            job.listeners.append(on_finished)
+        self._jobs[job.job_id] = job
+        self._active[dedup_key] = job
+        return job
+
+    def _run(self, job: AnalysisJob, run: Callable[[], AnalyzeResponse]) -> None:
+        self._mark_started(job)
+        self._finish(job, *_outcome(run, job.job_id))
+
+    def _mark_started(self, job: AnalysisJob) -> None:
+        with self._lock:
+            job.status = "running"
+            job.started_at = time.monotonic()
+        logger.info(
+            "Analyze job started: job_id=%s vod_id=%s waited=%.3fs",
+            job.job_id,
+            job.vod_id,
+            job.started_at - job.created_at,
+        )
+
+    def _finish(
+        self, job: AnalysisJob, result: AnalyzeResponse | None, error_status: int | None, error_detail: str | None
+    ) -> None:
+        with self._lock:
+            job.result = result
+            job.error_status = error_status
+            job.error_detail = error_detail
+            job.status = "succeeded" if result is not None else "failed"
+            job.finished_at = time.monotonic()
+            self._active.pop(job.dedup_key, None)
+            self._prune_finished()
+            listeners, job.listeners = job.listeners, []
+        logger.info(
+            "Analyze job finished: job_id=%s vod_id=%s status=%s error_status=%s elapsed=%.3fs",
+            job.job_id,
+            job.vod_id,
+            job.status,
+            error_status,
+            job.finished_at - job.started_at,
+        )
+        for listener in listeners:
+            try:
+                listener(job)
+            except Exception:
+                logger.exception("Analyze job listener failed: job_id=%s", job.job_id)
+
+    def _prune_finished(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        for job_id in finished[: max(len(finished) - self.history, 0)]:
+            del self._jobs[job_id]
+
+
+
+def _outcome(
+    run: Callable[[], AnalyzeResponse], job_id: str
+) -> tuple[AnalyzeResponse | None, int | None, str | None]:
+    """run() 의 (결과, 오류 상태 코드, 오류 detail). /api/analyze 와 같은 상태 코드를 쓴다."""
+    try:
+        return run(), None, None
+    except HTTPException as exc:
+        return None, exc.status_code, str(exc.detail)
+    except Exception as exc:
+        logger.exception("Unexpected error in analyze job: job_id=%s", job_id)
+        return None, 500, f"internal_error: {exc}"
+
+
+analysis_jobs = AnalysisJobManager()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+from typing import Any, Callable
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # orjson 이 없으면 표준 json 으로 같은 형식을 만든다
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """응답 JSON 바이트.
+
+    pydantic 모델은 재검증/dict 변환 없이 pydantic-core 직렬화기로 바로 bytes 를 만든다
+    (model_dump_json 의 str 왕복도 없다). 그 외(dict/list) 는 orjson, 없으면 starlette
+    JSONResponse 와 같은 형식의 json.dumps.
+    """
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class FastModelRoute(APIRoute):
+    """핸들러가 pydantic 모델을 반환하면 response_model 재검증 없이 FastJSONResponse 로 보내는 라우트.
+
+    분석 결과는 서버가 만든 모델이라 다시 검증할 필요가 없는데, FastAPI 는 반환값을 dict 로 바꿔
+    response_model 로 검증한 뒤 직렬화한다 (대형 분석에서 직렬화보다 몇 배 느림). response_model 은
+    OpenAPI 스키마용으로 그대로 둔다. 상태 코드는 라우트 status_code, 헤더는 핸들러가 주입받은
+    Response 에 설정한 값을 옮긴다.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, _fast_model_endpoint(endpoint, kwargs.get("status_code")), **kwargs)
+
+
+def _fast_model_endpoint(endpoint: Callable[..., Any], status_code: int | None) -> Callable[..., Any]:
+    # FastAPI 는 wrapper 가 코루틴 함수인지로 await 할지 스레드풀에서 부를지 정하므로 같은 종류로 감싼다
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            return _model_response(await endpoint(*args, **kwargs), kwargs, status_code)
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return _model_response(endpoint(*args, **kwargs), kwargs, status_code)
+
+    return wrapper
+
+
+def _model_response(result: Any, kwargs: dict[str, Any], status_code: int | None) -> Any:
+    if not isinstance(result, BaseModel):
+        return result
+    injected = next((value for value in kwargs.values() if isinstance(value, Response)), None)
+    response = FastJSONResponse(
+        result, status_code=status_code or (injected.status_code if injected is not None else None) or 200
+    )
+    if injected is not None:
+        response.headers.update(injected.headers)
+    return response
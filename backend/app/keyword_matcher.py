@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Literal
+
+
+KeywordMode = Literal["contains", "exact", "regex"]
+# 이 개수 미만이면 키워드별 str.count (C 루프) 가 Python 오토마톤 스캔보다 빠르다
+# (benchmarks/bench_keyword_matcher.py 기준)
+AUTOMATON_MIN_KEYWORDS = 8
+# 정규식 키워드의 역참조(\1, (?P=name))는 지원하지 않는다. 패턴을 하나로 합치면 그룹 번호가 밀린다.
+_BACKREFERENCE_PATTERN = re.compile(r"(?<!\\)(?:\\\\)*\\[1-9]|\(\?P=")
+
+
+@lru_cache(maxsize=128)
+def compile_keyword_patterns(patterns: tuple[str, ...], case_sensitive: bool) -> re.Pattern[str]:
+    """정규식 키워드들을 `(?P<_k0>p0)|(?P<_k1>p1)|...` 하나로 컴파일한다 (요청 간 캐시).
+
+    잘못된 패턴, 역참조, 빈 문자열에 매치할 수 있는 패턴은 ValueError.
+    """
+    flags = 0 if case_sensitive else re.IGNORECASE
+    for pattern in patterns:
+        if _BACKREFERENCE_PATTERN.search(pattern):
+            raise ValueError(f"invalid regex keyword {pattern!r}: backreferences are not supported")
+        try:
+            compiled = re.compile(pattern, flags)
+        except re.error as exc:
+            raise ValueError(f"invalid regex keyword {pattern!r}: {exc}") from exc
+        if compiled.match("") is not None:
+            raise ValueError(f"invalid regex keyword {pattern!r}: pattern must not match an empty string")
+    try:
+        return re.compile("|".join(f"(?P<_k{index}>{pattern})" for index, pattern in enumerate(patterns)), flags)
+    except re.error as exc:
+        # 각 패턴은 유효하지만 합치면 안 되는 경우 (예: 중간의 전역 플래그 (?i))
+        raise ValueError(f"invalid regex keywords: {exc}") from exc
+
+
+class KeywordMatcher:
+    """정규화된 키워드 목록을 한 번 컴파일해 메시지당 한 번의 스캔으로 모든 키워드를 센다.
+
+    의미는 기존 `_count_keyword` 와 같다.
+    - contains: 키워드별로 `content.count(keyword)` 와 같은 겹치지 않는(non-overlapping) 횟수
+    - exact: 본문 전체가 키워드와 같으면 1
+
+    contains 모드는 Aho–Corasick 오토마톤(실패 링크를 미리 풀어 둔 완전 DFA)을 쓴다.
+    오토마톤은 한 키워드의 매치를 시작 위치 순으로 보고하므로, 키워드별로 직전 매치의
+    끝 위치 이후에서 시작하는 매치만 세면 str.count 의 왼쪽 우선 탐욕 규칙과 같아진다.
+    키워드가 적으면 키워드별 str.count 로 센다.
+
+    regex 모드는 모든 패턴을 이름 있는 그룹의 alternation 하나로 컴파일해 메시지당 finditer
+    한 번으로 센다. 매치는 패턴 전체에서 겹치지 않으며, 한 위치에서 여러 패턴이 매치되면 앞에
+    적은 패턴의 매치로 센다 (키워드별로 따로 세는 contains 와 다르다). case_sensitive=False 면
+    IGNORECASE 로 컴파일한다.
+    """
+
+    __slots__ = ("keywords", "mode", "_exact_index", "_use_automaton", "_delta", "_outputs", "_pattern")
+
+    def __init__(self, keywords: list[str], mode: KeywordMode = "contains", case_sensitive: bool = True) -> None:
+        self.keywords = list(keywords)
+        self.mode = mode
+        self._exact_index: dict[str, list[int]] = {}
+        self._use_automaton = False
+        self._delta: list[dict[str, int]] = []
+        self._outputs: list[tuple[tuple[int, int], ...]] = []
+        self._pattern: re.Pattern[str] | None = None
+
+        if mode == "regex":
+            if self.keywords:
+                self._pattern = compile_keyword_patterns(tuple(self.keywords), case_sensitive)
+        elif mode == "exact":
+            for index, keyword in enumerate(self.keywords):
+                if keyword:
+                    self._exact_index.setdefault(keyword, []).append(index)
+        elif sum(1 for keyword in self.keywords if keyword) >= AUTOMATON_MIN_KEYWORDS:
+            self._use_automaton = True
+            self._build_automaton()
+
+    def _build_automaton(self) -> None:
+        # 1) 트라이
+        goto: list[dict[str, int]] = [{}]
+        outputs: list[list[tuple[int, int]]] = [[]]
+        for index, keyword in enumerate(self.keywords):
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append((index, len(keyword)))
+
+        # 2) BFS 로 실패 링크를 계산하면서 전이를 완전 DFA 로 채운다.
+        #    전이가 없는 문자는 루트(0)로 가므로 0 으로 가는 전이는 저장하지 않는다.
+        delta: list[dict[str, int]] = [dict(goto[0])] + [{} for _ in range(len(goto) - 1)]
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            fallback = delta[fail[state]]
+            outputs[state].extend(outputs[fail[state]])
+            transitions = {char: target for char, target in fallback.items()}
+            for char, child in goto[state].items():
+                fail[child] = fallback.get(char, 0)
+                transitions[char] = child
+                queue.append(child)
+            delta[state] = transitions
+
+        self._delta = delta
+        self._outputs = [tuple(items) for items in outputs]
+
+    def count(self, content: str) -> dict[int, int]:
+        """본문 한 건에서 0보다 큰 키워드별 횟수를 {키워드 인덱스: 횟수} 로 반환한다."""
+        if self.mode == "exact":
+            indices = self._exact_index.get(content)
+            return dict.fromkeys(indices, 1) if indices else {}
+
+        if self.mode == "regex":
+            counts = {}
+            if self._pattern is None:
+                return counts
+            for match in self._pattern.finditer(content):
+                # 바깥 그룹이 가장 늦게 닫히므로 lastgroup 은 매치된 패턴의 _k{index}
+                index = int(match.lastgroup[2:])
+                counts[index] = counts.get(index, 0) + 1
+            return counts
+
+        if not self._use_automaton:
+            counts: dict[int, int] = {}
+            for index, keyword in enumerate(self.keywords):
+                if keyword:
+                    occurrences = content.count(keyword)
+                    if occurrences:
+                        counts[index] = occurrences
+            return counts
+
+        delta = self._delta
+        outputs = self._outputs
+        counts = {}
+        # 키워드별 다음 매치가 시작할 수 있는 최소 위치 (겹침 방지)
+        next_start: dict[int, int] = {}
+        state = 0
+        for position, char in enumerate(content, 1):
+            state = delta[state].get(char, 0)
+            matched = outputs[state]
+            if not matched:
+                continue
+            for index, length in matched:
+                start = position - length
+                if start >= next_start.get(index, 0):
+                    next_start[index] = position
+                    counts[index] = counts.get(index, 0) + 1
+        return counts
@@ -1,21 +1,67 @@
-import csv
-import io
+import asyncio
 import json
+import os
+import queue
 import sys
+import threading
 import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+from itertools import chain
+from typing import AsyncIterator, Iterable, Iterator
 
 from fastapi import FastAPI, HTTPException
-from fastapi import Request
+from fastapi import Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-
-from .analyzer import build_analysis
+from pydantic import TypeAdapter
+
+from .analyzer import (
+    AnalysisSection,
+    build_highlight_sweep,
+    iter_analysis,
+    iter_analysis_streaming,
+    message_window,
+    normalized_contents,
+    search_terms,
+)
+from .chatlog_cache import get_chatlog_cache_path, log_fingerprint, pin_log, unpin_log
 from .chatlog_fetcher import get_progress
+from .exporter import ParquetUnavailableError, export_stream, iter_message_lines, raw_messages
+from .jobs import AnalysisJob, analysis_jobs
+from .json_response import FastModelRoute
 from .logging_config import configure_logging, get_logger
-from .parser import parse_chat_logs
-from .schemas import AnalyzeRequest, AnalyzeResponse, ExportRequest
+from .message_store import MessageStore
+from .chatlog_sidecar import load_sidecar
+from .parser import (
+    UnorderedLogError,
+    iter_chat_records,
+    parse_chat_logs,
+    parse_log_file,
+    prefers_streaming,
+    remember_parsed_log,
+    resolve_source_files,
+)
+from .progress_events import TERMINAL_STAGES, progress_broker, publish_progress
+from .result_cache import analysis_result_cache, analysis_result_key, canonical_request
+from .schemas import (
+    AnalyzeJobStatus,
+    AnalyzeRequest,
+    AnalyzeResponse,
+    BatchAnalyzeRequest,
+    ExportRequest,
+    KeywordSeriesColumnar,
+    KeywordSeriesSparse,
+    MessagesRequest,
+    MessagesResponse,
+    ParseErrorItem,
+    SearchRequest,
+    SearchResponse,
+    SweepRequest,
+    SweepResponse,
+)
+from .token_index import get_token_index
 
 
 def _resolve_frontend_dist() -> Path:
@@ -27,8 +73,17 @@ def _resolve_frontend_dist() -> Path:
 
 
 app = FastAPI(title="chatLog Analyzer API", version="0.1.0")
+# 모델을 반환하는 핸들러는 response_model 재검증 없이 바로 직렬화한다
+app.router.route_class = FastModelRoute
 logger = get_logger(__name__)
 FRONTEND_DIST_DIR = _resolve_frontend_dist()
+# /api/analyze/stream 섹션 이름(AnalyzeResponse 필드) → 직렬화기. 전체 응답의 해당 필드와 같은 JSON 을 만든다
+_SECTION_ADAPTERS = {name: TypeAdapter(field.annotation) for name, field in AnalyzeResponse.model_fields.items()}
+# SSE 진행 스트림: 이벤트가 없을 때 연결 유지용 주석을 보내는 간격과 스트림 최대 수명
+PROGRESS_HEARTBEAT_SEC = 15.0
+PROGRESS_STREAM_MAX_SEC = 3600.0
+# 배치 분석의 파싱+분석 워커 프로세스 수 상한 (요청 수가 더 적으면 그만큼만)
+BATCH_ANALYZE_PROCESSES = os.cpu_count() or 1
 
 
 @app.on_event("startup")
@@ -36,12 +91,19 @@ def on_startup() -> None:
     configure_logging()
     logger.info("Backend startup complete")
 
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    analysis_jobs.shutdown()
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 프론트엔드가 다른 origin 일 때도 If-None-Match 재요청에 ETag 를 읽을 수 있도록
+    expose_headers=["ETag"],
 )
 
 
@@ -82,6 +144,82 @@ def progress(vod_id: str) -> dict:
     return {"pages": p["pages"], "messages": p["messages"], "done": p["done"]}
 
 
+@app.get("/api/progress/{vod_id}/stream")
+def progress_stream(vod_id: str, request: Request) -> StreamingResponse:
+    """수집/파싱/분석 단계 이벤트를 Server-Sent Events 로 보낸다. done/failed 이벤트 후 닫힌다."""
+    return StreamingResponse(
+        _iter_progress_events(vod_id, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _iter_progress_events(
+    vod_id: str,
+    request: Request,
+    heartbeat_sec: float = PROGRESS_HEARTBEAT_SEC,
+    max_sec: float = PROGRESS_STREAM_MAX_SEC,
+) -> AsyncIterator[str]:
+    """이벤트 루프에서 기다리는 SSE 생성기 (연결마다 스레드풀 스레드를 잡지 않는다).
+
+    heartbeat 마다 연결이 끊겼는지 확인해 닫힌 탭의 구독을 정리한다.
+    """
+    subscription = progress_broker.subscribe_async(vod_id)
+    deadline = time.monotonic() + max_sec
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or await request.is_disconnected():
+                return
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=min(heartbeat_sec, remaining))
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: progress\ndata: {event.model_dump_json()}\n\n"
+            if event.stage in TERMINAL_STAGES:
+                return
+    finally:
+        progress_broker.unsubscribe(vod_id, subscription)
+
+
+@app.post("/api/jobs/analyze", response_model=AnalyzeJobStatus, status_code=202)
+def submit_analyze_job(payload: AnalyzeRequest) -> AnalyzeJobStatus:
+    """분석을 백그라운드 작업으로 제출하고 바로 작업 id 를 돌려준다 (같은 요청이 진행 중이면 그 작업)."""
+    logger.info(
+        "Analyze job request received: vod_id=%s, keywords=%s, bucket=%s",
+        payload.source.vod_id,
+        payload.keywords,
+        payload.options.bucket_size_seconds,
+    )
+    return analysis_jobs.submit(
+        payload.source.vod_id,
+        canonical_request(payload),
+        lambda: _cached_analysis(payload, context="Job", key=_analysis_result_key(payload))[1],
+    )
+
+
+@app.get("/api/jobs/{job_id}", response_model=AnalyzeJobStatus)
+def analyze_job_status(job_id: str) -> AnalyzeJobStatus:
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job_not_found")
+    return job.describe()
+
+
+@app.get("/api/jobs/{job_id}/result", response_model=AnalyzeResponse)
+def analyze_job_result(job_id: str) -> AnalyzeResponse:
+    """끝난 작업의 결과. 실패한 작업은 동기 /api/analyze 와 같은 상태 코드/detail, 진행 중이면 409."""
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job_not_found")
+    if job.status == "failed":
+        raise HTTPException(status_code=job.error_status, detail=job.error_detail)
+    if job.result is None:
+        raise HTTPException(status_code=409, detail=f"job_not_finished: {job.status}")
+    return job.result
+
+
 if (FRONTEND_DIST_DIR / "assets").exists():
     app.mount("/assets", StaticFiles(directory=str(FRONTEND_DIST_DIR / "assets")), name="assets")
 
@@ -105,229 +243,595 @@ def spa_fallback(full_path: str) -> FileResponse:
     return FileResponse(index_path)
 
 
+def _run_analysis(payload: AnalyzeRequest, context: str) -> AnalyzeResponse:
+    """로그 파싱 + 분석을 수행한다. context 는 로그 메시지 구분용 ("Analyze"/"Export")."""
+    return _analysis_response(_analysis_sections(payload, context))
+
+
+def _analysis_sections(payload: AnalyzeRequest, context: str) -> Iterator[AnalysisSection]:
+    """`_run_analysis` 의 섹션 생성기. AnalyzeResponse 필드 이름으로 summary → volume_series →
+    highlights → keyword_series(압축 형태면 keyword_series_columnar/sparse) → parse_errors → message
+    순서로 낸다. 수집/파싱/집계는 첫 섹션을 꺼낼 때 끝나며 오류는 HTTPException 으로 올라온다.
+    """
+    sections: Iterator[AnalysisSection] | None = None
+    if prefers_streaming(payload.source):
+        parse_errors: list[ParseErrorItem] = []
+        sections = iter_analysis_streaming(
+            records=iter_chat_records(payload.source, parse_errors),
+            keywords=payload.keywords,
+            options=payload.options,
+            keyword_series_format=payload.keyword_series_format,
+        )
+        try:
+            first = next(sections)
+        except UnorderedLogError as exc:
+            logger.warning("Streaming analysis fell back to full parse: vod_id=%s reason=%s", payload.source.vod_id, exc)
+            sections = None
+        except Exception as exc:
+            raise _analysis_error(exc, context, "streaming analysis") from exc
+        else:
+            # 파싱과 집계가 한 패스로 끝났다: 남은 섹션(하이라이트/키워드 시계열) 단계는 전체 파싱 경로와 같게 알린다
+            publish_progress(payload.source.vod_id, "analyze")
+
+    if sections is None:
+        try:
+            messages, parse_errors = parse_chat_logs(payload.source)
+        except Exception as exc:
+            raise _analysis_error(exc, context, "parsing chat logs") from exc
+
+        publish_progress(payload.source.vod_id, "analyze")
+        sections = iter_analysis(
+            messages=messages,
+            keywords=payload.keywords,
+            options=payload.options,
+            keyword_series_format=payload.keyword_series_format,
+        )
+        try:
+            first = next(sections)
+        except Exception as exc:
+            raise _analysis_error(exc, context, "building analysis") from exc
+
+    try:
+        yield from _response_fields(chain([first], sections), parse_errors)
+    except Exception as exc:
+        raise _analysis_error(exc, context, "building analysis") from exc
+
+
+def _response_fields(
+    sections: Iterable[AnalysisSection], parse_errors: list[ParseErrorItem]
+) -> Iterator[AnalysisSection]:
+    """분석 섹션을 AnalyzeResponse 필드 이름으로 바꾸고 parse_errors / message 를 붙인다."""
+    total_messages = 0
+    for name, value in sections:
+        if name == "summary":
+            total_messages = value.total_messages
+        elif isinstance(value, KeywordSeriesColumnar):
+            name = "keyword_series_columnar"
+        elif isinstance(value, KeywordSeriesSparse):
+            name = "keyword_series_sparse"
+        yield name, value
+    yield "parse_errors", parse_errors
+    yield "message", "ok" if total_messages else "no_messages"
+
+
+def _analyze_log_file(
+    payload: AnalyzeRequest, log_path: str
+) -> tuple[AnalyzeResponse, MessageStore, list[ParseErrorItem], str, bool]:
+    """배치 워커 프로세스: 로그 하나를 사이드카에서 읽거나 파싱해 분석한다.
+
+    캐시/사이드카/진행 이벤트는 건드리지 않고 (응답, 저장소, parse_errors, 로그 지문, 새로 파싱했는지)
+    를 돌려준다. 부모가 그 값으로 캐시를 채운다. 오류는 변환하지 않고 그대로 올려 부모가 상태 코드로 바꾼다.
+    """
+    path = Path(log_path)
+    fingerprint = log_fingerprint(path)
+    loaded = load_sidecar(path, fingerprint)
+    messages, parse_errors = loaded if loaded is not None else parse_log_file(path, parallel=False)
+    sections = iter_analysis(
+        messages=messages,
+        keywords=payload.keywords,
+        options=payload.options,
+        keyword_series_format=payload.keyword_series_format,
+    )
+    analyzed = _analysis_response(_response_fields(sections, parse_errors))
+    return analyzed, messages, parse_errors, fingerprint, loaded is None
+
+
+def _analysis_error(exc: Exception, context: str, step: str) -> HTTPException:
+    if isinstance(exc, ValueError):
+        logger.warning("%s request validation failed: %s", context, exc)
+        return HTTPException(status_code=400, detail=str(exc))
+    logger.exception("Unexpected error while %s (%s)", step, context)
+    return HTTPException(status_code=500, detail=f"internal_error: {exc}")
+
+
+def _analysis_response(sections: Iterable[AnalysisSection]) -> AnalyzeResponse:
+    # 압축 형태를 요청했으면 keyword_series 는 빈 목록으로 두고 해당 필드에 담는다
+    return AnalyzeResponse(**{"keyword_series": [], **dict(sections)})
+
+
+def _response_sections(analyzed: AnalyzeResponse) -> Iterator[AnalysisSection]:
+    """캐시된 응답을 `_analysis_sections` 와 같은 순서/이름의 섹션으로 나눈다."""
+    yield "summary", analyzed.summary
+    yield "volume_series", analyzed.volume_series
+    yield "highlights", analyzed.highlights
+    if analyzed.keyword_series_columnar is not None:
+        yield "keyword_series_columnar", analyzed.keyword_series_columnar
+    elif analyzed.keyword_series_sparse is not None:
+        yield "keyword_series_sparse", analyzed.keyword_series_sparse
+    else:
+        yield "keyword_series", analyzed.keyword_series
+    yield "parse_errors", analyzed.parse_errors
+    yield "message", analyzed.message
+
+
+def _analysis_result_key(payload: AnalyzeRequest) -> str | None:
+    """캐시된 로그가 있으면 결과 캐시 키 (ETag 로도 쓴다). 아직 수집 전이면 None."""
+    try:
+        fingerprint = log_fingerprint(get_chatlog_cache_path(payload.source.vod_id))
+    except OSError:
+        return None
+    return analysis_result_key(payload, fingerprint)
+
+
+def _cached_analysis(payload: AnalyzeRequest, context: str, key: str | None) -> tuple[str | None, AnalyzeResponse]:
+    """결과 캐시를 거친 `_run_analysis`. key 가 None 이면 (로그 수집 전) 분석 후 다시 구해 저장한다.
+
+    반환된 AnalyzeResponse 는 캐시와 공유되므로 수정하지 않는다.
+    """
+    cached = _cached_result(payload.source.vod_id, key)
+    if cached is not None:
+        return key, cached
+
+    try:
+        analyzed = _run_analysis(payload, context=context)
+    except HTTPException as exc:
+        publish_progress(payload.source.vod_id, "failed", detail=str(exc.detail))
+        raise
+    return _store_result(payload, key, analyzed), analyzed
+
+
+def _cached_result(vod_id: str, key: str | None) -> AnalyzeResponse | None:
+    if key is None:
+        return None
+    cached = analysis_result_cache.get(vod_id, key)
+    if cached is not None:
+        publish_progress(vod_id, "done", messages=cached.summary.total_messages)
+    return cached
+
+
+def _store_result(payload: AnalyzeRequest, key: str | None, analyzed: AnalyzeResponse) -> str | None:
+    vod_id = payload.source.vod_id
+    # 수집 실패는 파서가 이미 failed 를 알렸다 (응답은 200 + parse_errors)
+    if not any(item.reason == "auto_fetch_failed" for item in analyzed.parse_errors):
+        publish_progress(vod_id, "done")
+    if key is None:
+        # 이번 요청이 로그를 새로 수집했으면 그 로그 기준으로 저장한다 (수집 실패면 여전히 None)
+        key = _analysis_result_key(payload)
+    if key is not None:
+        analysis_result_cache.put(vod_id, key, analyzed)
+    return key
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
 @app.post("/api/analyze", response_model=AnalyzeResponse)
-def analyze(payload: AnalyzeRequest) -> AnalyzeResponse:
+def analyze(payload: AnalyzeRequest, request: Request, response: Response) -> AnalyzeResponse | Response:
     logger.info(
         "Analyze request received: vod_id=%s, keywords=%s, bucket=%s",
         payload.source.vod_id,
         payload.keywords,
         payload.options.bucket_size_seconds,
     )
+    # 키에 로그 지문이 들어가므로 키가 같으면 결과도 같다 → 분석 없이 304
+    key = _analysis_result_key(payload)
+    if key is not None and _etag_matches(request.headers.get("if-none-match"), f'"{key}"'):
+        logger.info("Analyze not modified: vod_id=%s, etag=%s", payload.source.vod_id, key)
+        return Response(status_code=304, headers={"ETag": f'"{key}"'})
+
+    key, analyzed = _cached_analysis(payload, context="Analyze", key=key)
+    if key is not None:
+        response.headers["ETag"] = f'"{key}"'
+
+    logger.info(
+        "Analyze result: vod_id=%s, messages=%s, parse_errors=%s, highlights=%s",
+        payload.source.vod_id,
+        analyzed.summary.total_messages,
+        len(analyzed.parse_errors),
+        len(analyzed.highlights),
+    )
+    return analyzed
+
+
+@app.post("/api/analyze/stream")
+def analyze_stream(payload: AnalyzeRequest) -> StreamingResponse:
+    """/api/analyze 와 같은 결과를 준비되는 섹션부터 NDJSON 한 줄씩 보낸다 (opt-in).
+
+    summary / volume_series 는 집계 직후, 그다음 highlights, 큰 keyword_series 와 parse_errors 는
+    마지막에 보내 차트를 전체 응답보다 먼저 그릴 수 있다. 수집/파싱/검증 오류는 응답을 시작하기
+    전이므로 /api/analyze 와 같은 상태 코드로 돌려준다.
+    """
+    vod_id = payload.source.vod_id
+    logger.info(
+        "Analyze stream request received: vod_id=%s, keywords=%s, bucket=%s",
+        vod_id,
+        payload.keywords,
+        payload.options.bucket_size_seconds,
+    )
+    key = _analysis_result_key(payload)
+    cached = _cached_result(vod_id, key)
+    if cached is not None:
+        sections = _response_sections(cached)
+    else:
+        sections = _analysis_sections(payload, context="AnalyzeStream")
+        try:
+            first = next(sections)
+        except HTTPException as exc:
+            publish_progress(vod_id, "failed", detail=str(exc.detail))
+            raise
+        sections = _store_streamed_sections(payload, key, chain([first], sections))
+    # 분석 전에 로그가 있던 요청만 키를 안다 (/api/analyze 와 같은 ETag, 이 스트림은 304 를 주지 않는다)
+    headers = {"ETag": f'"{key}"'} if key is not None else None
+    return StreamingResponse(
+        _iter_section_lines(vod_id, sections), media_type="application/x-ndjson", headers=headers
+    )
+
+
+def _store_streamed_sections(
+    payload: AnalyzeRequest, key: str | None, sections: Iterator[AnalysisSection]
+) -> Iterator[AnalysisSection]:
+    """섹션을 그대로 내보내면서 모아 두었다가, 끝까지 보내면 결과 캐시에 저장한다."""
+    collected: list[AnalysisSection] = []
+    try:
+        for section in sections:
+            collected.append(section)
+            yield section
+    except HTTPException as exc:
+        publish_progress(payload.source.vod_id, "failed", detail=str(exc.detail))
+        raise
+    _store_result(payload, key, _analysis_response(collected))
+
+
+def _iter_section_lines(vod_id: str, sections: Iterator[AnalysisSection]) -> Iterator[bytes]:
+    started = time.perf_counter()
+    try:
+        for name, value in sections:
+            data = _SECTION_ADAPTERS[name].dump_json(value)
+            yield b'{"section":"' + name.encode("ascii") + b'","data":' + data + b"}\n"
+            logger.info(
+                "Analyze stream section sent: vod_id=%s section=%s bytes=%s elapsed=%.3fs",
+                vod_id,
+                name,
+                len(data),
+                time.perf_counter() - started,
+            )
+    except HTTPException as exc:
+        # 이미 200 으로 응답을 시작했으므로 오류는 마지막 줄로 알린다
+        detail = json.dumps(str(exc.detail), ensure_ascii=False)
+        yield f'{{"section":"error","status":{exc.status_code},"detail":{detail}}}\n'.encode("utf-8")
+
+
+@app.post("/api/analyze/batch")
+def analyze_batch(payload: BatchAnalyzeRequest) -> StreamingResponse:
+    """여러 AnalyzeRequest 를 분석 작업 대기열에서 분석하고, 끝나는 순서대로 NDJSON 한 줄씩 보낸다."""
+    logger.info(
+        "Batch analyze request received: requests=%s, vod_ids=%s",
+        len(payload.requests),
+        [item.source.vod_id for item in payload.requests],
+    )
+    return StreamingResponse(_iter_batch_results(payload.requests), media_type="application/x-ndjson")
+
+
+def _batch_line(index: int, vod_id: str, status: int, body: AnalyzeResponse | str) -> str:
+    head = f'{{"index":{index},"vod_id":{json.dumps(vod_id)},"status":{status},'
+    if isinstance(body, AnalyzeResponse):
+        return f'{head}"result":{body.model_dump_json()}}}\n'
+    return f'{head}"detail":{json.dumps(body, ensure_ascii=False)}}}\n'
+
+
+def _iter_batch_results(requests: list[AnalyzeRequest]) -> Iterator[str]:
+    """캐시된 VOD 는 바로, 캐시에 없는 VOD 는 수집 전용 스레드 하나에서 순서대로 받은 뒤
+    (동시 수집으로 Chzzk 429 를 유발하지 않도록) 분석한다. 결과는 완료 순서로 내보낸다.
+
+    파싱+분석은 CPU 수만큼의 프로세스 풀에서 돌아 대화형 요청과 GIL 을 다투지 않는다. 워커는 캐시를
+    건드리지 않고 (결과, MessageStore, parse_errors) 를 돌려주며, 부모가 결과 캐시, 사이드카, 파싱 결과
+    LRU 를 채운다. analysis_jobs 는 /api/jobs/analyze 와의 중복 제거와 결과 보관에만 쓴다.
+    각 항목의 로그는 그 항목이 끝날 때까지 pin_log 로 고정해 뒤 항목의 수집이 부른 prune 이 먼저 받은
+    로그를 지우지 않게 한다.
+    """
+    completed: queue.Queue[tuple[int, int, AnalyzeResponse | str]] = queue.Queue()
+    started = time.perf_counter()
+    workers = max(min(BATCH_ANALYZE_PROCESSES, len(requests)), 1)
+    logger.info("Batch analyze start: requests=%s processes=%s", len(requests), workers)
+
+    paths = [get_chatlog_cache_path(item.source.vod_id) for item in requests]
+    for path in paths:
+        pin_log(path)
+    fetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch-fetch")
+    pool = ProcessPoolExecutor(max_workers=workers)
+    fetches: dict[int, Future] = {}
+    closed = threading.Event()
+
+    def finish(index: int, status: int, body: AnalyzeResponse | str) -> None:
+        unpin_log(paths[index])
+        completed.put((index, status, body))
+
+    def start(index: int, item: AnalyzeRequest, key: str | None) -> Future:
+        vod_id = item.source.vod_id
+        publish_progress(vod_id, "parse")
+        analyzed: Future = Future()
+
+        def store(done: Future) -> None:
+            # 풀의 관리 스레드에서 실행된다: 워커 결과로 이 프로세스의 캐시들을 채운다
+            try:
+                response, messages, parse_errors, fingerprint, parsed = done.result()
+            except Exception as exc:
+                error = _analysis_error(exc, "Batch", "analyzing in worker process")
+                publish_progress(vod_id, "failed", detail=str(error.detail))
+                analyzed.set_exception(error)
+                return
+            try:
+                remember_parsed_log(paths[index], vod_id, fingerprint, messages, parse_errors, write=parsed)
+                _store_result(item, key, response)
+            except Exception:
+                logger.exception("Failed to store batch result: vod_id=%s", vod_id)
+            analyzed.set_result(response)
+
+        pool.submit(_analyze_log_file, item, str(paths[index])).add_done_callback(store)
+        return analyzed
+
+    def submit(index: int, item: AnalyzeRequest) -> None:
+        key = _analysis_result_key(item)
+        cached = _cached_result(item.source.vod_id, key)
+        if cached is not None:
+            finish(index, 200, cached)
+            return
+
+        def finished(job: AnalysisJob) -> None:
+            if job.result is not None:
+                finish(index, 200, job.result)
+            else:
+                finish(index, job.error_status, job.error_detail)
+
+        analysis_jobs.submit_future(
+            item.source.vod_id,
+            canonical_request(item),
+            lambda: start(index, item, key),
+            on_finished=finished,
+        )
+
+    def fetch_then_submit(index: int, item: AnalyzeRequest) -> None:
+        try:
+            resolve_source_files(item.source)
+        except Exception as exc:
+            finish(index, 502, str(exc))
+            return
+        if closed.is_set():
+            # 클라이언트가 끊겼다: 받은 로그는 캐시에 남기고 분석은 시작하지 않는다
+            unpin_log(paths[index])
+            return
+        submit(index, item)
+
+    try:
+        for index, item in enumerate(requests):
+            if paths[index].exists():
+                submit(index, item)
+            else:
+                fetches[index] = fetcher.submit(fetch_then_submit, index, item)
+
+        status_counts: dict[int, int] = {}
+        for _ in requests:
+            index, status, body = completed.get()
+            status_counts[status] = status_counts.get(status, 0) + 1
+            yield _batch_line(index, requests[index].source.vod_id, status, body)
+    finally:
+        # 클라이언트가 끊겨도 남은 수집은 시작하지 않는다 (이미 넣은 분석은 끝나 결과 캐시에 남는다)
+        closed.set()
+        fetcher.shutdown(wait=False, cancel_futures=True)
+        pool.shutdown(wait=False)
+        for index, future in fetches.items():
+            if future.cancelled():
+                unpin_log(paths[index])
+
+    logger.info(
+        "Batch analyze finished: requests=%s statuses=%s elapsed=%.3fs",
+        len(requests),
+        status_counts,
+        time.perf_counter() - started,
+    )
+
+
+@app.post("/api/sweep", response_model=SweepResponse)
+def sweep(payload: SweepRequest) -> SweepResponse:
+    """버킷 크기 × min_highlight_score × max_merge_buckets 격자의 하이라이트를 한 번의 파싱/집계로 구한다."""
+    logger.info(
+        "Sweep request received: vod_id=%s, keywords=%s, buckets=%s, scores=%s, merges=%s",
+        payload.source.vod_id,
+        payload.keywords,
+        payload.bucket_sizes_seconds,
+        payload.min_highlight_scores,
+        payload.max_merge_buckets,
+    )
     try:
         messages, parse_errors = parse_chat_logs(payload.source)
     except ValueError as exc:
-        logger.warning("Analyze request validation failed: %s", exc)
+        logger.warning("Sweep request validation failed: %s", exc)
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:
-        logger.exception("Unexpected error while parsing chat logs")
+        logger.exception("Unexpected error while parsing chat logs (Sweep)")
         raise HTTPException(status_code=500, detail=f"internal_error: {exc}") from exc
 
+    started = time.perf_counter()
     try:
-        summary, volume_series, keyword_series, highlights = build_analysis(
-            messages=messages,
+        combinations = build_highlight_sweep(
+            messages,
             keywords=payload.keywords,
             options=payload.options,
+            bucket_sizes_seconds=payload.bucket_sizes_seconds,
+            min_highlight_scores=payload.min_highlight_scores,
+            max_merge_buckets=payload.max_merge_buckets,
         )
+    except ValueError as exc:
+        logger.warning("Sweep request validation failed: %s", exc)
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:
-        logger.exception("Unexpected error while building analysis")
+        logger.exception("Unexpected error while building highlight sweep")
         raise HTTPException(status_code=500, detail=f"internal_error: {exc}") from exc
 
     logger.info(
-        "Analyze result: vod_id=%s, messages=%s, parse_errors=%s, highlights=%s",
+        "Sweep result: vod_id=%s, messages=%s, combinations=%s, elapsed=%.3fs",
         payload.source.vod_id,
         len(messages),
-        len(parse_errors),
-        len(highlights),
+        len(combinations),
+        time.perf_counter() - started,
     )
-
-    return AnalyzeResponse(
-        summary=summary,
-        volume_series=volume_series,
-        keyword_series=keyword_series,
-        highlights=highlights,
+    return SweepResponse(
+        total_messages=len(messages),
+        combinations=combinations,
         parse_errors=parse_errors,
         message="ok" if messages else "no_messages",
     )
 
 
-@app.post("/api/export")
-def export_analysis(payload: ExportRequest) -> StreamingResponse:
+@app.post("/api/search", response_model=SearchResponse)
+def search(payload: SearchRequest) -> SearchResponse:
+    """검색어별 버킷 횟수를 역색인으로 구한다. 역색인은 첫 검색 때 만들어 로그 옆에 저장한다."""
     logger.info(
-        "Export request received: vod_id=%s, format=%s, dataset=%s",
-        payload.analysis.source.vod_id,
-        payload.format,
-        payload.dataset,
+        "Search request received: vod_id=%s, terms=%s, bucket=%s",
+        payload.source.vod_id,
+        payload.terms,
+        payload.options.bucket_size_seconds,
     )
     try:
-        messages, parse_errors = parse_chat_logs(payload.analysis.source)
+        messages, parse_errors = parse_chat_logs(payload.source)
     except ValueError as exc:
-        logger.warning("Export request validation failed: %s", exc)
+        logger.warning("Search request validation failed: %s", exc)
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:
-        logger.exception("Unexpected error while parsing chat logs for export")
+        logger.exception("Unexpected error while parsing chat logs (Search)")
         raise HTTPException(status_code=500, detail=f"internal_error: {exc}") from exc
 
+    if not messages:
+        return SearchResponse(results=[], parse_errors=parse_errors, message="no_messages")
+
+    options = payload.options
     try:
-        summary, volume_series, keyword_series, highlights = build_analysis(
-            messages=messages,
-            keywords=payload.analysis.keywords,
-            options=payload.analysis.options,
+        index = get_token_index(
+            messages,
+            get_chatlog_cache_path(payload.source.vod_id),
+            case_sensitive=options.keyword_options.case_sensitive,
+            normalize=options.normalize_repeated_reactions,
+            contents=lambda: normalized_contents(messages, options),
         )
+        results = search_terms(
+            messages,
+            index,
+            payload.terms,
+            options,
+            include_occurrences=payload.include_occurrences,
+            max_occurrences=payload.max_occurrences,
+        )
+    except ValueError as exc:
+        logger.warning("Search request validation failed: %s", exc)
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:
-        logger.exception("Unexpected error while building analysis for export")
+        logger.exception("Unexpected error while searching terms")
         raise HTTPException(status_code=500, detail=f"internal_error: {exc}") from exc
 
-    analyzed = AnalyzeResponse(
-        summary=summary,
-        volume_series=volume_series,
-        keyword_series=keyword_series,
-        highlights=highlights,
-        parse_errors=parse_errors,
-        message="ok" if messages else "no_messages",
+    logger.info(
+        "Search result: vod_id=%s, messages=%s, terms=%s, matched=%s",
+        payload.source.vod_id,
+        len(messages),
+        len(results),
+        sum(result.total_count for result in results),
     )
+    return SearchResponse(results=results, parse_errors=parse_errors, message="ok")
 
-    if payload.format == "json":
-        logger.info("Export json success: vod_id=%s, dataset=%s", payload.analysis.source.vod_id, payload.dataset)
-        return _export_json(analyzed=analyzed, dataset=payload.dataset)
 
-    logger.info("Export csv success: vod_id=%s, dataset=%s", payload.analysis.source.vod_id, payload.dataset)
-    return _export_csv(analyzed=analyzed, dataset=payload.dataset)
+def _message_window(payload: MessagesRequest, context: str) -> tuple[MessageStore, list[ParseErrorItem], int, int]:
+    """파싱한 메시지와 요청 구간의 인덱스 범위 [start, stop) (cursor 적용 전)."""
+    try:
+        messages, parse_errors = parse_chat_logs(payload.source)
+    except Exception as exc:
+        raise _analysis_error(exc, context, "parsing chat logs") from exc
+    start, stop = message_window(messages, payload.start_offset_sec, payload.end_offset_sec)
+    logger.info(
+        "%s window: vod_id=%s, range=[%s, %s), messages=%s, cursor=%s",
+        context,
+        payload.source.vod_id,
+        payload.start_offset_sec,
+        payload.end_offset_sec,
+        stop - start,
+        payload.cursor,
+    )
+    return messages, parse_errors, start, stop
+
+
+@app.post("/api/messages", response_model=MessagesResponse)
+def list_messages(payload: MessagesRequest) -> MessagesResponse:
+    """VOD 재생 위치 구간의 원본 채팅을 cursor / limit 페이지로 돌려준다."""
+    messages, parse_errors, start, stop = _message_window(payload, "Messages")
+    page_start = min(start + payload.cursor, stop)
+    page_stop = min(page_start + payload.limit, stop)
+    return MessagesResponse(
+        messages=raw_messages(messages, page_start, page_stop),
+        total=stop - start,
+        next_cursor=page_stop - start if page_stop < stop else None,
+        parse_errors=parse_errors,
+        message="ok" if messages else "no_messages",
+    )
 
 
-def _export_json(analyzed: AnalyzeResponse, dataset: str) -> StreamingResponse:
-    data = _dataset_payload(analyzed=analyzed, dataset=dataset)
-    file_name = f"analysis-{dataset}.json"
-    body = json.dumps(data, ensure_ascii=False, indent=2)
+@app.post("/api/messages/stream")
+def stream_messages(payload: MessagesRequest) -> StreamingResponse:
+    """/api/messages 와 같은 구간을 cursor 부터 끝까지 RawMessage 한 줄씩의 NDJSON 으로 보낸다."""
+    messages, _, start, stop = _message_window(payload, "Messages stream")
     return StreamingResponse(
-        io.BytesIO(body.encode("utf-8")),
-        media_type="application/json",
-        headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+        iter_message_lines(messages, min(start + payload.cursor, stop), stop),
+        media_type="application/x-ndjson",
+        headers={"X-Total-Count": str(stop - start)},
     )
 
 
-def _export_csv(analyzed: AnalyzeResponse, dataset: str) -> StreamingResponse:
-    if dataset == "all":
-        raise HTTPException(status_code=400, detail="csv export는 dataset=all을 지원하지 않습니다.")
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    if dataset == "summary":
-        writer.writerow(
-            [
-                "total_messages",
-                "unique_users",
-                "start_time",
-                "end_time",
-                "vod_duration_sec",
-                "vod_duration_label",
-                "avg_messages_per_minute",
-            ]
-        )
-        writer.writerow(
-            [
-                analyzed.summary.total_messages,
-                analyzed.summary.unique_users,
-                analyzed.summary.start_time,
-                analyzed.summary.end_time,
-                analyzed.summary.vod_duration_sec,
-                analyzed.summary.vod_duration_label,
-                analyzed.summary.avg_messages_per_minute,
-            ]
-        )
-    elif dataset == "highlights":
-        writer.writerow(
-            [
-                "start",
-                "start_offset_sec",
-                "start_offset_label",
-                "end",
-                "end_offset_sec",
-                "end_offset_label",
-                "score",
-                "peak_bucket",
-                "peak_offset_sec",
-                "peak_offset_label",
-                "peak_total_messages",
-                "representative_keyword",
-            ]
-        )
-        for row in analyzed.highlights:
-            writer.writerow(
-                [
-                    row.start,
-                    row.start_offset_sec,
-                    row.start_offset_label,
-                    row.end,
-                    row.end_offset_sec,
-                    row.end_offset_label,
-                    row.score,
-                    row.peak_bucket,
-                    row.peak_offset_sec,
-                    row.peak_offset_label,
-                    row.peak_total_messages,
-                    row.representative_keyword,
-                ]
-            )
-    elif dataset == "volume":
-        writer.writerow(
-            [
-                "bucket_start",
-                "bucket_start_offset_sec",
-                "bucket_start_offset_label",
-                "total_messages",
-                "unique_users",
-            ]
-        )
-        for row in analyzed.volume_series:
-            writer.writerow(
-                [
-                    row.bucket_start,
-                    row.bucket_start_offset_sec,
-                    row.bucket_start_offset_label,
-                    row.total_messages,
-                    row.unique_users,
-                ]
-            )
-    elif dataset == "keywords":
-        writer.writerow(
-            [
-                "bucket_start",
-                "bucket_start_offset_sec",
-                "bucket_start_offset_label",
-                "keyword",
-                "count",
-            ]
-        )
-        for row in analyzed.keyword_series:
-            writer.writerow(
-                [
-                    row.bucket_start,
-                    row.bucket_start_offset_sec,
-                    row.bucket_start_offset_label,
-                    row.keyword,
-                    row.count,
-                ]
-            )
-    elif dataset == "parse_errors":
-        writer.writerow(["file_path", "line_number", "reason", "raw_line"])
-        for row in analyzed.parse_errors:
-            writer.writerow([row.file_path, row.line_number, row.reason, row.raw_line])
+@app.post("/api/export")
+def export_analysis(payload: ExportRequest) -> StreamingResponse:
+    """분석 결과(또는 원본 메시지)를 파일로 내보낸다. 본문은 행 묶음 단위로 만들며 보낸다."""
+    logger.info(
+        "Export request received: vod_id=%s, format=%s, dataset=%s",
+        payload.analysis.source.vod_id,
+        payload.format,
+        payload.dataset,
+    )
+    analyzed = messages = None
+    if payload.dataset == "messages":
+        try:
+            messages, _ = parse_chat_logs(payload.analysis.source)
+        except Exception as exc:
+            raise _analysis_error(exc, "Export", "parsing chat logs") from exc
     else:
-        raise HTTPException(status_code=400, detail="지원하지 않는 dataset입니다.")
+        # 내보내기 데이터셋은 기존 keyword_series 행 형태를 쓴다
+        analysis = payload.analysis.model_copy(update={"keyword_series_format": "dense"})
+        _, analyzed = _cached_analysis(analysis, context="Export", key=_analysis_result_key(analysis))
 
-    file_name = f"analysis-{dataset}.csv"
+    try:
+        export = export_stream(payload.format, payload.dataset, analyzed=analyzed, messages=messages)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except ParquetUnavailableError as exc:
+        logger.warning("Export unavailable: %s", exc)
+        raise HTTPException(status_code=501, detail=str(exc)) from exc
+
+    logger.info(
+        "Export %s success: vod_id=%s, dataset=%s", payload.format, payload.analysis.source.vod_id, payload.dataset
+    )
     return StreamingResponse(
-        io.BytesIO(output.getvalue().encode("utf-8-sig")),
-        media_type="text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+        export.chunks,
+        media_type=export.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{export.file_name}"'},
     )
 
 
-def _dataset_payload(analyzed: AnalyzeResponse, dataset: str) -> dict | list:
-    model_dump = analyzed.model_dump(mode="json")
-    if dataset == "all":
-        return model_dump
-    if dataset not in model_dump:
-        raise HTTPException(status_code=400, detail="지원하지 않는 dataset입니다.")
-    return model_dump[dataset]
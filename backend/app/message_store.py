@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import operator
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Callable, Hashable, Iterable, Iterator, Tuple
+
+from .schemas import ChatMessage
+
+
+# 모든 오프셋은 이 기준점(naive 1970-01-01)으로부터의 초 단위 정수다.
+# playerMessageTime 기반 로그는 오프셋이 그대로 VOD 재생 위치가 된다.
+_EPOCH = datetime(1970, 1, 1, 0, 0, 0)
+# 오프셋 열(int64) 의 범위. datetime 이 표현하는 0001~9999년이 모두 들어간다
+OFFSET_MIN = -(2**63)
+OFFSET_MAX = 2**63 - 1
+
+# 파서가 yield 하는 메시지 한 건: (offset_sec, nickname, content, user_id_hash)
+ChatRecord = Tuple[int, str, str, str]
+
+
+def offset_to_datetime(offset_sec: int) -> datetime:
+    # .timestamp()/fromtimestamp() 은 Windows에서 1970년 근처에 OSError → timedelta 사용
+    return _EPOCH + timedelta(seconds=offset_sec)
+
+
+def datetime_to_offset(ts: datetime) -> int:
+    delta = ts - _EPOCH
+    return delta.days * 86400 + delta.seconds
+
+
+def _remap(codes: array, mapping: list[int]) -> array:
+    # 첫 저장소처럼 매핑이 항등이면 복사만 한다
+    if all(index == code for index, code in enumerate(mapping)):
+        return codes
+    return array(codes.typecode, map(mapping.__getitem__, codes))
+
+
+# 인터프리터가 공유하는 작은 정수(-5~256)는 목록이 포인터만 가지므로 원소 크기를 따로 세지 않는다
+_SHARED_INTS = frozenset(range(-5, 257))
+# 2**30 미만 정수/실수 객체 하나의 크기 (집계 열의 값은 모두 이 범위다)
+_INT_BYTES = sys.getsizeof(2**29)
+_FLOAT_BYTES = sys.getsizeof(0.5)
+_SCALAR_TYPES = frozenset({int, float, str, bytes, bool, type(None)})
+
+
+def deep_nbytes(value: object) -> int:
+    """파생 열 값이 실제로 차지하는 바이트 수 (중첩 컨테이너와 원소 포함).
+
+    numpy 배열/TokenIndex 처럼 nbytes 를 가진 값은 그 값을, list/tuple/dict 는 컨테이너와 원소를
+    모두 센다. 버킷 × 키워드 크기의 정수/실수 목록은 원소마다 getsizeof 를 부르지 않고 C 루프로
+    공유 정수만 걸러 센다. 여러 열이 공유하는 객체(키워드 문자열 등)는 중복으로 센다.
+    """
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, (list, tuple)):
+        size = sys.getsizeof(value)
+        types = set(map(type, value))
+        if types <= {int}:
+            return size + _INT_BYTES * (len(value) - sum(map(_SHARED_INTS.__contains__, value)))
+        if types <= {float}:
+            return size + _FLOAT_BYTES * len(value)
+        if types <= _SCALAR_TYPES:
+            return size + sum(map(sys.getsizeof, value))
+        return size + sum(map(deep_nbytes, value))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(map(deep_nbytes, value.keys())) + sum(map(deep_nbytes, value.values()))
+    return sys.getsizeof(value)
+
+
+class DerivedColumns(dict):
+    """MessageStore.derived 용 dict. 값의 크기를 키별로 기억하고, 대입/삭제로 크기가 바뀌면
+    `on_resize(delta)` 로 알린다 (파싱 결과 LRU 가 저장소를 다시 과금한다).
+
+    값을 제자리에서 바꾼 경우(단계 캐시의 OrderedDict 등)에는 `charge(key, delta)` 로 변화량을 알린다.
+    크기 추적은 `[]` 대입, `del`, `clear()` 만 거친다.
+    """
+
+    __slots__ = ("_sizes", "on_resize")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._sizes: dict[Hashable, int] = {}
+        self.on_resize: Callable[[int], None] | None = None
+
+    def __setitem__(self, key: Hashable, value: object) -> None:
+        super().__setitem__(key, value)
+        self.charge(key, deep_nbytes(value) - self._sizes.get(key, 0))
+
+    def __delitem__(self, key: Hashable) -> None:
+        super().__delitem__(key)
+        self._resize(-self._sizes.pop(key, 0))
+
+    def clear(self) -> None:
+        super().clear()
+        freed = sum(self._sizes.values())
+        self._sizes.clear()
+        self._resize(-freed)
+
+    def charge(self, key: Hashable, delta: int) -> None:
+        """key 의 값을 제자리에서 바꿔 크기가 delta 만큼 변했음을 기록한다."""
+        if key not in self:
+            # 그 사이 지워진 값이면 이미 크기를 돌려받았다
+            return
+        self._sizes[key] = self._sizes.get(key, 0) + delta
+        self._resize(delta)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def _resize(self, delta: int) -> None:
+        on_resize = self.on_resize
+        if delta and on_resize is not None:
+            on_resize(delta)
+
+
+class MessageStore:
+    """파싱된 채팅 메시지를 열(column) 단위로 보관하는 컴팩트 저장소.
+
+    메시지 하나당 pydantic 객체 대신 다음 열을 유지한다.
+    - offsets: int64 오프셋(초, 1970-01-01 기준)
+    - user_codes / nickname_codes: 인턴된 문자열 테이블의 int32 인덱스
+    - content_text + content_ends: 모든 본문을 이어붙인 단일 문자열과 끝 위치
+
+    `ChatMessage` 는 API 경계에서 필요할 때만 `to_chat_messages()` 로 만든다.
+
+    `derived` 는 분석기가 이 저장소로부터 계산한 파생 열(예: 정규화된 본문)을 옵션 키별로
+    보관한다. 저장소와 수명이 같으므로 파싱 결과 LRU 에서 축출되면 함께 사라지고, 파생 열이
+    늘거나 줄면 `DerivedColumns.on_resize` 로 LRU 의 바이트 예산에 반영된다.
+    """
+
+    __slots__ = (
+        "offsets",
+        "user_codes",
+        "user_ids",
+        "nickname_codes",
+        "nicknames",
+        "content_text",
+        "content_ends",
+        "derived",
+    )
+
+    def __init__(
+        self,
+        offsets: array,
+        user_codes: array,
+        user_ids: list[str],
+        nickname_codes: array,
+        nicknames: list[str],
+        content_text: str,
+        content_ends: array,
+    ) -> None:
+        self.offsets = offsets
+        self.user_codes = user_codes
+        self.user_ids = user_ids
+        self.nickname_codes = nickname_codes
+        self.nicknames = nicknames
+        self.content_text = content_text
+        self.content_ends = content_ends
+        self.derived = DerivedColumns()
+
+    def __getstate__(self) -> tuple:
+        # 파생 열은 이 프로세스의 캐시(와 LRU 과금 콜백)라 프로세스 사이로 보내지 않는다
+        return tuple(getattr(self, name) for name in self.__slots__ if name != "derived")
+
+    def __setstate__(self, state: tuple) -> None:
+        for name, value in zip((name for name in self.__slots__ if name != "derived"), state):
+            setattr(self, name, value)
+        self.derived = DerivedColumns()
+
+    @classmethod
+    def empty(cls) -> MessageStore:
+        return MessageStoreBuilder().build()
+
+    @classmethod
+    def from_chat_messages(cls, messages: Iterable[ChatMessage]) -> MessageStore:
+        builder = MessageStoreBuilder()
+        for message in messages:
+            builder.append(
+                datetime_to_offset(message.timestamp),
+                message.nickname,
+                message.content,
+                message.user_id_hash,
+            )
+        return builder.build()
+
+    @classmethod
+    def concat(cls, stores: list[MessageStore]) -> MessageStore:
+        """여러 저장소를 이어붙인다. 인턴 테이블을 합치고 코드를 재매핑하며,
+        결과가 오프셋 순서가 아니면 안정 정렬한다."""
+        if len(stores) == 1:
+            return stores[0]
+
+        offsets = array("q")
+        user_codes = array("i")
+        nickname_codes = array("i")
+        content_ends = array("q")
+        user_index: dict[str, int] = {}
+        nickname_index: dict[str, int] = {}
+        length = 0
+        for store in stores:
+            user_map = [user_index.setdefault(user_id, len(user_index)) for user_id in store.user_ids]
+            nickname_map = [nickname_index.setdefault(name, len(nickname_index)) for name in store.nicknames]
+            offsets.extend(store.offsets)
+            user_codes.extend(_remap(store.user_codes, user_map))
+            nickname_codes.extend(_remap(store.nickname_codes, nickname_map))
+            content_ends.extend(map(length.__add__, store.content_ends) if length else store.content_ends)
+            length += len(store.content_text)
+
+        merged = cls(
+            offsets=offsets,
+            user_codes=user_codes,
+            user_ids=list(user_index),
+            nickname_codes=nickname_codes,
+            nicknames=list(nickname_index),
+            content_text="".join(store.content_text for store in stores),
+            content_ends=content_ends,
+        )
+        return merged if merged.is_sorted() else merged.sorted_by_offset()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __bool__(self) -> bool:
+        return len(self.offsets) > 0
+
+    @property
+    def user_count(self) -> int:
+        return len(self.user_ids)
+
+    def is_sorted(self) -> bool:
+        offsets = self.offsets
+        return all(map(operator.le, offsets, islice(offsets, 1, None)))
+
+    def sorted_by_offset(self) -> MessageStore:
+        """오프셋 기준 안정 정렬된 새 저장소 (기존 `messages.sort(key=timestamp)` 와 같은 순서)."""
+        order = sorted(range(len(self.offsets)), key=self.offsets.__getitem__)
+        contents = list(self.iter_contents())
+        content_ends = array("q")
+        length = 0
+        for index in order:
+            length += len(contents[index])
+            content_ends.append(length)
+        return MessageStore(
+            offsets=array("q", [self.offsets[index] for index in order]),
+            user_codes=array("i", [self.user_codes[index] for index in order]),
+            user_ids=self.user_ids,
+            nickname_codes=array("i", [self.nickname_codes[index] for index in order]),
+            nicknames=self.nicknames,
+            content_text="".join(contents[index] for index in order),
+            content_ends=content_ends,
+        )
+
+    def content(self, index: int) -> str:
+        start = self.content_ends[index - 1] if index > 0 else 0
+        return self.content_text[start : self.content_ends[index]]
+
+    def nickname(self, index: int) -> str:
+        return self.nicknames[self.nickname_codes[index]]
+
+    def user_id_hash(self, index: int) -> str:
+        return self.user_ids[self.user_codes[index]]
+
+    def timestamp(self, index: int) -> datetime:
+        return offset_to_datetime(self.offsets[index])
+
+    def iter_contents(self, start: int = 0, stop: int | None = None) -> Iterator[str]:
+        text = self.content_text
+        ends = self.content_ends
+        stop = len(ends) if stop is None else stop
+        begin = ends[start - 1] if start > 0 else 0
+        for index in range(start, stop):
+            end = ends[index]
+            yield text[begin:end]
+            begin = end
+
+    def index_range(self, start_offset: int, end_offset: int) -> tuple[int, int]:
+        """오프셋이 [start_offset, end_offset) 인 메시지의 인덱스 범위 (정렬된 오프셋 이진 탐색)."""
+        offsets = self.offsets
+        start = bisect_left(offsets, start_offset)
+        return start, max(bisect_left(offsets, end_offset, start), start)
+
+    def iter_records(self, start: int = 0, stop: int | None = None) -> Iterator[ChatRecord]:
+        """(오프셋, 닉네임, 본문, 사용자 해시) 를 하나씩 낸다 (ChatMessage 를 만들지 않는다)."""
+        stop = len(self) if stop is None else stop
+        offsets = self.offsets
+        nicknames = self.nicknames
+        nickname_codes = self.nickname_codes
+        user_ids = self.user_ids
+        user_codes = self.user_codes
+        for index, content in zip(range(start, stop), self.iter_contents(start, stop)):
+            yield offsets[index], nicknames[nickname_codes[index]], content, user_ids[user_codes[index]]
+
+    def to_chat_messages(self, start: int = 0, stop: int | None = None) -> list[ChatMessage]:
+        stop = len(self) if stop is None else stop
+        return [
+            ChatMessage(
+                timestamp=offset_to_datetime(self.offsets[index]),
+                nickname=self.nicknames[self.nickname_codes[index]],
+                content=content,
+                user_id_hash=self.user_ids[self.user_codes[index]],
+            )
+            for index, content in zip(range(start, stop), self.iter_contents(start, stop))
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        """열 데이터가 차지하는 대략적인 바이트 수 (인턴 테이블 포함)."""
+        size = sys.getsizeof(self.content_text)
+        size += self.derived.nbytes
+        for column in (self.offsets, self.user_codes, self.nickname_codes, self.content_ends):
+            size += column.itemsize * len(column)
+        for table in (self.user_ids, self.nicknames):
+            size += sys.getsizeof(table) + sum(sys.getsizeof(item) for item in table)
+        return size
+
+
+class MessageStoreBuilder:
+    """파서가 한 줄씩 채워 넣는 `MessageStore` 빌더.
+
+    입력이 오프셋 순서가 아니면 `build()` 에서 안정 정렬한다
+    (기존 `messages.sort(key=timestamp)` 와 동일한 순서).
+    """
+
+    def __init__(self) -> None:
+        self._offsets = array("q")
+        self._user_codes = array("i")
+        self._user_index: dict[str, int] = {}
+        self._user_ids: list[str] = []
+        self._nickname_codes = array("i")
+        self._nickname_index: dict[str, int] = {}
+        self._nicknames: list[str] = []
+        self._contents: list[str] = []
+        self._content_ends = array("q")
+        self._content_length = 0
+        self._is_sorted = True
+        self._last_offset = OFFSET_MIN
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def append(self, offset_sec: int, nickname: str, content: str, user_id_hash: str) -> None:
+        user_code = self._user_index.get(user_id_hash)
+        if user_code is None:
+            user_code = len(self._user_ids)
+            self._user_index[user_id_hash] = user_code
+            self._user_ids.append(user_id_hash)
+
+        nickname_code = self._nickname_index.get(nickname)
+        if nickname_code is None:
+            nickname_code = len(self._nicknames)
+            self._nickname_index[nickname] = nickname_code
+            self._nicknames.append(nickname)
+
+        if offset_sec < self._last_offset:
+            self._is_sorted = False
+        self._last_offset = offset_sec
+
+        self._offsets.append(offset_sec)
+        self._user_codes.append(user_code)
+        self._nickname_codes.append(nickname_code)
+        self._contents.append(content)
+        self._content_length += len(content)
+        self._content_ends.append(self._content_length)
+
+    def extend(self, records: Iterable[ChatRecord]) -> None:
+        append = self.append
+        for offset_sec, nickname, content, user_id_hash in records:
+            append(offset_sec, nickname, content, user_id_hash)
+
+    def build(self) -> MessageStore:
+        store = MessageStore(
+            offsets=self._offsets,
+            user_codes=self._user_codes,
+            user_ids=self._user_ids,
+            nickname_codes=self._nickname_codes,
+            nicknames=self._nicknames,
+            content_text="".join(self._contents),
+            content_ends=self._content_ends,
+        )
+        self._contents = []
+        return store if self._is_sorted else store.sorted_by_offset()
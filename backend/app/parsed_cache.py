@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import NamedTuple
+
+from .logging_config import get_logger
+from .message_store import MessageStore
+from .schemas import ParseErrorItem
+
+
+logger = get_logger(__name__)
+# 메모리에 유지할 파싱 결과의 총 바이트 상한 (MessageStore.nbytes + parse_errors 추정치).
+# MessageStore.nbytes 는 파생 열을 포함하며, 파생 열이 바뀔 때마다 다시 과금한다
+PARSED_CACHE_MAX_BYTES = 384 * 1024 * 1024
+# ParseErrorItem 하나의 고정 오버헤드 추정치 (raw_line 제외)
+_PARSE_ERROR_OVERHEAD_BYTES = 200
+
+
+class _Entry(NamedTuple):
+    fingerprint: str
+    messages: MessageStore
+    parse_errors: list[ParseErrorItem]
+    nbytes: int
+
+
+class ParsedLogCache:
+    """vod_id → 파싱된 MessageStore 의 바이트 상한 LRU.
+
+    analyze/export 가 같은 VOD 를 반복 요청할 때 디스크 재파싱(사이드카 로드 포함)을 피한다.
+    항목은 로그 지문과 함께 저장되며, 지문이 다르면 미스로 처리하고 버린다.
+    FastAPI 동기 핸들러는 스레드풀에서 동시에 실행되므로 모든 접근은 lock 으로 보호한다.
+    """
+
+    def __init__(self, max_bytes: int = PARSED_CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, vod_id: str, fingerprint: str) -> tuple[MessageStore, list[ParseErrorItem]] | None:
+        with self._lock:
+            entry = self._entries.get(vod_id)
+            if entry is not None and entry.fingerprint != fingerprint:
+                self._remove(vod_id)
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(vod_id)
+            self._log_access("miss" if entry is None else "hit", vod_id)
+
+        if entry is None:
+            return None
+        # 호출자가 목록을 수정해도 캐시가 오염되지 않도록 얕은 복사
+        return entry.messages, list(entry.parse_errors)
+
+    def contains(self, vod_id: str, fingerprint: str) -> bool:
+        """hit/miss 카운터와 LRU 순서를 건드리지 않고 유효한 항목이 있는지만 확인한다."""
+        with self._lock:
+            entry = self._entries.get(vod_id)
+            return entry is not None and entry.fingerprint == fingerprint
+
+    def put(
+        self,
+        vod_id: str,
+        fingerprint: str,
+        messages: MessageStore,
+        parse_errors: list[ParseErrorItem],
+    ) -> None:
+        nbytes = messages.nbytes + sum(
+            _PARSE_ERROR_OVERHEAD_BYTES + sys.getsizeof(item.raw_line) for item in parse_errors
+        )
+        if nbytes > self.max_bytes:
+            logger.info(
+                "Parsed cache skip (entry larger than budget): vod_id=%s bytes=%s max_bytes=%s",
+                vod_id,
+                nbytes,
+                self.max_bytes,
+            )
+            return
+
+        with self._lock:
+            self._remove(vod_id)
+            self._entries[vod_id] = _Entry(fingerprint, messages, list(parse_errors), nbytes)
+            self._total_bytes += nbytes
+            # 분석기가 파생 열(정규화 본문, 키워드 열, 단계 캐시, 역색인 등)을 쌓거나 지우면 다시 과금한다
+            messages.derived.on_resize = partial(self._charge, vod_id, messages)
+            self._evict_over_budget()
+
+    def _charge(self, vod_id: str, messages: MessageStore, delta: int) -> None:
+        with self._lock:
+            entry = self._entries.get(vod_id)
+            # 이미 축출됐거나 다른 저장소로 바뀐 항목의 변화는 예산과 무관하다
+            if entry is None or entry.messages is not messages:
+                return
+            self._entries[vod_id] = entry._replace(nbytes=entry.nbytes + delta)
+            self._total_bytes += delta
+            self._evict_over_budget()
+
+    def _evict_over_budget(self) -> None:
+        while self._total_bytes > self.max_bytes:
+            evicted_vod_id, _ = next(iter(self._entries.items()))
+            self._remove(evicted_vod_id)
+            self.evictions += 1
+            logger.info("Parsed cache evicted: vod_id=%s", evicted_vod_id)
+
+    def invalidate(self, vod_id: str) -> None:
+        with self._lock:
+            if self._remove(vod_id):
+                logger.info("Parsed cache invalidated: vod_id=%s", vod_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def _remove(self, vod_id: str) -> bool:
+        entry = self._entries.pop(vod_id, None)
+        if entry is None:
+            return False
+        self._total_bytes -= entry.nbytes
+        return True
+
+    def _log_access(self, result: str, vod_id: str) -> None:
+        logger.info(
+            "Parsed cache %s: vod_id=%s hits=%s misses=%s evictions=%s entries=%s bytes=%s",
+            result,
+            vod_id,
+            self.hits,
+            self.misses,
+            self.evictions,
+            len(self._entries),
+            self._total_bytes,
+        )
+
+
+parsed_log_cache = ParsedLogCache()
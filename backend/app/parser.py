@@ -1,21 +1,52 @@
+import heapq
+import io
 import re
 import os
 import json
 import shutil
 import platform
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import Iterable, Iterator
 
-from .chatlog_cache import get_chatlog_cache_path, mark_recent, prune_cache
+from .analyzer import normalized_contents
+from .chatlog_cache import get_chatlog_cache_path, log_fingerprint, mark_recent, prune_cache
 from .chatlog_fetcher import fetch_chatlog_to_file
+from .chatlog_sidecar import SidecarWriter, load_sidecar, sidecar_is_current, write_sidecar
 from .logging_config import get_logger
-from .schemas import ChatMessage, ParseErrorItem, SourceConfig
+from .parsed_cache import parsed_log_cache
+from .message_store import (
+    OFFSET_MIN,
+    ChatRecord,
+    MessageStore,
+    MessageStoreBuilder,
+    datetime_to_offset,
+)
+from .progress_events import publish_progress
+from .schemas import AnalyzeOptions, ParseErrorItem, SourceConfig
+from .token_index import queue_token_index
 
 
 LOG_LINE_PATTERN = re.compile(
     r"^\[(?P<timestamp>\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})\]\s(?P<nickname>.*?):\s(?P<content>.*)\s\((?P<user_id_hash>[^()]*)\)$"
 )
 logger = get_logger(__name__)
+# 이 크기 이상의 로그만 프로세스 풀로 분할 파싱한다. 그보다 작으면 워커 기동
+# (Windows spawn 기준 워커당 수백 ms) 비용이 병렬화 이득보다 크다.
+PARALLEL_PARSE_MIN_BYTES = 32 * 1024 * 1024
+# 워커 하나가 맡는 청크의 최소 크기
+_PARALLEL_CHUNK_MIN_BYTES = 8 * 1024 * 1024
+# 유효한 사이드카가 없는 이 크기 이상의 로그는 파싱→집계 스트리밍으로 분석한다 (정렬된
+# MessageStore 를 만들지 않고 한 번에 집계). 그 패스는 사이드카를 흘려 써서 다음 요청부터는
+# 파싱 없이 사이드카를 로드한다.
+STREAMING_PARSE_MIN_BYTES = 256 * 1024 * 1024
+# 스트리밍 시 국소적인 역순을 바로잡는 재정렬 버퍼 크기 (레코드 수)
+_REORDER_BUFFER_SIZE = 4096
+
+
+class UnorderedLogError(Exception):
+    """재정렬 버퍼로 바로잡을 수 없을 만큼 오프셋 순서가 어긋난 로그 (스트리밍 불가)."""
 
 
 def _build_file_lookup_diagnostics(vod_id: str, candidates: list[Path]) -> dict:
@@ -67,7 +98,11 @@ def resolve_source_files(source: SourceConfig) -> list[Path]:
     for candidate in legacy_candidates:
         if candidate.exists():
             cache_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(candidate, cache_path)
+            # 수집과 같이 임시 파일에 복사 후 교체해, 동시에 들어온 요청이 복사 중인 파일을 읽지 않게 한다
+            part_path = cache_path.with_name(f"{cache_path.name}.part")
+            shutil.copy2(candidate, part_path)
+            os.replace(part_path, cache_path)
+            parsed_log_cache.invalidate(source.vod_id)
             mark_recent(cache_path)
             prune_cache()
             logger.info(
@@ -87,6 +122,7 @@ def resolve_source_files(source: SourceConfig) -> list[Path]:
 
     try:
         written_count, page_count = fetch_chatlog_to_file(source.vod_id, cache_path)
+        parsed_log_cache.invalidate(source.vod_id)
         mark_recent(cache_path)
         prune_cache()
         logger.info(
@@ -102,8 +138,309 @@ def resolve_source_files(source: SourceConfig) -> list[Path]:
         raise RuntimeError(f"auto_fetch_failed: {exc}") from exc
 
 
-def parse_chat_logs(source: SourceConfig) -> tuple[list[ChatMessage], list[ParseErrorItem]]:
-    messages: list[ChatMessage] = []
+def _timestamp_to_offset(timestamp: str, day_offsets: dict[str, int]) -> int:
+    """`YYYY-MM-DD HH:MM:SS` 문자열을 1970-01-01 기준 초 오프셋으로 변환한다.
+
+    `datetime.strptime` 과 같은 값 검증(월/일/시/분/초 범위)을 하되, 로그 대부분이 같은
+    날짜를 공유하므로 날짜 부분은 `day_offsets` 에 캐시한다. 잘못된 값은 ValueError.
+    """
+    date_part = timestamp[:10]
+    day_offset = day_offsets.get(date_part)
+    if day_offset is None:
+        day = datetime(int(date_part[0:4]), int(date_part[5:7]), int(date_part[8:10]))
+        day_offset = datetime_to_offset(day)
+        day_offsets[date_part] = day_offset
+
+    hour = int(timestamp[11:13])
+    minute = int(timestamp[14:16])
+    second = int(timestamp[17:19])
+    if hour > 23 or minute > 59 or second > 59:
+        raise ValueError(f"invalid time: {timestamp}")
+
+    return day_offset + hour * 3600 + minute * 60 + second
+
+
+def _iter_log_records(
+    lines: Iterable[str],
+    file_path: str,
+    parse_errors: list[ParseErrorItem],
+    first_line_number: int = 1,
+) -> Iterator[ChatRecord]:
+    """줄들을 파싱해 (offset_sec, nickname, content, user_id_hash) 를 yield 한다.
+
+    형식/타임스탬프 오류는 parse_errors 에 쌓는다.
+    """
+    day_offsets: dict[str, int] = {}
+    match_line = LOG_LINE_PATTERN.match
+
+    for line_number, raw_line in enumerate(lines, start=first_line_number):
+        line = raw_line.rstrip("\n")
+        match = match_line(line)
+        if not match:
+            parse_errors.append(
+                ParseErrorItem(
+                    file_path=file_path,
+                    line_number=line_number,
+                    reason="invalid_format",
+                    raw_line=line,
+                )
+            )
+            continue
+
+        timestamp, nickname, content, user_id_hash = match.groups()
+        try:
+            offset_sec = _timestamp_to_offset(timestamp, day_offsets)
+        except ValueError:
+            parse_errors.append(
+                ParseErrorItem(
+                    file_path=file_path,
+                    line_number=line_number,
+                    reason="invalid_timestamp",
+                    raw_line=line,
+                )
+            )
+            continue
+
+        yield offset_sec, nickname.strip() or "Unknown", content, user_id_hash
+
+
+def _parse_lines(
+    lines: Iterable[str],
+    file_path: str,
+    builder: MessageStoreBuilder,
+    parse_errors: list[ParseErrorItem],
+    first_line_number: int = 1,
+) -> None:
+    builder.extend(_iter_log_records(lines, file_path, parse_errors, first_line_number))
+
+
+def _ordered_records(
+    records: Iterable[ChatRecord], buffer_size: int, last_offset: int = OFFSET_MIN
+) -> Iterator[ChatRecord]:
+    """전체 정렬 대신 단조성 검사 + 크기 제한 재정렬 버퍼로 오프셋 순서를 보장한다.
+
+    buffer_size 안쪽의 역순은 (offset, 입력 순번) 힙으로 안정 정렬해 내보내고,
+    이미 내보낸 오프셋(또는 last_offset)보다 이른 레코드가 오면 UnorderedLogError 를 던진다.
+    """
+    heap: list[tuple[int, int, ChatRecord]] = []
+    for sequence, record in enumerate(records):
+        offset_sec = record[0]
+        if offset_sec < last_offset:
+            raise UnorderedLogError(
+                f"record at offset {offset_sec} arrived after {last_offset} (buffer_size={buffer_size})"
+            )
+        if len(heap) < buffer_size:
+            heapq.heappush(heap, (offset_sec, sequence, record))
+            continue
+        last_offset, _, emitted = heapq.heappushpop(heap, (offset_sec, sequence, record))
+        yield emitted
+
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
+def prefers_streaming(source: SourceConfig) -> bool:
+    """캐시된 로그가 충분히 크고 유효한 사이드카가 없으면 스트리밍 분석을 권장한다.
+
+    캐시에 없는 로그(자동 수집 대상)는 False — 수집 후 일반 파싱 경로를 탄다.
+    사이드카는 header 의 지문만 확인하고 본문은 읽지 않는다 (실제 로드는 parse_chat_logs 가 한다).
+    """
+    cache_path = get_chatlog_cache_path(source.vod_id)
+    try:
+        if cache_path.stat().st_size < STREAMING_PARSE_MIN_BYTES:
+            return False
+    except OSError:
+        return False
+    fingerprint = log_fingerprint(cache_path)
+    if parsed_log_cache.contains(source.vod_id, fingerprint):
+        return False
+    return not sidecar_is_current(cache_path, fingerprint)
+
+
+def iter_chat_records(source: SourceConfig, parse_errors: list[ParseErrorItem]) -> Iterator[ChatRecord]:
+    """채팅 로그를 오프셋 순 레코드 스트림으로 읽는다.
+
+    parse_errors 는 파일 하나를 다 읽을 때마다 채워진다. 읽은 레코드는 MessageStore 를 만들지 않고
+    SidecarWriter 로 흘려 쓰며, 파일을 끝까지 읽으면 사이드카를 확정한다 (중간에 멈춘 스트림은
+    버린다). 다음 요청은 그 사이드카를 로드한다. 메모리는 재정렬 버퍼와 인턴 테이블만큼만 쓴다.
+    순서가 크게 어긋난 로그는 UnorderedLogError — 호출자는 parse_chat_logs 경로로 폴백한다.
+    """
+    try:
+        resolved_paths = resolve_source_files(source)
+    except Exception as exc:
+        parse_errors.append(
+            ParseErrorItem(
+                file_path=f"chatLog-{source.vod_id}.log",
+                line_number=0,
+                reason="auto_fetch_failed",
+                raw_line=str(exc),
+            )
+        )
+        logger.error("Cannot resolve chat log for vod_id=%s: %s", source.vod_id, exc)
+        publish_progress(source.vod_id, "failed", detail=str(exc))
+        return
+    publish_progress(source.vod_id, "parse")
+
+    last_offset = OFFSET_MIN
+    for path in resolved_paths:
+        if not path.exists():
+            logger.error("Chat log file not found: raw=%s absolute=%s", path, path.resolve())
+            parse_errors.append(
+                ParseErrorItem(file_path=str(path), line_number=0, reason="file_not_found", raw_line="")
+            )
+            continue
+        logger.info("Start streaming chat log: %s", path)
+        # 파일별로 재정렬해 사이드카가 전체 파싱(build() 의 안정 정렬)과 같은 순서가 되게 하고,
+        # 파일 사이의 순서는 앞 파일의 마지막 오프셋으로 검사한다
+        writer = SidecarWriter(path, log_fingerprint(path))
+        file_errors: list[ParseErrorItem] = []
+        try:
+            with path.open("r", encoding="utf-8") as handle:
+                records = _iter_log_records(handle, str(path), file_errors)
+                for record in _ordered_records(records, _REORDER_BUFFER_SIZE, last_offset):
+                    writer.append(*record)
+                    last_offset = record[0]
+                    yield record
+            parse_errors.extend(file_errors)
+            writer.commit(file_errors)
+        finally:
+            writer.close()
+
+
+def _split_line_aligned(path: Path, chunk_count: int) -> list[tuple[int, int]]:
+    """파일을 개행 경계에 맞춘 [start, end) 바이트 구간 chunk_count 개 이하로 나눈다."""
+    size = path.stat().st_size
+    boundaries = [0]
+    with path.open("rb") as handle:
+        for index in range(1, chunk_count):
+            target = max(size * index // chunk_count, boundaries[-1])
+            handle.seek(target)
+            handle.readline()  # UTF-8 다중 바이트 문자는 0x0A 를 포함하지 않으므로 안전
+            position = handle.tell()
+            if position >= size:
+                break
+            if position > boundaries[-1]:
+                boundaries.append(position)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _parse_chunk(path_str: str, start: int, end: int) -> tuple[MessageStore, list[ParseErrorItem], int]:
+    """프로세스 풀 워커: 바이트 구간을 파싱하고 (store, 청크 기준 줄 번호 오류, 줄 수) 를 반환한다."""
+    with open(path_str, "rb") as handle:
+        handle.seek(start)
+        data = handle.read(end - start)
+
+    # newline=None: 직렬 경로의 텍스트 모드 열기와 같은 universal newline 처리
+    lines = io.StringIO(data.decode("utf-8"), newline=None).readlines()
+    del data
+    builder = MessageStoreBuilder()
+    parse_errors: list[ParseErrorItem] = []
+    _parse_lines(lines, path_str, builder, parse_errors)
+    return builder.build(), parse_errors, len(lines)
+
+
+def _parse_log_file_parallel(path: Path, workers: int) -> tuple[MessageStore, list[ParseErrorItem]]:
+    size = path.stat().st_size
+    chunk_count = max(min(workers, size // _PARALLEL_CHUNK_MIN_BYTES), 1)
+    ranges = _split_line_aligned(path, chunk_count)
+    logger.info(
+        "Start parallel parsing chat log: %s size=%s chunks=%s workers=%s",
+        path,
+        size,
+        len(ranges),
+        min(workers, len(ranges)),
+    )
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+        futures = [pool.submit(_parse_chunk, str(path), start, end) for start, end in ranges]
+        results = [future.result() for future in futures]
+
+    stores: list[MessageStore] = []
+    parse_errors: list[ParseErrorItem] = []
+    line_offset = 0
+    for chunk_messages, chunk_errors, line_count in results:
+        for item in chunk_errors:
+            item.line_number += line_offset
+        stores.append(chunk_messages)
+        parse_errors.extend(chunk_errors)
+        line_offset += line_count
+
+    return MessageStore.concat(stores), parse_errors
+
+
+def _parse_log_file(path: Path, vod_id: str) -> tuple[MessageStore, list[ParseErrorItem]]:
+    """로그 파일 하나를 파싱한다.
+
+    메모리 LRU → 사이드카 → 실제 파싱 순으로 시도하며, 모두 로그 지문이 같을 때만 재사용한다.
+    """
+    fingerprint = log_fingerprint(path)
+    cached = parsed_log_cache.get(vod_id, fingerprint)
+    if cached is not None:
+        return cached
+
+    cached = load_sidecar(path, fingerprint)
+    if cached is not None:
+        parsed_log_cache.put(vod_id, fingerprint, *cached)
+        return cached
+
+    messages, parse_errors = parse_log_file(path)
+    remember_parsed_log(path, vod_id, fingerprint, messages, parse_errors, write=True)
+    return messages, parse_errors
+
+
+def parse_log_file(path: Path, parallel: bool = True) -> tuple[MessageStore, list[ParseErrorItem]]:
+    """캐시를 거치지 않고 로그 파일 하나를 파싱한다. 사이드카/LRU 에는 쓰지 않는다.
+
+    parallel=False 는 이미 워커 프로세스 안에서 부를 때 (풀 안에 풀을 만들지 않는다).
+    """
+    workers = (os.cpu_count() or 1) if parallel else 1
+    if workers > 1 and path.stat().st_size >= PARALLEL_PARSE_MIN_BYTES:
+        try:
+            return _parse_log_file_parallel(path, workers)
+        except (OSError, RuntimeError):
+            # BrokenProcessPool 은 RuntimeError 하위 클래스
+            logger.exception("Parallel parsing failed, falling back to serial: %s", path)
+
+    logger.info("Start parsing chat log: %s", path)
+    builder = MessageStoreBuilder()
+    parse_errors: list[ParseErrorItem] = []
+    with path.open("r", encoding="utf-8") as handle:
+        _parse_lines(handle, str(path), builder, parse_errors)
+    # 오프셋 순 안정 정렬은 builder 가 필요할 때만 수행한다
+    return builder.build(), parse_errors
+
+
+def remember_parsed_log(
+    path: Path,
+    vod_id: str,
+    fingerprint: str,
+    messages: MessageStore,
+    parse_errors: list[ParseErrorItem],
+    write: bool,
+) -> None:
+    """파싱 결과를 파싱 결과 LRU 에 넣고, write 면 사이드카를 쓴 뒤 기본 검색 역색인을 미리 만든다."""
+    if write:
+        write_sidecar(path, fingerprint, messages, parse_errors)
+    parsed_log_cache.put(vod_id, fingerprint, messages, parse_errors)
+    if write:
+        _queue_search_index(path, messages)
+
+
+def _queue_search_index(path: Path, messages: MessageStore) -> None:
+    # 사이드카와 함께 기본 검색 옵션(대소문자 무시, 반복 반응 정규화)의 역색인을 미리 만든다
+    options = AnalyzeOptions()
+    queue_token_index(
+        messages,
+        path,
+        case_sensitive=options.keyword_options.case_sensitive,
+        normalize=options.normalize_repeated_reactions,
+        contents=lambda: normalized_contents(messages, options),
+    )
+
+
+def parse_chat_logs(source: SourceConfig) -> tuple[MessageStore, list[ParseErrorItem]]:
+    stores: list[MessageStore] = []
     parse_errors: list[ParseErrorItem] = []
 
     try:
@@ -118,7 +455,9 @@ def parse_chat_logs(source: SourceConfig) -> tuple[list[ChatMessage], list[Parse
             )
         )
         logger.error("Cannot resolve chat log for vod_id=%s: %s", source.vod_id, exc)
-        return messages, parse_errors
+        publish_progress(source.vod_id, "failed", detail=str(exc))
+        return MessageStore.empty(), parse_errors
+    publish_progress(source.vod_id, "parse")
 
     for path in resolved_paths:
         if not path.exists():
@@ -137,50 +476,17 @@ def parse_chat_logs(source: SourceConfig) -> tuple[list[ChatMessage], list[Parse
             )
             continue
 
-        logger.info("Start parsing chat log: %s", path)
-        with path.open("r", encoding="utf-8") as handle:
-            for line_number, raw_line in enumerate(handle, start=1):
-                line = raw_line.rstrip("\n")
-                match = LOG_LINE_PATTERN.match(line)
-                if not match:
-                    parse_errors.append(
-                        ParseErrorItem(
-                            file_path=str(path),
-                            line_number=line_number,
-                            reason="invalid_format",
-                            raw_line=line,
-                        )
-                    )
-                    continue
-
-                groups = match.groupdict()
-                try:
-                    timestamp = datetime.strptime(groups["timestamp"], "%Y-%m-%d %H:%M:%S")
-                except ValueError:
-                    parse_errors.append(
-                        ParseErrorItem(
-                            file_path=str(path),
-                            line_number=line_number,
-                            reason="invalid_timestamp",
-                            raw_line=line,
-                        )
-                    )
-                    continue
-
-                messages.append(
-                    ChatMessage(
-                        timestamp=timestamp,
-                        nickname=groups["nickname"].strip() or "Unknown",
-                        content=groups["content"],
-                        user_id_hash=groups["user_id_hash"],
-                    )
-                )
+        file_messages, file_errors = _parse_log_file(path, source.vod_id)
+        stores.append(file_messages)
+        parse_errors.extend(file_errors)
 
-    messages.sort(key=lambda item: item.timestamp)
+    messages = MessageStore.concat(stores) if stores else MessageStore.empty()
     logger.info(
-        "Finished parsing: vod_id=%s, messages=%s, parse_errors=%s",
+        "Finished parsing: vod_id=%s, messages=%s, users=%s, parse_errors=%s, store_bytes=%s",
         source.vod_id,
         len(messages),
+        messages.user_count,
         len(parse_errors),
+        messages.nbytes,
     )
     return messages, parse_errors
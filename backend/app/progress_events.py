@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+from collections import OrderedDict
+
+from .logging_config import get_logger
+from .schemas import ProgressEvent
+
+
+logger = get_logger(__name__)
+# 구독자 하나가 아직 읽지 않은 이벤트를 쌓아 두는 개수. 넘치면 가장 오래된 것을 버린다
+# (진행도는 최신 값만 의미가 있다)
+SUBSCRIBER_QUEUE_SIZE = 64
+# 마지막 이벤트를 기억하는 VOD 수 (새 구독자에게 현재 상태를 바로 보내기 위함)
+_LATEST_EVENTS = 64
+TERMINAL_STAGES = ("done", "failed")
+
+
+class AsyncSubscription:
+    """이벤트 루프에서 await 로 읽는 구독. 발행 스레드는 루프에 넣기만 예약하므로 읽는 쪽이
+    스레드풀 스레드를 잡고 기다리지 않는다."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._queue: asyncio.Queue[ProgressEvent] = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    async def get(self) -> ProgressEvent:
+        return await self._queue.get()
+
+    def offer(self, event: ProgressEvent) -> None:
+        try:
+            self._loop.call_soon_threadsafe(_offer, self._queue, event)
+        except RuntimeError:  # 루프가 이미 닫혔다 (곧 unsubscribe 된다)
+            pass
+
+
+class ProgressBroker:
+    """vod_id 별 진행 이벤트 채널. 수집/파싱/분석 스레드가 publish 하고 SSE 스트림이 subscribe 한다.
+
+    구독자마다 크기 제한 큐를 두어 느린 클라이언트가 발행 스레드를 막지 않게 한다. SSE 스트림은
+    subscribe_async 로 이벤트 루프의 큐를 받아 연결마다 스레드를 쓰지 않는다.
+    새 구독자에게는 진행 중인 작업의 마지막 이벤트를 먼저 넣어 준다 (끝난 작업의 done/failed 는
+    넣지 않아 다음 분석을 기다리는 구독이 바로 끝나지 않게 한다).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: dict[str, set[queue.Queue | AsyncSubscription]] = {}
+        self._latest: OrderedDict[str, ProgressEvent] = OrderedDict()
+
+    def publish(self, event: ProgressEvent) -> None:
+        with self._lock:
+            self._latest[event.vod_id] = event
+            self._latest.move_to_end(event.vod_id)
+            while len(self._latest) > _LATEST_EVENTS:
+                self._latest.popitem(last=False)
+            subscribers = list(self._subscribers.get(event.vod_id, ()))
+        for subscription in subscribers:
+            _deliver(subscription, event)
+
+    def subscribe(self, vod_id: str) -> queue.Queue:
+        subscription: queue.Queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._register(vod_id, subscription)
+        return subscription
+
+    def subscribe_async(self, vod_id: str) -> AsyncSubscription:
+        """실행 중인 이벤트 루프에서 호출한다."""
+        subscription = AsyncSubscription(asyncio.get_running_loop())
+        self._register(vod_id, subscription)
+        return subscription
+
+    def _register(self, vod_id: str, subscription: queue.Queue | AsyncSubscription) -> None:
+        with self._lock:
+            self._subscribers.setdefault(vod_id, set()).add(subscription)
+            latest = self._latest.get(vod_id)
+            count = len(self._subscribers[vod_id])
+        if latest is not None and latest.stage not in TERMINAL_STAGES:
+            _deliver(subscription, latest)
+        logger.info("Progress subscribed: vod_id=%s subscribers=%s", vod_id, count)
+
+    def unsubscribe(self, vod_id: str, subscription: queue.Queue | AsyncSubscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(vod_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[vod_id]
+        logger.info("Progress unsubscribed: vod_id=%s", vod_id)
+
+    def latest(self, vod_id: str) -> ProgressEvent | None:
+        with self._lock:
+            return self._latest.get(vod_id)
+
+
+def _deliver(subscription: queue.Queue | AsyncSubscription, event: ProgressEvent) -> None:
+    if isinstance(subscription, AsyncSubscription):
+        subscription.offer(event)
+    else:
+        _offer(subscription, event)
+
+
+def _offer(subscription: queue.Queue | asyncio.Queue, event: ProgressEvent) -> None:
+    while True:
+        try:
+            subscription.put_nowait(event)
+            return
+        except (queue.Full, asyncio.QueueFull):
+            try:
+                subscription.get_nowait()
+            except (queue.Empty, asyncio.QueueEmpty):
+                pass
+
+
+progress_broker = ProgressBroker()
+
+
+def publish_progress(vod_id: str, stage: str, **fields) -> None:
+    """단계 전환 이벤트. 같은 VOD 의 진행 중인 작업이 있으면 수집 값(pages/messages/위치/길이)을
+    이어 쓴다 (이전 작업이 끝난 뒤 새로 시작하면 0 부터)."""
+    latest = progress_broker.latest(vod_id)
+    carried = (
+        {}
+        if latest is None or latest.stage in TERMINAL_STAGES
+        else latest.model_dump(include={"pages", "messages", "position_sec", "duration_sec"})
+    )
+    progress_broker.publish(ProgressEvent(vod_id=vod_id, stage=stage, **{**carried, **fields}))
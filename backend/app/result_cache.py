@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from pydantic import ValidationError
+
+from .chatlog_cache import get_chatlog_result_path, prune_result_files
+from .json_response import dumps
+from .logging_config import get_logger
+from .schemas import AnalyzeRequest, AnalyzeResponse
+
+
+logger = get_logger(__name__)
+# 메모리에 유지할 분석 결과의 총 바이트 상한 (추정치)
+RESULT_CACHE_MAX_BYTES = 128 * 1024 * 1024
+# 분석 결과 형태/계산이 바뀌면 올려서 이전 키(ETag, 디스크 파일)를 무효화한다
+_RESULT_VERSION = 1
+# 응답 모델 한 행(TimeBucketPoint / KeywordSeriesPoint / HighlightRange / ParseErrorItem)의 메모리 추정치
+# (200k 메시지 응답에서 측정한 평균 약 560B 에 여유를 둔 값)
+_ROW_BYTES = 640
+# 압축 keyword_series 의 정수 한 칸 추정치
+_CELL_BYTES = 32
+
+
+def canonical_request(payload: AnalyzeRequest) -> str:
+    """결과에 영향을 주는 요청 내용을 필드 순서/기본값 생략 여부와 무관한 문자열로 만든다.
+
+    검증을 거친 모델의 JSON 이며, normalize_repeated_laugh 는 normalize_repeated_reactions 로
+    이미 반영된 별칭이라 제외한다.
+    """
+    return payload.model_dump_json(exclude={"options": {"normalize_repeated_laugh"}})
+
+
+def analysis_result_key(payload: AnalyzeRequest, fingerprint: str) -> str:
+    """(로그 지문, 정규화한 요청) 의 해시. 같은 키면 분석 결과가 같으므로 ETag 로도 쓴다."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{_RESULT_VERSION}\n{fingerprint}\n".encode("utf-8"))
+    digest.update(canonical_request(payload).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def estimate_response_bytes(response: AnalyzeResponse) -> int:
+    rows = (
+        len(response.volume_series)
+        + len(response.keyword_series)
+        + len(response.highlights)
+        + len(response.parse_errors)
+    )
+    cells = 0
+    if response.keyword_series_columnar is not None:
+        cells += sum(len(counts) for counts in response.keyword_series_columnar.counts)
+    if response.keyword_series_sparse is not None:
+        cells += 3 * len(response.keyword_series_sparse.counts)
+    return (rows + 1) * _ROW_BYTES + cells * _CELL_BYTES
+
+
+class _Entry(NamedTuple):
+    vod_id: str
+    key: str
+    response: AnalyzeResponse
+    nbytes: int
+
+
+class AnalysisResultCache:
+    """분석 결과 키 → AnalyzeResponse 의 바이트 상한 LRU (디스크 spill 선택).
+
+    /api/analyze 와 /api/export 가 같은 요청을 다시 분석하지 않게 한다. 키에 로그 지문이
+    들어가므로 재수집된 로그의 결과는 자연히 미스가 된다. 반환된 모델은 여러 요청이
+    공유하므로 호출자가 수정하면 안 된다.
+
+    spill=True 면 메모리에서 밀려난 결과를 캐시 로그 옆 `chatLog-{vod_id}.{key}.result` 에
+    JSON 으로 저장하고, 메모리 미스일 때 읽어 다시 올린다 (로그와 함께 prune 된다).
+    """
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_BYTES, spill: bool = True) -> None:
+        self.max_bytes = max_bytes
+        self.spill = spill
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, vod_id: str, key: str) -> AnalyzeResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._log_access("hit", vod_id, key)
+                return entry.response
+
+        response = self._load_spilled(vod_id, key) if self.spill else None
+        with self._lock:
+            if response is None:
+                self.misses += 1
+                self._log_access("miss", vod_id, key)
+            else:
+                self.disk_hits += 1
+                self._log_access("hit (disk)", vod_id, key)
+        if response is not None:
+            self.put(vod_id, key, response)
+        return response
+
+    def put(self, vod_id: str, key: str, response: AnalyzeResponse) -> None:
+        nbytes = estimate_response_bytes(response)
+        evicted: list[_Entry] = []
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous.nbytes
+            if nbytes > self.max_bytes:
+                # 디스크에서 다시 검증해 올리는 비용이 단계 캐시로 재분석하는 것보다 커서 저장하지 않는다
+                logger.info(
+                    "Result cache skip (entry larger than budget): vod_id=%s key=%s bytes=%s max_bytes=%s",
+                    vod_id,
+                    key,
+                    nbytes,
+                    self.max_bytes,
+                )
+                return
+            self._entries[key] = _Entry(vod_id, key, response, nbytes)
+            self._total_bytes += nbytes
+            while self._total_bytes > self.max_bytes:
+                _, oldest = self._entries.popitem(last=False)
+                self._total_bytes -= oldest.nbytes
+                evicted.append(oldest)
+
+        # 디스크 기록은 lock 밖에서 (다른 요청의 메모리 조회를 막지 않도록)
+        if self.spill:
+            for entry in evicted:
+                self._spill(entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def _spill(self, entry: _Entry) -> None:
+        path = get_chatlog_result_path(entry.vod_id, entry.key)
+        if path.exists():
+            return
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        try:
+            temp_path.write_bytes(dumps(entry.response))
+            os.replace(temp_path, path)
+        except OSError:
+            logger.exception("Failed to spill analysis result: %s", path)
+            temp_path.unlink(missing_ok=True)
+            return
+        logger.info("Result cache spilled to disk: vod_id=%s path=%s", entry.vod_id, path)
+        prune_result_files()
+
+    def _load_spilled(self, vod_id: str, key: str) -> AnalyzeResponse | None:
+        path = get_chatlog_result_path(vod_id, key)
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError:
+            logger.exception("Failed to read spilled analysis result: %s", path)
+            return None
+        try:
+            response = AnalyzeResponse.model_validate_json(raw)
+        except ValidationError:
+            logger.warning("Spilled analysis result is corrupted, removing: %s", path, exc_info=True)
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path, None)
+        return response
+
+    def _log_access(self, result: str, vod_id: str, key: str) -> None:
+        logger.info(
+            "Result cache %s: vod_id=%s key=%s hits=%s disk_hits=%s misses=%s entries=%s bytes=%s",
+            result,
+            vod_id,
+            key,
+            self.hits,
+            self.disk_hits,
+            self.misses,
+            len(self._entries),
+            self._total_bytes,
+        )
+
+
+analysis_result_cache = AnalysisResultCache()
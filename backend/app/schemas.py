@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Literal
+from typing import Annotated, Callable, Literal, TypeVar
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, model_serializer, model_validator
 
 
 class SourceConfig(BaseModel):
@@ -9,7 +9,9 @@ class SourceConfig(BaseModel):
 
 
 class KeywordOptions(BaseModel):
-    mode: Literal["contains", "exact"] = "contains"
+    # regex: 키워드를 정규식 패턴으로 해석 (패턴 전체에서 겹치지 않는 매치, 앞 패턴 우선).
+    #        반응 정규화 전 원문 본문에 매치한다
+    mode: Literal["contains", "exact", "regex"] = "contains"
     case_sensitive: bool = False
 
 
@@ -24,6 +26,7 @@ class AnalyzeOptions(BaseModel):
     min_highlight_score: float = 1.2
     max_highlights: int = Field(default=20, ge=1, le=200)
     max_merge_buckets: int = Field(default=2, ge=1, le=20, description="병합 허용 최대 버킷 수")
+    trending_terms: int = Field(default=0, ge=0, le=20, description="하이라이트별 떠오르는 단어 개수 (0 이면 끔)")
 
     @model_validator(mode="before")
     @classmethod
@@ -36,16 +39,83 @@ class AnalyzeOptions(BaseModel):
         return data
 
 
+KeywordSeriesFormat = Literal["dense", "columnar", "sparse"]
+
+
 class AnalyzeRequest(BaseModel):
     source: SourceConfig
     keywords: list[str] = Field(default_factory=list)
     options: AnalyzeOptions = Field(default_factory=AnalyzeOptions)
+    # dense: keyword_series (기본, 기존 형태) / columnar·sparse: keyword_series 는 빈 목록이고
+    # keyword_series_columnar / keyword_series_sparse 에 압축 형태로 담는다
+    keyword_series_format: KeywordSeriesFormat = "dense"
+
+
+class BatchAnalyzeRequest(BaseModel):
+    requests: list[AnalyzeRequest] = Field(..., min_length=1, max_length=100)
 
 
 class ExportRequest(BaseModel):
     analysis: AnalyzeRequest
-    format: Literal["json", "csv"] = "json"
-    dataset: Literal["summary", "highlights", "volume", "keywords", "parse_errors", "all"] = "all"
+    # parquet: volume / keywords / messages 만 (pyarrow 필요)
+    format: Literal["json", "csv", "parquet"] = "json"
+    # messages: 분석 없이 파싱된 원본 채팅 (시간순)
+    dataset: Literal["summary", "highlights", "volume", "keywords", "parse_errors", "messages", "all"] = "all"
+
+
+class SearchRequest(BaseModel):
+    source: SourceConfig
+    terms: list[str] = Field(..., min_length=1, max_length=50)
+    # bucket_size_seconds, keyword_options, normalize_repeated_reactions 만 사용
+    options: AnalyzeOptions = Field(default_factory=AnalyzeOptions)
+    include_occurrences: bool = False
+    max_occurrences: int = Field(default=200, ge=1, le=5000)
+
+    @model_validator(mode="after")
+    def reject_regex_mode(self) -> "SearchRequest":
+        # 역색인은 토큰 문자열 조회라 정규식 검색어를 지원하지 않는다
+        if self.options.keyword_options.mode == "regex":
+            raise ValueError("regex keyword mode is not supported by search")
+        return self
+
+
+# 스윕 조합 수 상한 (bucket × score × merge)
+SWEEP_MAX_COMBINATIONS = 2000
+
+
+class MessagesRequest(BaseModel):
+    source: SourceConfig
+    # VOD 재생 위치(초) 구간 [start, end). highlights 의 *_offset_sec 를 그대로 넣으면 된다 (end 생략 시 끝까지)
+    start_offset_sec: int = Field(default=0, ge=0)
+    end_offset_sec: int | None = Field(default=None, ge=0)
+    # 구간 안에서 건너뛸 메시지 수 (이전 응답의 next_cursor)
+    cursor: int = Field(default=0, ge=0)
+    # 한 페이지 최대 메시지 수 (/api/messages/stream 은 무시하고 구간 끝까지 보낸다)
+    limit: int = Field(default=500, ge=1, le=5000)
+
+    @model_validator(mode="after")
+    def check_range(self) -> "MessagesRequest":
+        if self.end_offset_sec is not None and self.end_offset_sec <= self.start_offset_sec:
+            raise ValueError("end_offset_sec must be greater than start_offset_sec")
+        return self
+
+
+class SweepRequest(BaseModel):
+    source: SourceConfig
+    keywords: list[str] = Field(default_factory=list)
+    # keyword_options, normalize_repeated_reactions, max_highlights 는 모든 조합에 공통으로 쓰고
+    # bucket_size_seconds / min_highlight_score / max_merge_buckets 는 아래 격자 값으로 대체된다
+    options: AnalyzeOptions = Field(default_factory=AnalyzeOptions)
+    bucket_sizes_seconds: list[Annotated[int, Field(ge=5, le=300)]] = Field(..., min_length=1, max_length=20)
+    min_highlight_scores: list[float] = Field(..., min_length=1, max_length=50)
+    max_merge_buckets: list[Annotated[int, Field(ge=1, le=20)]] = Field(..., min_length=1, max_length=20)
+
+    @model_validator(mode="after")
+    def check_grid_size(self) -> "SweepRequest":
+        combinations = len(self.bucket_sizes_seconds) * len(self.min_highlight_scores) * len(self.max_merge_buckets)
+        if combinations > SWEEP_MAX_COMBINATIONS:
+            raise ValueError(f"too many sweep combinations: {combinations} > {SWEEP_MAX_COMBINATIONS}")
+        return self
 
 
 class ParseErrorItem(BaseModel):
@@ -78,6 +148,30 @@ class KeywordSeriesPoint(BaseModel):
     count: int
 
 
+class KeywordSeriesColumnar(BaseModel):
+    """키워드 시계열 열 형태. 버킷 축은 volume_series 와 같다 (counts[k][i] ↔ volume_series[i])."""
+
+    keywords: list[str]
+    counts: list[list[int]]
+
+
+class KeywordSeriesSparse(BaseModel):
+    """키워드 시계열의 0이 아닌 칸만 담은 희소 형태. 세 배열의 같은 위치가 한 칸이다
+    (volume_series[bucket_indices[j]] 버킷의 keywords[keyword_indices[j]] 가 counts[j] 회)."""
+
+    keywords: list[str]
+    bucket_indices: list[int]
+    keyword_indices: list[int]
+    counts: list[int]
+
+
+class TrendingTerm(BaseModel):
+    term: str
+    # 하이라이트 범위에서 이 단어가 나온 메시지 수 (하한)
+    count: int
+    score: float
+
+
 class HighlightRange(BaseModel):
     start: datetime
     start_offset_sec: int
@@ -91,6 +185,15 @@ class HighlightRange(BaseModel):
     peak_offset_label: str
     peak_total_messages: int
     representative_keyword: str | None = None
+    # options.trending_terms > 0 일 때만 채워지고, 그 외에는 응답에 나타나지 않는다
+    trending_terms: list[TrendingTerm] | None = None
+
+    @model_serializer(mode="wrap")
+    def drop_unrequested_trending(self, handler):
+        data = handler(self)
+        if data.get("trending_terms") is None:
+            data.pop("trending_terms", None)
+        return data
 
 
 class SummaryStats(BaseModel):
@@ -110,3 +213,138 @@ class AnalyzeResponse(BaseModel):
     highlights: list[HighlightRange]
     parse_errors: list[ParseErrorItem]
     message: str = "ok"
+    keyword_series_columnar: KeywordSeriesColumnar | None = None
+    keyword_series_sparse: KeywordSeriesSparse | None = None
+
+    @model_serializer(mode="wrap")
+    def drop_unrequested_series(self, handler):
+        # 요청하지 않은 압축 형태 필드는 응답에서 뺀다 (기본 응답 형태 유지)
+        data = handler(self)
+        for key in ("keyword_series_columnar", "keyword_series_sparse"):
+            if data.get(key) is None:
+                data.pop(key, None)
+        return data
+
+
+class TermBucketCount(BaseModel):
+    bucket_start: datetime
+    bucket_start_offset_sec: int
+    bucket_start_offset_label: str
+    count: int
+
+
+class TermOccurrence(BaseModel):
+    timestamp: datetime
+    offset_sec: int
+    offset_label: str
+    count: int
+
+
+class TermSearchResult(BaseModel):
+    term: str
+    normalized_term: str
+    total_count: int
+    message_count: int
+    # 0회인 버킷은 생략
+    buckets: list[TermBucketCount]
+    occurrences: list[TermOccurrence] = Field(default_factory=list)
+    occurrences_truncated: bool = False
+
+
+class SearchResponse(BaseModel):
+    results: list[TermSearchResult]
+    parse_errors: list[ParseErrorItem]
+    message: str = "ok"
+
+
+class RawMessage(BaseModel):
+    timestamp: datetime
+    offset_sec: int
+    offset_label: str
+    nickname: str
+    user_id_hash: str
+    content: str
+
+
+class MessagesResponse(BaseModel):
+    messages: list[RawMessage]
+    # 구간 안 전체 메시지 수
+    total: int
+    # 다음 페이지 요청의 cursor (마지막 페이지면 None)
+    next_cursor: int | None = None
+    parse_errors: list[ParseErrorItem]
+    message: str = "ok"
+
+
+class SweepHighlight(BaseModel):
+    start_offset_sec: int
+    end_offset_sec: int
+    peak_offset_sec: int
+    score: float
+    peak_total_messages: int
+    representative_keyword: str | None = None
+
+
+class SweepCombination(BaseModel):
+    bucket_size_seconds: int
+    min_highlight_score: float
+    max_merge_buckets: int
+    # 같은 옵션의 /api/analyze highlights 와 같은 순서/값 (오프셋만 남긴 형태)
+    highlights: list[SweepHighlight]
+
+
+class SweepResponse(BaseModel):
+    total_messages: int
+    combinations: list[SweepCombination]
+    parse_errors: list[ParseErrorItem]
+    message: str = "ok"
+
+
+AnalyzeJobState = Literal["queued", "running", "succeeded", "failed"]
+
+
+class AnalyzeJobStatus(BaseModel):
+    job_id: str
+    vod_id: str
+    status: AnalyzeJobState
+    # 제출 시 같은 (vod_id, 요청) 의 진행 중인 작업을 돌려줬으면 True
+    deduplicated: bool = False
+    # 채팅 수집 진행도 (/api/progress 와 같은 값)
+    fetch_pages: int = 0
+    fetch_messages: int = 0
+    elapsed_sec: float = 0.0
+    # failed 일 때 동기 /api/analyze 가 돌려줬을 상태 코드와 detail
+    error_status: int | None = None
+    error_detail: str | None = None
+
+
+ProgressStage = Literal["fetch", "parse", "analyze", "done", "failed"]
+
+
+class ProgressEvent(BaseModel):
+    vod_id: str
+    # fetch(수집 페이지마다) → parse → analyze → done | failed
+    stage: ProgressStage
+    # 수집 진행도 (fetch 이후 단계에서는 이번 작업의 마지막 수집 값, 캐시된 로그면 0)
+    pages: int = 0
+    messages: int = 0
+    # 마지막으로 수집한 채팅의 VOD 위치 / VOD 길이 (초, 알 수 없으면 None)
+    position_sec: int | None = None
+    duration_sec: int | None = None
+    # 수집 남은 시간 추정 (초): 경과 시간 × 남은 길이 / 수집한 길이
+    eta_sec: float | None = None
+    # failed 일 때 오류 detail
+    detail: str | None = None
+
+
+_M = TypeVar("_M", bound=BaseModel)
+
+
+def trusted_constructor(model: type[_M]) -> Callable[..., _M]:
+    """검증 없이 모델을 만드는 함수를 돌려준다. 모든 필드를 정확한 타입으로 넘겨야 한다.
+
+    pydantic 이 지원하는 model_construct 를 쓴다. 분석기처럼 값을 직접 만들어 타입이 보장되는
+    대량 출력 모델(버킷 시계열)에만 쓰며, 결과는 같은 값으로 검증 생성한 모델과 같다
+    (==, 직렬화 결과, model_fields_set).
+    """
+    return model.model_construct
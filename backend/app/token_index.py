@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from .chatlog_cache import get_chatlog_index_path, log_fingerprint
+from .logging_config import get_logger
+from .message_store import MessageStore
+
+
+logger = get_logger(__name__)
+
+# 역색인 파일 구조 (chatlog_sidecar 와 같은 형식)
+#   MAGIC (8 bytes) | header 길이 (uint32 LE) | header JSON | 섹션 바이트들...
+_MAGIC = b"SGAKIDX\x00"
+_VERSION = 1
+_HEADER_LENGTH = struct.Struct("<I")
+_ARRAY_SECTIONS = {
+    "token_starts": "q",
+    "postings": "i",
+    "postings_ends": "q",
+}
+# 사이드카를 쓴 직후 역색인을 미리 만드는 스레드 (첫 /api/search 가 빌드를 기다리지 않게).
+# 분석과 GIL 을 나눠 쓰므로 하나만 둔다
+_prebuild_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="token-index")
+
+
+class TokenIndex:
+    """정규화된 본문의 공백 토큰 → 메시지 인덱스 역색인.
+
+    - postings: 토큰별 오름차순 메시지 인덱스. 한 메시지에 같은 토큰이 여러 번 나오면 그만큼 반복된다.
+    - 어휘는 개행으로 이어붙인 단일 문자열(vocabulary_text)과 토큰 시작 위치로 보관한다.
+      부분 문자열 검색은 어휘 전체에 대한 정규식 스캔 한 번으로 끝난다.
+
+    공백이 없는 검색어의 모든 출현은 한 토큰 안에 있으므로, contains 횟수는
+    "검색어를 포함하는 토큰들의 (토큰 안 횟수 × 출현 수) 합" 으로 본문을 보지 않고 구할 수 있다.
+    """
+
+    __slots__ = ("vocabulary_text", "token_starts", "postings", "postings_ends")
+
+    def __init__(self, vocabulary_text: str, token_starts: array, postings: array, postings_ends: array) -> None:
+        self.vocabulary_text = vocabulary_text
+        self.token_starts = token_starts
+        self.postings = postings
+        self.postings_ends = postings_ends
+
+    @classmethod
+    def build(cls, contents: list[str]) -> TokenIndex:
+        postings_by_token: dict[str, array] = {}
+        for message_index, content in enumerate(contents):
+            for token in content.split():
+                posting = postings_by_token.get(token)
+                if posting is None:
+                    posting = postings_by_token[token] = array("i")
+                posting.append(message_index)
+
+        token_starts = array("q")
+        postings = array("i")
+        postings_ends = array("q")
+        position = 0
+        for token, posting in postings_by_token.items():
+            token_starts.append(position)
+            position += len(token) + 1
+            postings.extend(posting)
+            postings_ends.append(len(postings))
+        return cls("\n".join(postings_by_token), token_starts, postings, postings_ends)
+
+    def __len__(self) -> int:
+        return len(self.token_starts)
+
+    def token(self, token_id: int) -> str:
+        start = self.token_starts[token_id]
+        end = self.token_starts[token_id + 1] - 1 if token_id + 1 < len(self.token_starts) else len(self.vocabulary_text)
+        return self.vocabulary_text[start:end]
+
+    def postings_of(self, token_id: int) -> array:
+        start = self.postings_ends[token_id - 1] if token_id > 0 else 0
+        return self.postings[start : self.postings_ends[token_id]]
+
+    def token_id(self, token: str) -> int | None:
+        """토큰과 정확히 같은 어휘의 id.
+
+        토큰 → id 사전을 따로 두면 저장소 파생 열의 크기가 과금 이후에 늘어나므로, 어휘 문자열에서
+        한 줄 전체가 일치하는 위치를 찾는다 (tokens_containing 과 같은 스캔 한 번).
+        """
+        match = re.search(f"^{re.escape(token)}$", self.vocabulary_text, re.MULTILINE)
+        return None if match is None else bisect_right(self.token_starts, match.start()) - 1
+
+    def tokens_containing(self, term: str) -> list[int]:
+        """term 을 부분 문자열로 포함하는 어휘 id (어휘 순). term 에 공백이 없어야 한다."""
+        token_ids: list[int] = []
+        starts = self.token_starts
+        for match in re.finditer(re.escape(term), self.vocabulary_text):
+            token_id = bisect_right(starts, match.start()) - 1
+            if not token_ids or token_ids[-1] != token_id:
+                token_ids.append(token_id)
+        return token_ids
+
+    @property
+    def nbytes(self) -> int:
+        size = sys.getsizeof(self.vocabulary_text)
+        for column in (self.token_starts, self.postings, self.postings_ends):
+            size += column.itemsize * len(column)
+        return size
+
+
+def write_token_index(index_path: Path, fingerprint: str, index: TokenIndex) -> bool:
+    sections: dict[str, bytes] = {name: getattr(index, name).tobytes() for name in _ARRAY_SECTIONS}
+    sections["vocabulary_text"] = index.vocabulary_text.encode("utf-8")
+
+    layout: dict[str, list[int]] = {}
+    position = 0
+    for name, raw in sections.items():
+        layout[name] = [position, len(raw)]
+        position += len(raw)
+
+    header = json.dumps(
+        {
+            "version": _VERSION,
+            "fingerprint": fingerprint,
+            "byteorder": sys.byteorder,
+            "token_count": len(index),
+            "sections": layout,
+        }
+    ).encode("utf-8")
+
+    # 같은 VOD 를 동시에 검색하면 두 스레드가 함께 기록할 수 있으므로 임시 파일 이름을 분리한다
+    temp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        with temp_path.open("wb") as handle:
+            handle.write(_MAGIC)
+            handle.write(_HEADER_LENGTH.pack(len(header)))
+            handle.write(header)
+            for raw in sections.values():
+                handle.write(raw)
+        os.replace(temp_path, index_path)
+    except OSError:
+        logger.exception("Failed to write token index: %s", index_path)
+        temp_path.unlink(missing_ok=True)
+        return False
+    return True
+
+
+def load_token_index(index_path: Path, fingerprint: str) -> TokenIndex | None:
+    try:
+        raw = index_path.read_bytes()
+    except FileNotFoundError:
+        return None
+    except OSError:
+        logger.exception("Failed to read token index: %s", index_path)
+        return None
+
+    try:
+        if raw[: len(_MAGIC)] != _MAGIC:
+            raise ValueError("bad magic")
+        (header_length,) = _HEADER_LENGTH.unpack_from(raw, len(_MAGIC))
+        body_start = len(_MAGIC) + _HEADER_LENGTH.size + header_length
+        header = json.loads(raw[len(_MAGIC) + _HEADER_LENGTH.size : body_start])
+        if (
+            header.get("version") != _VERSION
+            or header.get("fingerprint") != fingerprint
+            or header.get("byteorder") != sys.byteorder
+        ):
+            logger.info("Token index is stale, rebuilding: %s", index_path)
+            return None
+
+        view = memoryview(raw)
+
+        def section(name: str) -> memoryview:
+            start, length = header["sections"][name]
+            return view[body_start + start : body_start + start + length]
+
+        columns: dict[str, array] = {}
+        for name, typecode in _ARRAY_SECTIONS.items():
+            column = array(typecode)
+            column.frombytes(section(name))
+            columns[name] = column
+        if not len(columns["token_starts"]) == len(columns["postings_ends"]) == header["token_count"]:
+            raise ValueError("token count mismatch")
+        index = TokenIndex(
+            vocabulary_text=str(section("vocabulary_text"), "utf-8"),
+            token_starts=columns["token_starts"],
+            postings=columns["postings"],
+            postings_ends=columns["postings_ends"],
+        )
+    except (ValueError, KeyError, TypeError, struct.error):
+        logger.warning("Token index is corrupted, rebuilding: %s", index_path, exc_info=True)
+        return None
+    return index
+
+
+def get_token_index(
+    messages: MessageStore,
+    log_path: Path,
+    case_sensitive: bool,
+    normalize: bool,
+    contents: Callable[[], list[str]],
+) -> TokenIndex:
+    """정규화 옵션 조합별 역색인을 메모리(저장소 파생 열) → 디스크 → 새로 생성 순으로 얻는다.
+
+    contents 는 같은 옵션으로 정규화한 본문 목록을 돌려주는 함수로, 새로 만들 때만 호출된다.
+    """
+    key = ("token_index", case_sensitive, normalize)
+    index = messages.derived.get(key)
+    if index is not None:
+        logger.info("Token index hit (memory): path=%s", log_path)
+        return index
+
+    index_path = get_chatlog_index_path(log_path, case_sensitive, normalize)
+    fingerprint = log_fingerprint(log_path)
+    index = load_token_index(index_path, fingerprint)
+    if index is not None:
+        logger.info("Token index hit (disk): path=%s tokens=%s", index_path, len(index))
+    else:
+        started = time.perf_counter()
+        index = TokenIndex.build(contents())
+        write_token_index(index_path, fingerprint, index)
+        logger.info(
+            "Token index built: path=%s messages=%s tokens=%s postings=%s elapsed=%.3fs",
+            index_path,
+            len(messages),
+            len(index),
+            len(index.postings),
+            time.perf_counter() - started,
+        )
+    messages.derived[key] = index
+    return index
+
+
+def queue_token_index(
+    messages: MessageStore,
+    log_path: Path,
+    case_sensitive: bool,
+    normalize: bool,
+    contents: Callable[[], list[str]],
+) -> Future:
+    """get_token_index 를 백그라운드 스레드에서 미리 실행한다.
+
+    만든 역색인은 디스크와 저장소 파생 열에 남으므로 파싱 결과 LRU 의 예산으로 과금된다.
+    실패는 로그만 남긴다 (검색할 때 다시 만든다).
+    """
+
+    def build() -> None:
+        try:
+            get_token_index(messages, log_path, case_sensitive, normalize, contents)
+        except Exception:
+            logger.exception("Token index prebuild failed: path=%s", log_path)
+
+    return _prebuild_executor.submit(build)
+
+
+def wait_for_token_index_builds() -> None:
+    """지금까지 넣은 미리 만들기 작업이 끝날 때까지 기다린다 (스레드가 하나라 빈 작업 하나로 충분하다)."""
+    _prebuild_executor.submit(lambda: None).result()
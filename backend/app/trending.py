@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import zlib
+from array import array
+from math import sqrt
+
+
+# 버킷 창 하나에서 추적할 후보 수 = max(top_k × 배수, 최소값)
+_CANDIDATES_PER_TERM = 8
+_MIN_CANDIDATES = 64
+# 버킷 안에서 이 횟수(하한) 미만인 토큰은 떠오르는 단어로 보지 않는다
+_MIN_SUPPORT = 2
+_SKETCH_WIDTH = 4096
+_SKETCH_DEPTH = 4
+# sketch 반영을 버킷 단위로 모아 두는 토큰 수 상한 (넘으면 그 자리에서 반영한다)
+_PENDING_ENTRIES = 16384
+
+TrendingTerms = list[tuple[str, int, float]]
+
+
+class SpaceSaving:
+    """Space-Saving heavy hitter 요약 (Metwally et al.). 최대 capacity 개 항목만 센다.
+
+    count 는 실제 횟수 이상이며 count - error 는 실제 횟수 이하다. 실제 횟수가
+    전체/capacity 보다 큰 항목은 반드시 남는다.
+    """
+
+    __slots__ = ("capacity", "counts", "errors", "_victims", "_floor")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        # 최솟값 카운터 후보들. 카운트는 늘기만 하므로 값이 그대로인 후보는 여전히 최솟값이다
+        self._victims: list[str] = []
+        self._floor = 0
+
+    def add(self, item: str) -> None:
+        counts = self.counts
+        if item in counts:
+            counts[item] += 1
+            return
+        if len(counts) < self.capacity:
+            counts[item] = 1
+            self.errors[item] = 0
+            return
+        # 가장 작은 카운터를 새 항목에 넘겨준다 (그 값이 새 항목의 오차 상한)
+        victim = self._pop_victim()
+        floor = counts.pop(victim)
+        del self.errors[victim]
+        counts[item] = floor + 1
+        self.errors[item] = floor
+
+    def _pop_victim(self) -> str:
+        counts = self.counts
+        victims = self._victims
+        while victims:
+            victim = victims.pop()
+            if counts.get(victim) == self._floor:
+                return victim
+        # 후보가 모두 소진되면 한 번 훑어 최솟값 카운터들을 다시 모은다 (역순으로 꺼내 삽입 순서대로 뺀다)
+        floor = min(counts.values())
+        victims.extend(reversed([item for item, count in counts.items() if count == floor]))
+        self._floor = floor
+        return victims.pop()
+
+    def items(self) -> list[tuple[str, int, int]]:
+        """(항목, count, error) 목록."""
+        errors = self.errors
+        return [(item, count, errors[item]) for item, count in self.counts.items()]
+
+
+class CountMinSketch:
+    """Count-Min sketch. estimate 는 실제 횟수 이상이며 메모리는 width × depth 로 고정이다.
+
+    해시는 프로세스마다 바뀌는 hash() 대신 crc32 두 개의 이중 해싱으로 만들어
+    같은 입력이면 어느 프로세스에서나 같은 값을 낸다.
+    """
+
+    __slots__ = ("width", "depth", "table")
+
+    def __init__(self, width: int = _SKETCH_WIDTH, depth: int = _SKETCH_DEPTH) -> None:
+        self.width = width
+        self.depth = depth
+        self.table = array("q", bytes(8 * width * depth))
+
+    def cells(self, item: str) -> list[int]:
+        raw = item.encode("utf-8")
+        first = zlib.crc32(raw)
+        second = zlib.crc32(raw, 0x9E3779B9) | 1
+        width = self.width
+        return [row * width + (first + row * second) % width for row in range(self.depth)]
+
+    def add(self, item: str, count: int = 1) -> None:
+        table = self.table
+        for cell in self.cells(item):
+            table[cell] += count
+
+    def estimate(self, item: str) -> int:
+        table = self.table
+        return min(table[cell] for cell in self.cells(item))
+
+
+class TrendingTracker:
+    """버킷 창별로 '떠오르는' 토큰을 찾는다. 메모리는 채팅량과 무관하게
+    (Space-Saving 후보 수 + Count-Min 크기 + 버킷 수 × top_k) 로 제한된다.
+
+    토큰은 정규화된 본문의 공백 토큰이며 메시지당 한 번만 센다. 버킷의 후보 t 에 대해
+    기대 횟수 = (지금까지 전체에서 t 가 나온 메시지 수 추정) × (버킷 메시지 수 / 지금까지 메시지 수)
+    와 버킷 안 횟수 하한을 비교한 z 형태 점수 (count - expected) / sqrt(expected + 1) 가 높은
+    순으로 top_k 개를 남긴다. 지금까지에는 현재 버킷도 포함되어, 로그 초반의 단어가
+    과하게 떠오르지 않는다.
+    """
+
+    __slots__ = ("top_k", "capacity", "sketch", "window", "seen_messages", "_pending")
+
+    def __init__(self, top_k: int) -> None:
+        self.top_k = top_k
+        self.capacity = max(top_k * _CANDIDATES_PER_TERM, _MIN_CANDIDATES)
+        self.sketch = CountMinSketch()
+        self.window = SpaceSaving(self.capacity)
+        self.seen_messages = 0
+        # 아직 sketch 에 반영하지 않은 토큰별 횟수. 같은 토큰의 해시/갱신을 버킷당 한 번으로 줄인다
+        self._pending: dict[str, int] = {}
+
+    def add(self, content: str) -> None:
+        window_add = self.window.add
+        pending = self._pending
+        for token in set(content.split()):
+            window_add(token)
+            pending[token] = pending.get(token, 0) + 1
+        if len(pending) > _PENDING_ENTRIES:
+            self._flush()
+
+    def _flush(self) -> None:
+        sketch_add = self.sketch.add
+        for token, count in self._pending.items():
+            sketch_add(token, count)
+        self._pending = {}
+
+    def close_bucket(self, bucket_messages: int) -> TrendingTerms:
+        """현재 버킷 창을 닫고 (토큰, 버킷 안 횟수 하한, 점수) 를 점수 내림차순으로 반환한다."""
+        self._flush()
+        self.seen_messages += bucket_messages
+        share = bucket_messages / self.seen_messages if self.seen_messages else 0.0
+        estimate = self.sketch.estimate
+
+        ranked: TrendingTerms = []
+        for token, count, error in self.window.items():
+            guaranteed = count - error
+            if guaranteed < _MIN_SUPPORT:
+                continue
+            expected = estimate(token) * share
+            score = (guaranteed - expected) / sqrt(expected + 1)
+            if score > 0:
+                ranked.append((token, guaranteed, round(score, 3)))
+        self.window = SpaceSaving(self.capacity)
+        ranked.sort(key=lambda item: (-item[2], -item[1], item[0]))
+        return ranked[: self.top_k]
+
+
+def merge_trending(per_bucket: list[TrendingTerms], top_k: int) -> TrendingTerms:
+    """여러 버킷(하이라이트 범위)의 결과를 합친다: 횟수는 합, 점수는 최댓값."""
+    merged: dict[str, tuple[int, float]] = {}
+    for terms in per_bucket:
+        for token, count, score in terms:
+            previous = merged.get(token)
+            if previous is None:
+                merged[token] = (count, score)
+            else:
+                merged[token] = (previous[0] + count, max(previous[1], score))
+    ranked = [(token, count, score) for token, (count, score) in merged.items()]
+    ranked.sort(key=lambda item: (-item[2], -item[1], item[0]))
+    return ranked[:top_k]
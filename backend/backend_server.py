@@ -19,6 +19,7 @@ Electron(또는 테스트 스크립트)이 --port 인자로 직접 실행하는
 from __future__ import annotations
 
 import argparse
+import multiprocessing
 import socket
 import sys
 from pathlib import Path
@@ -67,10 +68,19 @@ def _parse_args() -> argparse.Namespace:
         default=None,
         help="Listening port (default: random free port)",
     )
+    parser.add_argument(
+        "--job-concurrency",
+        type=int,
+        default=None,
+        help="Max concurrently running /api/jobs/analyze jobs (default: app.jobs.ANALYZE_JOB_CONCURRENCY)",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
+    # frozen(exe) 환경에서 대용량 로그 병렬 파싱용 프로세스 풀 워커가
+    # 서버를 다시 띄우지 않고 워커로만 동작하도록 가장 먼저 호출한다.
+    multiprocessing.freeze_support()
     _setup_sys_path()
 
     args = _parse_args()
@@ -83,6 +93,12 @@ def main() -> None:
     # uvicorn import는 sys.path 설정 이후에 해야 한다
     import uvicorn  # noqa: PLC0415
 
+    if args.job_concurrency is not None:
+        # uvicorn 은 같은 프로세스에서 app.main 을 import 하므로 모듈 전역 설정이 그대로 쓰인다
+        from app.jobs import analysis_jobs  # noqa: PLC0415
+
+        analysis_jobs.max_workers = max(args.job_concurrency, 1)
+
     try:
         uvicorn.run(
             "app.main:app",
@@ -0,0 +1,68 @@
+"""benchmarks/_common.py
+
+벤치마크 스크립트 공용 헬퍼. backend/ 를 sys.path 에 추가하고
+실제 로그 형식을 흉내 낸 합성 채팅 로그를 생성한다.
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Iterator, TypeVar
+
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND_DIR = ROOT / "backend"
+T = TypeVar("T")
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+_REACTIONS = ["ㅋㅋㅋㅋ", "ㅋㅋ", "ㅎㅎㅎ", "ㅠㅠㅠ", "허어어억", "헉", "와", "미쳤다", "ㄷㄷㄷ", "?", "GG", "lol"]
+_WORDS = ["방송", "오늘", "게임", "진짜", "이거", "아니", "왜", "그냥", "다음", "보스", "클립", "하이라이트"]
+
+
+def synthetic_lines(message_count: int, duration_sec: int = 4 * 3600, users: int = 20000, seed: int = 7) -> Iterator[str]:
+    """playerMessageTime 기반(1970-01-01) 로그 줄을 오프셋 순서로 생성한다."""
+    rng = random.Random(seed)
+    offsets = sorted(rng.randrange(duration_sec) for _ in range(message_count))
+    for offset in offsets:
+        hours, remain = divmod(offset, 3600)
+        minutes, seconds = divmod(remain, 60)
+        user = rng.randrange(users)
+        words = rng.choices(_WORDS, k=rng.randint(0, 4)) + rng.choices(_REACTIONS, k=rng.randint(0, 2))
+        rng.shuffle(words)
+        content = " ".join(words) or "ㅋㅋ"
+        yield (
+            f"[1970-01-01 {hours:02d}:{minutes:02d}:{seconds:02d}] "
+            f"viewer{user}: {content} ({user:032x})\n"
+        )
+
+
+def write_synthetic_log(path: Path, message_count: int, **kwargs) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as handle:
+        handle.writelines(synthetic_lines(message_count, **kwargs))
+    return path
+
+
+def run(label: str, func: Callable[[], T], trace_memory: bool = True) -> T:
+    """func 를 한 번 실행해 경과 시간을 재고, trace_memory 면 tracemalloc 아래에서
+    한 번 더 실행해 피크 메모리를 잰다 (tracemalloc 오버헤드가 시간에 섞이지 않도록)."""
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    if not trace_memory:
+        print(f"{label:<48} {elapsed:8.3f}s")
+        return result
+
+    del result
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    print(f"{label:<48} {elapsed:8.3f}s  peak={peak / 1024 / 1024:8.1f} MiB")
+    return result
@@ -0,0 +1,65 @@
+"""benchmarks/bench_analysis_engine.py
+
+같은 MessageStore 에 대해 순수 Python 엔진과 NumPy 엔진의 build_analysis 경과 시간을
+비교하고, 두 결과가 같은지 확인한다. 키워드 없이(버킷/고유 사용자/스코어링만) 와
+키워드 포함 두 경우를 잰다. 키워드 포함은 정규화 본문 캐시가 비어 있을 때(cold)와
+같은 저장소로 키워드만 바꿔 재분석할 때(warm)를 따로 잰다. 마지막으로 버킷 크기 슬라이더를
+끌 때처럼 bucket_size_seconds 만 바꿔 가며 연속 분석하는 경우(bucket sweep)를 잰다.
+
+실행:
+    python benchmarks/bench_analysis_engine.py [message_count]
+"""
+from __future__ import annotations
+
+import sys
+
+from _common import run, synthetic_lines
+
+from app.analyzer import build_analysis
+from app.message_store import MessageStoreBuilder
+from app.parser import _parse_lines
+from app.schemas import AnalyzeOptions
+
+KEYWORDS = ["ㅋㅋ", "헉", "와", "미쳤다", "GG"]
+
+
+def main() -> None:
+    message_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    builder = MessageStoreBuilder()
+    _parse_lines(synthetic_lines(message_count), "synthetic.log", builder, [])
+    store = builder.build()
+    options = AnalyzeOptions(bucket_size_seconds=5)
+    print(f"synthetic store: {len(store)} messages, {store.user_count} users")
+
+    for label, keywords in (("no keywords", []), ("keywords cold", KEYWORDS), ("keywords warm", KEYWORDS[:3])):
+        results = []
+        for engine in ("python", "numpy"):
+            if label.endswith("cold"):
+                store.derived.clear()
+            results.append(
+                run(
+                    f"{engine} engine ({label})",
+                    lambda: build_analysis(store, keywords, options, engine=engine),
+                    trace_memory=False,
+                )
+            )
+        assert results[0] == results[1]
+
+    bucket_sizes = [5, 7, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300]
+    sweeps = []
+    for engine in ("python", "numpy"):
+        sweeps.append(
+            run(
+                f"{engine} engine (bucket sweep x{len(bucket_sizes)})",
+                lambda: [
+                    build_analysis(store, KEYWORDS, AnalyzeOptions(bucket_size_seconds=size), engine=engine)
+                    for size in bucket_sizes
+                ],
+                trace_memory=False,
+            )
+        )
+    assert sweeps[0] == sweeps[1]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""benchmarks/bench_highlight_sweep.py
+
+버킷 크기 × min_highlight_score × max_merge_buckets 격자를 조합마다 build_analysis 로
+돌리는 경우(수동 튜닝 루프)와 build_highlight_sweep 한 번으로 구하는 경우를 엔진별로 비교하고,
+두 결과의 하이라이트가 같은지 확인한다. 각 측정 전에 저장소 파생 캐시를 비운다.
+
+실행:
+    python benchmarks/bench_highlight_sweep.py [message_count]
+"""
+from __future__ import annotations
+
+import sys
+
+from _common import run, synthetic_lines
+
+from app.analyzer import build_analysis, build_highlight_sweep
+from app.message_store import MessageStoreBuilder
+from app.parser import _parse_lines
+from app.schemas import AnalyzeOptions
+
+KEYWORDS = ["ㅋㅋ", "헉", "와", "미쳤다", "GG"]
+BUCKET_SIZES = [5, 10, 15, 20, 30, 45, 60]
+MIN_SCORES = [0.8, 1.0, 1.2, 1.5, 2.0]
+MERGES = [1, 2, 3, 5]
+
+
+def _offsets(highlights) -> list[tuple]:
+    return [(item.start_offset_sec, item.end_offset_sec, item.peak_offset_sec, item.score) for item in highlights]
+
+
+def main() -> None:
+    message_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    builder = MessageStoreBuilder()
+    _parse_lines(synthetic_lines(message_count), "synthetic.log", builder, [])
+    store = builder.build()
+    combinations = [(size, score, merge) for size in BUCKET_SIZES for score in MIN_SCORES for merge in MERGES]
+    print(f"synthetic store: {len(store)} messages, grid {len(combinations)} combinations")
+
+    for engine in ("python", "numpy"):
+        store.derived.clear()
+        loop = run(
+            f"{engine} engine (build_analysis per combination)",
+            lambda: [
+                build_analysis(
+                    store,
+                    KEYWORDS,
+                    AnalyzeOptions(bucket_size_seconds=size, min_highlight_score=score, max_merge_buckets=merge),
+                    engine=engine,
+                )[3]
+                for size, score, merge in combinations
+            ],
+            trace_memory=False,
+        )
+        store.derived.clear()
+        sweep = run(
+            f"{engine} engine (build_highlight_sweep)",
+            lambda: build_highlight_sweep(
+                store, KEYWORDS, AnalyzeOptions(), BUCKET_SIZES, MIN_SCORES, MERGES, engine=engine
+            ),
+            trace_memory=False,
+        )
+        assert [_offsets(highlights) for highlights in loop] == [_offsets(row.highlights) for row in sweep]
+
+
+if __name__ == "__main__":
+    main()
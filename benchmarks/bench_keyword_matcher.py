@@ -0,0 +1,78 @@
+"""benchmarks/bench_keyword_matcher.py
+
+키워드 수에 따른 메시지당 키워드 카운트 비용을 비교한다.
+- per-keyword: 기존 방식 (키워드마다 _count_keyword → str.count)
+- automaton: KeywordMatcher 의 Aho–Corasick 단일 스캔
+
+두 방식의 결과가 같은지도 확인한다. 키워드 수가 늘어도 automaton 은 거의 일정해야 한다.
+
+실행:
+    python benchmarks/bench_keyword_matcher.py [message_count]
+"""
+from __future__ import annotations
+
+import re
+import sys
+import time
+
+from _common import synthetic_lines
+
+from app.analyzer import _count_keyword, _normalize_repeated_reactions
+from app.keyword_matcher import KeywordMatcher
+
+# 편집자가 붙여 넣는 반응 키워드 목록을 흉내 낸 후보
+_KEYWORD_POOL = [
+    "ㅋㅋ", "ㅎㅎ", "ㅠㅠ", "ㅜㅜ", "헉", "와", "미쳤다", "ㄷㄷ", "?", "gg", "lol", "레전드",
+    "클립", "하이라이트", "보스", "진짜", "대박", "실화", "ㅇㅈ", "ㄹㅇ", "킹", "갓", "뭐야", "개웃",
+    "오", "아", "헐", "와우", "굿", "nice", "wow", "omg", "pog", "kekw", "rip", "ez", "ff", "mvp",
+    "천재", "사기", "ㄱㅇㄷ", "ㅅㅂ", "눈물", "감동", "소름", "찢었다", "역대급", "미친", "클립각", "박제",
+]
+_CONTENT = re.compile(r"^\[[^\]]+\] [^:]+: (.*) \([0-9a-f]+\)$")
+
+
+def _per_keyword(contents: list[str], keywords: list[str]) -> list[int]:
+    totals = [0] * len(keywords)
+    indices = range(len(keywords))
+    for content in contents:
+        for index in indices:
+            count = _count_keyword(content, keywords[index], "contains")
+            if count > 0:
+                totals[index] += count
+    return totals
+
+
+def _automaton(contents: list[str], keywords: list[str]) -> list[int]:
+    matcher = KeywordMatcher(keywords, "contains")
+    matcher._use_automaton = True  # 임계값과 무관하게 오토마톤 경로를 잰다
+    matcher._build_automaton()
+    totals = [0] * len(keywords)
+    for content in contents:
+        for index, count in matcher.count(content).items():
+            totals[index] += count
+    return totals
+
+
+def _timed(func, *args) -> tuple[float, list[int]]:
+    started = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started, result
+
+
+def main() -> None:
+    message_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    contents = [
+        _normalize_repeated_reactions(_CONTENT.match(line.rstrip("\n")).group(1).lower())
+        for line in synthetic_lines(message_count)
+    ]
+    print(f"{message_count} messages")
+    print(f"{'keywords':>8}  {'per-keyword':>12}  {'automaton':>10}")
+    for keyword_count in (1, 2, 4, 8, 16, 32, 50):
+        keywords = _KEYWORD_POOL[:keyword_count]
+        per_keyword_sec, expected = _timed(_per_keyword, contents, keywords)
+        automaton_sec, actual = _timed(_automaton, contents, keywords)
+        assert actual == expected
+        print(f"{keyword_count:>8}  {per_keyword_sec:>11.3f}s  {automaton_sec:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
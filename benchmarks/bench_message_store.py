@@ -0,0 +1,71 @@
+"""benchmarks/bench_message_store.py
+
+list[ChatMessage] (기존 표현) 과 MessageStore (열 저장소) 의
+파싱 시간 / 피크 메모리 / 분석 시간을 합성 대용량 로그로 비교한다.
+
+실행:
+    python benchmarks/bench_message_store.py [message_count]
+"""
+from __future__ import annotations
+
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from _common import run, write_synthetic_log
+
+from app.analyzer import build_analysis
+from app.message_store import MessageStore, MessageStoreBuilder
+from app.parser import LOG_LINE_PATTERN, _parse_lines
+from app.schemas import AnalyzeOptions, ChatMessage
+
+KEYWORDS = ["ㅋㅋ", "헉", "와", "미쳤다", "GG"]
+
+
+def _legacy_parse(path: Path) -> list[ChatMessage]:
+    """기존 parse_chat_logs 의 줄 단위 루프 (메시지당 ChatMessage + strptime)."""
+    messages: list[ChatMessage] = []
+    with path.open("r", encoding="utf-8") as handle:
+        for raw_line in handle:
+            match = LOG_LINE_PATTERN.match(raw_line.rstrip("\n"))
+            if not match:
+                continue
+            groups = match.groupdict()
+            messages.append(
+                ChatMessage(
+                    timestamp=datetime.strptime(groups["timestamp"], "%Y-%m-%d %H:%M:%S"),
+                    nickname=groups["nickname"].strip() or "Unknown",
+                    content=groups["content"],
+                    user_id_hash=groups["user_id_hash"],
+                )
+            )
+    messages.sort(key=lambda item: item.timestamp)
+    return messages
+
+
+def _store_parse(path: Path) -> MessageStore:
+    builder = MessageStoreBuilder()
+    with path.open("r", encoding="utf-8") as handle:
+        _parse_lines(handle, str(path), builder, [])
+    return builder.build()
+
+
+def main() -> None:
+    message_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_log(Path(tmp) / "chatLog-bench.log", message_count)
+        print(f"synthetic log: {message_count} messages, {path.stat().st_size / 1024 / 1024:.1f} MiB")
+
+        legacy = run("parse -> list[ChatMessage] (legacy)", lambda: _legacy_parse(path))
+        del legacy
+
+        store = run("parse -> MessageStore", lambda: _store_parse(path))
+        print(f"{'MessageStore.nbytes':<48} {store.nbytes / 1024 / 1024:8.1f} MiB")
+
+        run("build_analysis(MessageStore)", lambda: build_analysis(store, KEYWORDS, AnalyzeOptions()), trace_memory=False)
+        run("MessageStore -> list[ChatMessage] (boundary)", store.to_chat_messages, trace_memory=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""benchmarks/bench_response.py
+
+대형 분석 응답의 HTTP 종단 시간과 직렬화 경로별 시간을 비교한다.
+
+- standard route: 같은 핸들러를 표준 APIRoute 로 등록 (반환 모델을 response_model 로 검증 후 직렬화)
+- fast route: main.app (FastModelRoute, 검증 없이 pydantic-core 로 바로 bytes)
+- 직렬화만: FastAPI 구버전 경로(dict → 검증 → dict → json.dumps) / model_dump_json / json_response.dumps
+
+실행:
+    python benchmarks/bench_response.py [message_count]
+"""
+from __future__ import annotations
+
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from _common import write_synthetic_log
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from app import chatlog_cache, main
+from app.json_response import dumps
+from app.parsed_cache import parsed_log_cache
+from app.schemas import AnalyzeRequest, AnalyzeResponse, SourceConfig
+
+KEYWORDS = ["ㅋㅋ", "헉", "와", "미쳤다", "GG", "?"]
+REPEAT = 5
+
+
+def best(label: str, func: Callable[[], object], before: Callable[[], None] = lambda: None) -> None:
+    elapsed = []
+    for _ in range(REPEAT):
+        before()
+        started = time.perf_counter()
+        func()
+        elapsed.append(time.perf_counter() - started)
+    print(f"{label:<56} {min(elapsed):8.3f}s")
+
+
+def main_() -> None:
+    message_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp)
+        chatlog_cache.get_chatlog_cache_dir = lambda: cache_dir
+        write_synthetic_log(cache_dir / "chatLog-bench.log", message_count)
+        payload = AnalyzeRequest(
+            source=SourceConfig(vod_id="bench"), keywords=KEYWORDS, options={"bucket_size_seconds": 5}
+        )
+        analyzed = main._run_analysis(payload, context="Analyze")
+        size = len(dumps(analyzed))
+        print(
+            f"synthetic log: {message_count} messages, response {size / 1024 / 1024:.1f} MiB "
+            f"(volume {len(analyzed.volume_series)}, keyword {len(analyzed.keyword_series)} points)"
+        )
+
+        standard_app = FastAPI()
+        standard_app.router.add_api_route(
+            "/api/analyze", main.analyze, methods=["POST"], response_model=AnalyzeResponse, route_class_override=APIRoute
+        )
+        body = payload.model_dump_json()
+        headers = {"Content-Type": "application/json"}
+        for name, client in (("standard route", TestClient(standard_app)), ("fast route", TestClient(main.app))):
+            best(
+                f"HTTP {name} (parse + analyze)",
+                lambda: client.post("/api/analyze", content=body, headers=headers).content,
+                lambda: (parsed_log_cache.clear(), main.analysis_result_cache.clear()),
+            )
+            best(
+                f"HTTP {name} (result cache hit)",
+                lambda: client.post("/api/analyze", content=body, headers=headers).content,
+            )
+
+        best(
+            "serialize: dump -> validate -> dump -> json.dumps",
+            lambda: json.dumps(
+                AnalyzeResponse.model_validate(analyzed.model_dump()).model_dump(mode="json"),
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode("utf-8"),
+        )
+        best("serialize: model_dump_json().encode()", lambda: analyzed.model_dump_json().encode("utf-8"))
+        best("serialize: json_response.dumps", lambda: dumps(analyzed))
+
+
+if __name__ == "__main__":
+    main_()
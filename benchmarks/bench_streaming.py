@@ -0,0 +1,52 @@
+"""benchmarks/bench_streaming.py
+
+MessageStore 를 만든 뒤 분석하는 경로와, 파서 레코드를 바로 집계하는 스트리밍 경로의
+경과 시간 / 피크 메모리를 비교한다. 스트리밍의 피크는 메시지 수가 아니라
+버킷 수 + 고유 사용자 수에 비례해야 한다.
+
+실행:
+    python benchmarks/bench_streaming.py [message_count]
+"""
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+
+from _common import run, write_synthetic_log
+
+from app import chatlog_cache
+from app.analyzer import build_analysis, build_analysis_streaming
+from app.parser import _parse_lines, iter_chat_records
+from app.message_store import MessageStoreBuilder
+from app.schemas import AnalyzeOptions, SourceConfig
+
+KEYWORDS = ["ㅋㅋ", "헉", "와", "미쳤다", "GG"]
+
+
+def main() -> None:
+    message_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp)
+        chatlog_cache.get_chatlog_cache_dir = lambda: cache_dir
+        path = write_synthetic_log(cache_dir / "chatLog-bench.log", message_count)
+        print(f"synthetic log: {message_count} messages, {path.stat().st_size / 1024 / 1024:.1f} MiB")
+
+        def materialized():
+            builder = MessageStoreBuilder()
+            with path.open("r", encoding="utf-8") as handle:
+                _parse_lines(handle, str(path), builder, [])
+            return build_analysis(builder.build(), KEYWORDS, AnalyzeOptions())
+
+        def streaming():
+            return build_analysis_streaming(
+                iter_chat_records(SourceConfig(vod_id="bench"), []), KEYWORDS, AnalyzeOptions()
+            )
+
+        expected = run("parse -> MessageStore -> build_analysis", materialized)
+        streamed = run("iter_chat_records -> build_analysis_streaming", streaming)
+        assert streamed == expected
+
+
+if __name__ == "__main__":
+    main()
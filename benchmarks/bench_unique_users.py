@@ -0,0 +1,93 @@
+"""benchmarks/bench_unique_users.py
+
+버킷별 고유 사용자 수 계산 방식별 경과 시간 / 피크 메모리를 비교한다 (입력 열은 이미 메모리에 있음).
+- legacy: 기존 build_analysis 처럼 버킷마다 set[str] 을 모두 유지 + 전체 set[str]
+- bucket set: 버킷이 끝날 때마다 set[int] 을 개수로 확정하고 버림
+  (_BucketAccumulator 의 방식)
+- last-seen array: "사용자 코드 → 마지막으로 센 버킷 번호" array('i') — 비교용.
+  메모리가 사용자 수에 비례하고 CPython 에서는 set.add 보다 느려 채택하지 않았다
+- numpy pairs: numpy 엔진의 (구간, 사용자) 정수 키 정렬 + 중복 제거
+
+실행:
+    python benchmarks/bench_unique_users.py [message_count]
+"""
+from __future__ import annotations
+
+import sys
+from array import array
+from collections import defaultdict
+
+from _common import run, synthetic_lines
+
+from app.analyzer import _aggregate_store_numpy
+from app.message_store import MessageStoreBuilder
+from app.parser import _parse_lines
+from app.schemas import AnalyzeOptions
+
+BUCKET_SIZE_SECONDS = 7  # 레벨 쌍을 한 번 더 중복 제거하는 일반 경로
+
+
+def main() -> None:
+    message_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    builder = MessageStoreBuilder()
+    _parse_lines(synthetic_lines(message_count, users=200_000), "synthetic.log", builder, [])
+    store = builder.build()
+    print(f"synthetic store: {len(store)} messages, {store.user_count} users")
+    offsets = store.offsets
+    user_codes = store.user_codes
+    user_ids = store.user_ids
+
+    def legacy() -> tuple[list[int], int]:
+        by_bucket_users: dict[int, set[str]] = defaultdict(set)
+        for offset_sec, code in zip(offsets, user_codes):
+            by_bucket_users[offset_sec // BUCKET_SIZE_SECONDS].add(user_ids[code])
+        all_users = {user_ids[code] for code in user_codes}
+        return [len(users) for users in by_bucket_users.values()], len(all_users)
+
+    def bucket_set() -> tuple[list[int], int]:
+        counts: list[int] = []
+        current = None
+        users: set[int] = set()
+        for offset_sec, code in zip(offsets, user_codes):
+            bucket = offset_sec // BUCKET_SIZE_SECONDS
+            if bucket != current:
+                if current is not None:
+                    counts.append(len(users))
+                current = bucket
+                users = set()
+            users.add(code)
+        counts.append(len(users))
+        return counts, store.user_count
+
+    def last_seen_array() -> tuple[list[int], int]:
+        counts: list[int] = []
+        last_seen = array("i", [-1]) * store.user_count
+        current = None
+        number = -1
+        for offset_sec, code in zip(offsets, user_codes):
+            bucket = offset_sec // BUCKET_SIZE_SECONDS
+            if bucket != current:
+                current = bucket
+                number += 1
+                counts.append(0)
+            if last_seen[code] != number:
+                last_seen[code] = number
+                counts[-1] += 1
+        return counts, store.user_count
+
+    def numpy_pairs() -> tuple[list[int], int]:
+        store.derived.clear()
+        aggregates = _aggregate_store_numpy(store, [], AnalyzeOptions(bucket_size_seconds=BUCKET_SIZE_SECONDS))
+        return aggregates.unique_users, store.user_count
+
+    expected = run("legacy set[str] per bucket", legacy)
+    for label, func in (
+        ("bucket set[int], closed per bucket", bucket_set),
+        ("last-seen array('i')", last_seen_array),
+        ("numpy (bucket, user) pairs", numpy_pairs),
+    ):
+        assert run(label, func) == expected
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 import { useMemo, useRef, useState } from "react";
 import type { ChangeEvent } from "react";
 
-import { analyzeChatLog, getProgress } from "./api";
-import type { FetchProgress } from "./api";
+import { analyzeChatLogProgressive, subscribeProgress } from "./api";
+import type { FetchProgressEvent } from "./api";
 import { LineChart } from "./LineChart";
 import type { AnalyzeRequest, AnalyzeResponse } from "./types";
 
@@ -41,10 +41,10 @@ export function App() {
   const [bucketSize, setBucketSize] = useState(30);
   const [minScore, setMinScore] = useState(1.2);
   const [loading, setLoading] = useState(false);
-  const [fetchProgress, setFetchProgress] = useState<FetchProgress | null>(null);
+  const [fetchProgress, setFetchProgress] = useState<FetchProgressEvent | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [result, setResult] = useState<AnalyzeResponse | null>(null);
-  const progressIntervalRef = useRef<ReturnType<typeof setInterval> | null>(null);
+  const progressUnsubscribeRef = useRef<(() => void) | null>(null);
   const [focusedPeakBucket, setFocusedPeakBucket] = useState<string | null>(null);
   const [chartWindowSize, setChartWindowSize] = useState<number | null>(null);
   const [chartPanCenter, setChartPanCenter] = useState<number | null>(null);
@@ -123,17 +123,12 @@ export function App() {
     const payload = buildCurrentAnalyzePayload();
     const targetVodId = vodId.trim();
 
-    // 500ms 간격으로 수집 진행도 폴링 시작
-    progressIntervalRef.current = setInterval(async () => {
-      const p = await getProgress(targetVodId);
-      setFetchProgress(p);
-      if (p.done) {
-        if (progressIntervalRef.current) clearInterval(progressIntervalRef.current);
-      }
-    }, 500);
+    // 수집/파싱/분석 진행 이벤트 구독 (SSE, 실패 시 폴링)
+    progressUnsubscribeRef.current = subscribeProgress(targetVodId, setFetchProgress);
 
     try {
-      const analyzed = await analyzeChatLog(payload);
+      // 요약/채팅량 시계열이 먼저 오면 차트부터 그린다
+      const analyzed = await analyzeChatLogProgressive(payload, setResult);
       setResult(analyzed);
       setFocusedPeakBucket(analyzed.highlights[0]?.peak_bucket ?? null);
 
@@ -150,7 +145,8 @@ export function App() {
     } catch (requestError) {
       setError(requestError instanceof Error ? requestError.message : "알 수 없는 오류");
     } finally {
-      if (progressIntervalRef.current) clearInterval(progressIntervalRef.current);
+      progressUnsubscribeRef.current?.();
+      progressUnsubscribeRef.current = null;
       setFetchProgress(null);
       setLoading(false);
     }
@@ -253,13 +249,18 @@ export function App() {
           {loading ? "분석 중..." : "분석 실행"}
         </button>
 
-        {loading && fetchProgress && !fetchProgress.done && fetchProgress.pages > 0 ? (
+        {loading && fetchProgress && fetchProgress.stage === "fetch" && fetchProgress.pages > 0 ? (
           <div className="fetch-progress">
             <div className="fetch-progress-label">
               채팅 수집 중&nbsp;
               <span className="fetch-progress-count">{fetchProgress.pages} 페이지</span>
               &nbsp;/&nbsp;
               <span className="fetch-progress-count">{fetchProgress.messages.toLocaleString()} 건</span>
+              {fetchProgress.eta_sec !== null ? (
+                <>
+                  &nbsp;·&nbsp;약 {Math.ceil(fetchProgress.eta_sec)}초 남음
+                </>
+              ) : null}
             </div>
             <div className="fetch-progress-bar">
               <div className="fetch-progress-bar-inner" />
@@ -1,24 +1,97 @@
-import type { AnalyzeRequest, AnalyzeResponse } from "./types";
+import type { AnalyzeRequest, AnalyzeResponse, MessagesRequest, MessagesResponse } from "./types";
 
 const BASE_URL =
   (import.meta.env.VITE_API_BASE_URL as string | undefined)?.trim() ||
   (typeof window !== "undefined" ? window.location.origin : "http://localhost:8000");
 
+// 같은 요청 본문의 마지막 응답과 ETag. 서버가 304 를 주면 다시 내려받지 않고 재사용한다.
+const ANALYZE_CACHE_MAX_ENTRIES = 8;
+const analyzeCache = new Map<string, { etag: string; data: AnalyzeResponse }>();
+
 export async function analyzeChatLog(payload: AnalyzeRequest): Promise<AnalyzeResponse> {
+  const body = JSON.stringify(payload);
+  const cached = analyzeCache.get(body);
+  const headers: Record<string, string> = {
+    "Content-Type": "application/json",
+  };
+  if (cached) headers["If-None-Match"] = cached.etag;
+
   const response = await fetch(`${BASE_URL}/api/analyze`, {
+    method: "POST",
+    headers,
+    body,
+  });
+
+  if (response.status === 304 && cached) {
+    return cached.data;
+  }
+
+  if (!response.ok) {
+    const text = await response.text();
+    throw new Error(text || "분석 요청 실패");
+  }
+
+  const data = (await response.json()) as AnalyzeResponse;
+  rememberAnalyzeResult(body, response.headers.get("ETag"), data);
+  return data;
+}
+
+function rememberAnalyzeResult(body: string, etag: string | null, data: AnalyzeResponse) {
+  analyzeCache.delete(body);
+  if (etag) {
+    analyzeCache.set(body, { etag, data });
+    if (analyzeCache.size > ANALYZE_CACHE_MAX_ENTRIES) {
+      analyzeCache.delete(analyzeCache.keys().next().value as string);
+    }
+  }
+}
+
+/**
+ * /api/analyze/stream 으로 섹션이 도착하는 대로 onPartial 을 부른다 (summary / volume_series 가
+ * 오면 그 뒤로 매 섹션마다). 아직 오지 않은 목록은 빈 배열이다. ETag 를 아는 요청은 기존
+ * /api/analyze 로 304 재사용을 먼저 시도한다.
+ */
+export async function analyzeChatLogProgressive(
+  payload: AnalyzeRequest,
+  onPartial: (partial: AnalyzeResponse) => void
+): Promise<AnalyzeResponse> {
+  const body = JSON.stringify(payload);
+  if (analyzeCache.has(body)) return analyzeChatLog(payload);
+
+  const response = await fetch(`${BASE_URL}/api/analyze/stream`, {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
     },
-    body: JSON.stringify(payload),
+    body,
   });
-
-  if (!response.ok) {
+  if (!response.ok || !response.body) {
     const text = await response.text();
     throw new Error(text || "분석 요청 실패");
   }
 
-  return response.json() as Promise<AnalyzeResponse>;
+  const partial: Record<string, unknown> = { keyword_series: [], highlights: [], parse_errors: [] };
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffered = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffered += value;
+    let newline = buffered.indexOf("\n");
+    while (newline >= 0) {
+      const line = JSON.parse(buffered.slice(0, newline)) as { section: string; data?: unknown; detail?: string };
+      buffered = buffered.slice(newline + 1);
+      newline = buffered.indexOf("\n");
+      if (line.section === "error") throw new Error(line.detail || "분석 요청 실패");
+      partial[line.section] = line.data;
+      if (partial.summary && partial.volume_series) onPartial({ ...partial } as unknown as AnalyzeResponse);
+    }
+  }
+  if (partial.message === undefined) throw new Error("분석 응답이 중간에 끊겼습니다");
+
+  const data = partial as unknown as AnalyzeResponse;
+  rememberAnalyzeResult(body, response.headers.get("ETag"), data);
+  return data;
 }
 
 export interface FetchProgress {
@@ -33,10 +106,76 @@ export async function getProgress(vodId: string): Promise<FetchProgress> {
   return response.json() as Promise<FetchProgress>;
 }
 
+export interface FetchProgressEvent extends FetchProgress {
+  stage: "fetch" | "parse" | "analyze" | "done" | "failed";
+  eta_sec: number | null;
+}
+
+/**
+ * SSE(/api/progress/{vod_id}/stream) 로 진행 이벤트를 받는다. EventSource 를 쓸 수 없거나
+ * 연결이 끊기면 500ms 간격 폴링으로 바꾼다. 반환값을 호출하면 구독을 끝낸다.
+ */
+export function subscribeProgress(vodId: string, onEvent: (progress: FetchProgressEvent) => void): () => void {
+  let closed = false;
+  let pollTimer: ReturnType<typeof setInterval> | null = null;
+  let source: EventSource | null = null;
+
+  const startPolling = () => {
+    if (closed || pollTimer) return;
+    pollTimer = setInterval(async () => {
+      const p = await getProgress(vodId);
+      if (closed) return;
+      onEvent({ ...p, stage: p.done ? "done" : "fetch", eta_sec: null });
+    }, 500);
+  };
+
+  const close = () => {
+    closed = true;
+    source?.close();
+    if (pollTimer) clearInterval(pollTimer);
+  };
+
+  if (typeof EventSource === "undefined") {
+    startPolling();
+    return close;
+  }
+
+  source = new EventSource(`${BASE_URL}/api/progress/${encodeURIComponent(vodId)}/stream`);
+  source.addEventListener("progress", (message) => {
+    const event = JSON.parse((message as MessageEvent<string>).data) as Omit<FetchProgressEvent, "done">;
+    const done = event.stage === "done" || event.stage === "failed";
+    onEvent({ ...event, done });
+    if (done) source?.close();
+  });
+  source.onerror = () => {
+    source?.close();
+    startPolling();
+  };
+  return close;
+}
+
+// 하이라이트 구간의 원본 채팅 한 페이지. 다음 페이지는 next_cursor 를 cursor 로 다시 요청한다.
+export async function fetchMessages(payload: MessagesRequest): Promise<MessagesResponse> {
+  const response = await fetch(`${BASE_URL}/api/messages`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify(payload),
+  });
+
+  if (!response.ok) {
+    const text = await response.text();
+    throw new Error(text || "메시지 요청 실패");
+  }
+
+  return response.json() as Promise<MessagesResponse>;
+}
+
 export async function exportAnalysisFile(payload: {
   analysis: AnalyzeRequest;
-  format: "json" | "csv";
-  dataset: "summary" | "highlights" | "volume" | "keywords" | "parse_errors" | "all";
+  format: "json" | "csv" | "parquet";
+  dataset: "summary" | "highlights" | "volume" | "keywords" | "parse_errors" | "messages" | "all";
 }): Promise<void> {
   const response = await fetch(`${BASE_URL}/api/export`, {
     method: "POST",
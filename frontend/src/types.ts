@@ -6,7 +6,7 @@ export type AnalyzeRequest = {
   options: {
     bucket_size_seconds: number;
     keyword_options: {
-      mode: "contains" | "exact";
+      mode: "contains" | "exact" | "regex";
       case_sensitive: boolean;
     };
     min_highlight_score: number;
@@ -20,9 +20,10 @@ export type ExportDataset =
   | "volume"
   | "keywords"
   | "parse_errors"
+  | "messages"
   | "all";
 
-export type ExportFormat = "json" | "csv";
+export type ExportFormat = "json" | "csv" | "parquet";
 
 export type AnalyzeResponse = {
   summary: {
@@ -70,3 +71,29 @@ export type AnalyzeResponse = {
   }>;
   message: string;
 };
+
+export type MessagesRequest = {
+  source: { vod_id: string };
+  // VOD 재생 위치(초) 구간 [start, end)
+  start_offset_sec: number;
+  end_offset_sec?: number | null;
+  cursor?: number;
+  limit?: number;
+};
+
+export type RawMessage = {
+  timestamp: string;
+  offset_sec: number;
+  offset_label: string;
+  nickname: string;
+  user_id_hash: string;
+  content: string;
+};
+
+export type MessagesResponse = {
+  messages: RawMessage[];
+  total: number;
+  next_cursor: number | null;
+  parse_errors: AnalyzeResponse["parse_errors"];
+  message: string;
+};
@@ -12,3 +12,73 @@ BACKEND_DIR = ROOT / "backend"
 
 if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
+
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture()
+def chatlog_cache_dir(tmp_path, monkeypatch):
+    """채팅 캐시 디렉터리를 tmp_path 로 격리한다 (자동 수집/실제 캐시 접근 방지).
+
+    프로세스 전역인 파싱 결과 LRU 와 분석 결과 캐시도 비워 테스트 간 간섭을 막는다.
+    """
+    from app import chatlog_cache
+    from app.parsed_cache import parsed_log_cache
+    from app.result_cache import analysis_result_cache
+
+    parsed_log_cache.clear()
+    analysis_result_cache.clear()
+
+    cache_dir = tmp_path / "chatlogs"
+    cache_dir.mkdir()
+    monkeypatch.setattr(chatlog_cache, "get_chatlog_cache_dir", lambda: cache_dir)
+    yield cache_dir
+    # 파싱이 넣은 역색인 미리 만들기가 다음 테스트의 저장소/LRU 를 건드리지 않게 기다린다
+    from app.token_index import wait_for_token_index_builds
+
+    wait_for_token_index_builds()
+
+
+@pytest.fixture()
+def write_chatlog(chatlog_cache_dir):
+    """`write_chatlog(vod_id, lines)` 로 캐시에 채팅 로그를 기록하고 경로를 반환한다."""
+
+    def _write(vod_id: str, lines: list[str]) -> Path:
+        path = chatlog_cache_dir / f"chatLog-{vod_id}.log"
+        path.write_text("".join(f"{line}\n" for line in lines), encoding="utf-8")
+        return path
+
+    return _write
+
+
+@pytest.fixture()
+def post_analyze():
+    """`post_analyze(payload, headers)` 로 TestClient 를 거쳐 /api/analyze 를 호출하고 HTTP 응답을 반환한다."""
+    from fastapi.testclient import TestClient
+
+    from app import main
+
+    client = TestClient(main.app)
+
+    def _post(payload, headers: dict[str, str] | None = None):
+        return client.post(
+            "/api/analyze",
+            content=payload.model_dump_json(),
+            headers={"Content-Type": "application/json", **(headers or {})},
+        )
+
+    return _post
+
+
+@pytest.fixture()
+def analyze_api(post_analyze):
+    """`analyze_api(payload)` 로 /api/analyze 의 200 응답 본문을 AnalyzeResponse 로 반환한다."""
+    from app.schemas import AnalyzeResponse
+
+    def _analyze(payload):
+        response = post_analyze(payload)
+        assert response.status_code == 200, response.text
+        return AnalyzeResponse.model_validate_json(response.content)
+
+    return _analyze
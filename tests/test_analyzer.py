@@ -0,0 +1,495 @@
+"""tests/test_analyzer.py
+
+analyzer.build_analysis 의 버킷 집계 / 키워드 집계 / 오프셋 규칙을 검증한다.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from app.analyzer import build_analysis
+from app.message_store import MessageStore
+from app.schemas import AnalyzeOptions, ChatMessage
+
+
+def _store(rows: list[tuple[datetime, str, str]]) -> MessageStore:
+    return MessageStore.from_chat_messages(
+        ChatMessage(timestamp=ts, nickname=user, content=content, user_id_hash=user)
+        for ts, user, content in rows
+    )
+
+
+VOD_ROWS = [
+    (datetime(1970, 1, 1, 0, 0, 1), "u1", "ㅋㅋㅋㅋ"),
+    (datetime(1970, 1, 1, 0, 0, 9), "u2", "허어어억 ㅋㅋ"),
+    (datetime(1970, 1, 1, 0, 0, 29), "u1", "와 ㅋㅋㅋ"),
+    (datetime(1970, 1, 1, 0, 0, 31), "u3", "GG"),
+]
+
+
+class TestBuildAnalysis:
+    def test_empty_store(self):
+        summary, volume, keywords, highlights = build_analysis(MessageStore.empty(), ["ㅋㅋ"], AnalyzeOptions())
+        assert summary.total_messages == 0
+        assert (volume, keywords, highlights) == ([], [], [])
+
+    def test_vod_relative_buckets_and_keywords(self):
+        summary, volume, keywords, _ = build_analysis(_store(VOD_ROWS), ["ㅋㅋㅋ", "헉"], AnalyzeOptions())
+
+        assert summary.unique_users == 3
+        assert summary.vod_duration_sec == 30
+        assert [(p.bucket_start_offset_sec, p.total_messages, p.unique_users) for p in volume] == [
+            (0, 3, 2),
+            (30, 1, 1),
+        ]
+        # 정규화로 "ㅋㅋㅋ" 키워드는 "ㅋㅋ" 로 축약되어 집계된다
+        assert [(p.bucket_start_offset_label, p.keyword, p.count) for p in keywords] == [
+            ("00:00:00", "ㅋㅋ", 3),
+            ("00:00:00", "헉", 1),
+            ("00:00:30", "ㅋㅋ", 0),
+            ("00:00:30", "헉", 0),
+        ]
+
+    def test_legacy_wall_clock_log_uses_first_chat_as_base(self):
+        rows = [(ts.replace(year=2024), user, content) for ts, user, content in VOD_ROWS]
+        summary, volume, _, _ = build_analysis(_store(rows), [], AnalyzeOptions(bucket_size_seconds=7))
+
+        assert summary.start_time == datetime(2024, 1, 1, 0, 0, 1)
+        # 버킷 경계는 절대 시각 기준이므로 첫 버킷은 첫 채팅보다 앞설 수 있고,
+        # offset 은 첫 채팅 기준 (음수는 0으로 보정)
+        assert volume[0].bucket_start <= summary.start_time
+        assert volume[0].bucket_start_offset_sec == 0
+        first_gap = (volume[1].bucket_start - summary.start_time).total_seconds()
+        assert volume[1].bucket_start_offset_sec == first_gap
+        assert sum(p.total_messages for p in volume) == 4
+
+
+class TestMessageWindow:
+    def test_window_uses_vod_position(self):
+        from app.analyzer import message_window
+
+        store = _store(VOD_ROWS)
+        assert message_window(store, 1, 29) == (0, 2)
+        assert message_window(store, 29, None) == (2, 4)
+        assert message_window(store, 40, 50) == (4, 4)
+        assert message_window(MessageStore.empty(), 0, None) == (0, 0)
+
+        # 레거시 벽시계 로그는 첫 채팅이 재생 위치 0
+        legacy = _store([(ts.replace(year=2024), user, content) for ts, user, content in VOD_ROWS])
+        assert message_window(legacy, 0, 8) == (0, 1)
+        assert message_window(legacy, 8, 30) == (1, 3)
+
+
+class TestStreamingAnalysis:
+    def test_streaming_matches_store(self):
+        from app.analyzer import build_analysis_streaming
+
+        rows = VOD_ROWS * 3
+        store = _store(rows)
+        records = zip(store.offsets, map(store.nickname, range(len(store))), store.iter_contents(), map(store.user_id_hash, range(len(store))))
+        options = AnalyzeOptions(bucket_size_seconds=10, min_highlight_score=0.5)
+
+        expected = build_analysis(store, ["ㅋㅋ", "헉", "와"], options)
+        streamed = build_analysis_streaming(records, ["ㅋㅋ", "헉", "와"], options)
+
+        assert streamed == expected
+
+    def test_streaming_empty(self):
+        from app.analyzer import build_analysis_streaming
+
+        summary, volume, _, _ = build_analysis_streaming(iter(()), ["ㅋㅋ"], AnalyzeOptions())
+        assert summary.total_messages == 0
+        assert volume == []
+
+
+class TestAnalysisEngines:
+    """NumPy 엔진은 순수 Python 기준 구현과 같은 결과를 내야 한다."""
+
+    @staticmethod
+    def _synthetic_store(seed: int, start: datetime) -> MessageStore:
+        import random
+        from datetime import timedelta
+
+        rng = random.Random(seed)
+        words = ["ㅋㅋㅋㅋ", "ㅎㅎ", "허어억", "GG", "gg", "와", "ㅠㅠㅠ", "레전드", "미쳤다"]
+        rows = []
+        second = 0
+        for _ in range(3000):
+            # 몰리는 구간을 섞어 하이라이트 후보와 병합이 생기도록 한다
+            second += 0 if rng.random() < 0.6 else rng.randint(1, 12)
+            content = " ".join(rng.choices(words, k=rng.randint(1, 4)))
+            rows.append((start + timedelta(seconds=second), f"u{rng.randint(0, 150)}", content))
+        return _store(rows)
+
+    @staticmethod
+    def _analyze(store: MessageStore, keywords: list[str], options: AnalyzeOptions, engine: str):
+        # 단계 캐시는 엔진과 무관한 키를 쓰므로, 비교할 때는 매번 비워 각 엔진이 직접 계산하게 한다
+        for key in [key for key in store.derived if key[0] == "analysis_stage"]:
+            del store.derived[key]
+        return build_analysis(store, keywords, options, engine=engine)
+
+    def test_numpy_zscore_is_bitwise_equal_to_reference(self):
+        import random
+
+        import pytest
+
+        np = pytest.importorskip("numpy")
+        from app.analyzer import _zscore, _zscore_numpy
+
+        rng = random.Random(11)
+        for _ in range(500):
+            values = [rng.randint(0, rng.choice([3, 50, 5000])) for _ in range(rng.randint(1, 2000))]
+            assert _zscore_numpy(np.asarray(values, dtype=np.int64)).tolist() == _zscore(values)
+
+    def test_numpy_engine_matches_python(self):
+        import pytest
+
+        pytest.importorskip("numpy")
+        keywords = ["ㅋㅋ", "헉", "gg", "와", "레전드", "없는키워드"]
+        # AUTOMATON_MIN_KEYWORDS 이상이면 KeywordMatcher 의 오토마톤 경로를 탄다
+        many_keywords = keywords + ["ㅎㅎ", "ㅠㅠ", "ㅋ", "미쳤", "gg 와", "억"]
+        option_sets = [
+            AnalyzeOptions(),
+            AnalyzeOptions(bucket_size_seconds=5, min_highlight_score=0.3, max_merge_buckets=3),
+            AnalyzeOptions(
+                bucket_size_seconds=60,
+                keyword_options={"mode": "exact", "case_sensitive": True},
+                normalize_repeated_reactions=False,
+                max_highlights=50,
+            ),
+        ]
+        for seed, start in ((1, datetime(1970, 1, 1)), (2, datetime(2024, 3, 1, 21, 0, 7))):
+            store = self._synthetic_store(seed, start)
+            for options in option_sets:
+                expected = self._analyze(store, keywords, options, engine="python")
+                assert self._analyze(store, keywords, options, engine="numpy") == expected
+                assert self._analyze(store, many_keywords, options, engine="numpy") == self._analyze(
+                    store, many_keywords, options, engine="python"
+                )
+                assert self._analyze(store, [], options, engine="numpy") == self._analyze(
+                    store, [], options, engine="python"
+                )
+
+    def test_regex_mode_matches_python_and_depends_on_pattern_set(self):
+        import pytest
+
+        pytest.importorskip("numpy")
+        store = self._synthetic_store(4, datetime(1970, 1, 1))
+        options = AnalyzeOptions(keyword_options={"mode": "regex"}, min_highlight_score=0.5)
+
+        for patterns in (["ㅋ+", "gg|와"], ["ㅋㅋ"], ["ㅋ+", "ㅋㅋ"]):
+            assert self._analyze(store, patterns, options, engine="numpy") == self._analyze(
+                store, patterns, options, engine="python"
+            )
+
+        # 앞 패턴이 매치를 가져가므로 같은 "ㅋㅋ" 라도 패턴 목록에 따라 횟수가 다르다
+        def keyword_total(patterns: list[str], keyword: str) -> int:
+            _, _, keyword_series, _ = self._analyze(store, patterns, options, engine="numpy")
+            return sum(point.count for point in keyword_series if point.keyword == keyword)
+
+        assert keyword_total(["ㅋㅋ"], "ㅋㅋ") > 0
+        assert keyword_total(["ㅋ+", "ㅋㅋ"], "ㅋㅋ") == 0
+
+    def test_regex_matches_raw_content_before_reaction_normalization(self):
+        from app.analyzer import build_analysis_streaming
+
+        rows = [
+            (datetime(1970, 1, 1, 0, 0, 1), "u1", "ㅋㅋㅋㅋ"),
+            (datetime(1970, 1, 1, 0, 0, 2), "u2", "ㅋㅋ"),
+            (datetime(1970, 1, 1, 0, 0, 3), "u3", "GG ㅋㅋㅋ"),
+        ]
+        store = _store(rows)
+        # 반응 정규화(기본값)는 ㅋㅋㅋㅋ → ㅋㅋ 로 줄이지만 regex 는 원문에 매치한다
+        for trending_terms in (0, 2):
+            options = AnalyzeOptions(keyword_options={"mode": "regex"}, trending_terms=trending_terms)
+            records = [(store.offsets[index], "n", content, "u") for index, content in enumerate(store.iter_contents())]
+            results = [self._analyze(store, ["ㅋ{3,}", "gg"], options, engine) for engine in ("python", "numpy")]
+            results.append(build_analysis_streaming(records, ["ㅋ{3,}", "gg"], options))
+            for _, _, keyword_series, _ in results:
+                assert [(point.keyword, point.count) for point in keyword_series] == [("ㅋ{3,}", 2), ("gg", 1)]
+
+    def test_regex_columns_are_evicted_and_rebuilt_as_a_group(self, monkeypatch):
+        import pytest
+
+        np = pytest.importorskip("numpy")
+        from app import analyzer
+
+        rows = [
+            (datetime(1970, 1, 1, 0, 0, 1), "u1", "ㅎㅋㅎ"),
+            (datetime(1970, 1, 1, 0, 0, 2), "u2", "ㅋㅎ ㅎㅎㅋ"),
+        ]
+        options = AnalyzeOptions(keyword_options={"mode": "regex"})
+        patterns = ["ㅋㅎ", "ㅎ+ㅋ"]
+        cold_store = _store(rows)
+        cold = analyzer._keyword_second_hits(cold_store, analyzer._second_bins(cold_store), patterns, options)
+
+        store = _store(rows)
+        bins = analyzer._second_bins(store)
+        analyzer._keyword_second_hits(store, bins, patterns, options)
+        # 상한을 줄여 다른 패턴 목록을 분석할 때 앞 그룹이 축출되게 한다
+        monkeypatch.setattr(analyzer, "_MAX_CACHED_KEYWORD_COLUMNS", 3)
+        analyzer._keyword_second_hits(store, bins, ["ㅋ", "ㅎ"], options)
+        cached = [key for key in store.derived if key[0] == "keyword_hits"]
+        assert len(cached) == 2 and all(key[-1] == ("ㅋ", "ㅎ") for key in cached)
+
+        assert np.array_equal(analyzer._keyword_second_hits(store, bins, patterns, options), cold)
+
+    def test_invalid_regex_keyword_raises_even_without_messages(self):
+        import pytest
+
+        with pytest.raises(ValueError):
+            build_analysis(MessageStore.empty(), ["ㅋ*"], AnalyzeOptions(keyword_options={"mode": "regex"}))
+
+
+    def test_bucket_size_rollups_match_python(self):
+        import pytest
+
+        pytest.importorskip("numpy")
+        keywords = ["ㅋㅋ", "헉", "gg"]
+        for seed, start in ((3, datetime(1970, 1, 1)), (4, datetime(2024, 3, 1, 21, 0, 7))):
+            store = self._synthetic_store(seed, start)
+            # 같은 저장소에서 버킷 크기만 바꿔 가며 재분석 (초 단위 기본 집계를 재사용)
+            for bucket_size_seconds in (5, 7, 13, 30, 45, 60, 90, 299, 300):
+                options = AnalyzeOptions(bucket_size_seconds=bucket_size_seconds, min_highlight_score=0.5)
+                assert self._analyze(store, keywords, options, engine="numpy") == self._analyze(
+                    store, keywords, options, engine="python"
+                )
+            assert ("second_bins",) in store.derived
+            # 키워드 열은 키워드 단위로 캐시되어 버킷 크기와 무관하게 한 번만 계산된다
+            assert sum(1 for key in store.derived if key[0] == "keyword_hits") == len(keywords)
+
+class TestContentNormalization:
+    @staticmethod
+    def _six_regex_reference(text: str) -> str:
+        import re
+
+        normalized = re.sub(r"ㅋ{2,}", "ㅋㅋ", text)
+        normalized = re.sub(r"ㅎ{2,}", "ㅎㅎ", normalized)
+        normalized = re.sub(r"ㅠ{2,}", "ㅠㅠ", normalized)
+        normalized = re.sub(r"ㅜ{2,}", "ㅜㅜ", normalized)
+        normalized = re.sub(r"허+어+억+", "헉", normalized)
+        normalized = re.sub(r"허+억+", "헉", normalized)
+        return normalized
+
+    def test_single_pass_matches_six_regex_reference(self):
+        import random
+
+        from app.analyzer import _normalize_repeated_reactions
+
+        rng = random.Random(5)
+        alphabet = "ㅋㅎㅠㅜ허어억헉a "
+        for _ in range(20000):
+            text = "".join(rng.choices(alphabet, k=rng.randint(0, 16)))
+            assert _normalize_repeated_reactions(text) == self._six_regex_reference(text)
+
+    def test_normalized_column_is_cached_per_options(self):
+        from app.analyzer import normalized_contents
+
+        rows = VOD_ROWS + [(datetime(1970, 1, 1, 0, 0, 40), "u4", "ΑΣ 허억허어억 ㅠㅠㅠㅠ")]
+        store = _store(rows)
+
+        def normalized_columns() -> int:
+            return sum(1 for key in store.derived if key[0] == "normalized_content")
+
+        default = AnalyzeOptions()
+        case_sensitive = AnalyzeOptions(keyword_options={"case_sensitive": True})
+
+        expected = [self._six_regex_reference(content.lower()) for _, _, content in rows]
+        assert normalized_contents(store, default) == expected
+        assert normalized_columns() == 1
+        assert normalized_contents(store, default) == expected
+        assert normalized_contents(store, case_sensitive) == [
+            self._six_regex_reference(content) for _, _, content in rows
+        ]
+        assert normalized_columns() == 2
+
+        # 키워드만 바꾼 재분석은 캐시된 열을 그대로 쓴다
+        build_analysis(store, ["헉"], default)
+        build_analysis(store, ["ㅠㅠ", "gg"], default)
+        assert normalized_columns() == 2
+
+    def test_multiline_content_keeps_message_alignment(self):
+        from app.analyzer import normalized_contents
+
+        rows = VOD_ROWS + [(datetime(1970, 1, 1, 0, 0, 40), "u4", "첫 줄\nㅋㅋㅋ 둘째 줄")]
+        store = _store(rows)
+        expected = [self._six_regex_reference(content.lower()) for _, _, content in rows]
+        assert normalized_contents(store, AnalyzeOptions()) == expected
+        # 캐시된 열을 다시 읽어도 메시지 수와 순서가 같다
+        assert normalized_contents(store, AnalyzeOptions()) == expected
+
+        _, _, keywords, _ = build_analysis(store, ["ㅋㅋ"], AnalyzeOptions(bucket_size_seconds=60))
+        assert [point.count for point in keywords] == [4]
+
+
+class TestStageCache:
+    def test_threshold_change_reuses_cached_stages(self, caplog):
+        import logging
+
+        rows = [(ts, user, content) for ts, user, content in VOD_ROWS * 5]
+        store = _store(rows)
+        strict = AnalyzeOptions(bucket_size_seconds=10, min_highlight_score=5.0)
+        loose = strict.model_copy(update={"min_highlight_score": -5.0, "max_highlights": 1})
+
+        build_analysis(store, ["ㅋㅋ", "헉"], strict)
+        with caplog.at_level(logging.INFO, logger="app.analyzer"):
+            result = build_analysis(store, ["ㅋㅋ", "헉"], loose)
+
+        hits = [record.getMessage() for record in caplog.records if "stage cache hit" in record.getMessage()]
+        assert [message.split("stage=")[1].split()[0] for message in hits] == ["aggregates", "series", "scores"]
+        # 캐시된 단계를 써도 새 임계값으로 병합한 결과는 처음부터 계산한 것과 같다
+        assert result == build_analysis(_store(rows), ["ㅋㅋ", "헉"], loose)
+        assert len(result[3]) == 1
+
+    def test_sections_are_yielded_before_keyword_series(self):
+        from app.analyzer import iter_analysis
+
+        store = _store(VOD_ROWS)
+        sections = iter_analysis(store, ["ㅋㅋ", "헉"], AnalyzeOptions(bucket_size_seconds=10))
+        assert next(sections)[0] == "summary"
+        rest = list(sections)
+        # 단계 캐시에는 수치 중간값만 남고 키워드 시계열 모델 목록은 남지 않는다
+        assert {key[1] for key in store.derived if key[0] == "analysis_stage"} == {"aggregates", "series", "scores"}
+        assert [name for name, _ in rest] == ["volume_series", "highlights", "keyword_series"]
+
+        _, volume, keywords, highlights = build_analysis(
+            _store(VOD_ROWS), ["ㅋㅋ", "헉"], AnalyzeOptions(bucket_size_seconds=10)
+        )
+        assert [value for _, value in rest] == [volume, highlights, keywords]
+
+    def test_stage_key_excludes_highlight_options_only(self):
+        store = _store(VOD_ROWS)
+        build_analysis(store, ["ㅋㅋ"], AnalyzeOptions())
+        build_analysis(store, ["ㅋㅋ"], AnalyzeOptions(max_merge_buckets=5, min_highlight_score=0.1))
+        build_analysis(store, ["ㅋㅋ"], AnalyzeOptions(bucket_size_seconds=10))
+        build_analysis(store, ["ㅋㅋ"], AnalyzeOptions(keyword_options={"case_sensitive": True}))
+
+        assert len(store.derived[("analysis_stage", "aggregates")]) == 3
+
+
+class TestHighlightSweep:
+    def test_sweep_matches_build_analysis_per_combination(self):
+        from app.analyzer import build_highlight_sweep
+
+        store = TestAnalysisEngines._synthetic_store(3, datetime(1970, 1, 1, 0, 0, 0))
+        keywords = ["ㅋㅋ", "GG", "헉"]
+        bucket_sizes = [5, 7, 30]  # 최대공약수 1 → python 엔진은 1초 기준 버킷에서 rollup
+        min_scores = [0.5, 1.2]
+        merges = [1, 3]
+        engines = ["python"]
+        try:
+            import numpy  # noqa: F401
+
+            engines.append("numpy")
+        except ImportError:
+            pass
+
+        compared = 0
+        for engine in engines:
+            sweep = build_highlight_sweep(
+                store, keywords, AnalyzeOptions(max_highlights=10), bucket_sizes, min_scores, merges, engine=engine
+            )
+            assert len(sweep) == len(bucket_sizes) * len(min_scores) * len(merges)
+            for combination in sweep:
+                options = AnalyzeOptions(
+                    bucket_size_seconds=combination.bucket_size_seconds,
+                    min_highlight_score=combination.min_highlight_score,
+                    max_merge_buckets=combination.max_merge_buckets,
+                    max_highlights=10,
+                )
+                *_, highlights = TestAnalysisEngines._analyze(store, keywords, options, engine="python")
+                assert [
+                    (
+                        item.start_offset_sec,
+                        item.end_offset_sec,
+                        item.peak_offset_sec,
+                        item.score,
+                        item.peak_total_messages,
+                        item.representative_keyword,
+                    )
+                    for item in combination.highlights
+                ] == [
+                    (
+                        item.start_offset_sec,
+                        item.end_offset_sec,
+                        item.peak_offset_sec,
+                        item.score,
+                        item.peak_total_messages,
+                        item.representative_keyword,
+                    )
+                    for item in highlights
+                ]
+                compared += len(highlights)
+        assert compared  # 하이라이트가 있는 조합이 있어야 비교가 의미 있다
+
+
+class TestKeywordSeriesFormats:
+    @staticmethod
+    def _dense_rows(volume_series, keywords, counts_at):
+        return [
+            (point.bucket_start_offset_sec, keyword, counts_at(bucket_index, keyword_index))
+            for bucket_index, point in enumerate(volume_series)
+            for keyword_index, keyword in enumerate(keywords)
+        ]
+
+    def test_columnar_and_sparse_expand_to_dense(self):
+        store = TestAnalysisEngines._synthetic_store(5, datetime(1970, 1, 1))
+        keywords = ["ㅋㅋ", "GG", "없는키워드"]
+        options = AnalyzeOptions(bucket_size_seconds=5)
+        _, volume_series, dense, _ = build_analysis(store, keywords, options)
+        expected = [(point.bucket_start_offset_sec, point.keyword, point.count) for point in dense]
+
+        _, columnar_volume, columnar, _ = build_analysis(store, keywords, options, keyword_series_format="columnar")
+        assert columnar_volume == volume_series
+        assert (
+            self._dense_rows(volume_series, columnar.keywords, lambda b, k: columnar.counts[k][b]) == expected
+        )
+
+        _, _, sparse, _ = build_analysis(store, keywords, options, keyword_series_format="sparse")
+        cells = {
+            (bucket_index, keyword_index): count
+            for bucket_index, keyword_index, count in zip(sparse.bucket_indices, sparse.keyword_indices, sparse.counts)
+        }
+        assert 0 not in sparse.counts
+        assert self._dense_rows(volume_series, sparse.keywords, lambda b, k: cells.get((b, k), 0)) == expected
+
+    def test_empty_store_keeps_keyword_axis(self):
+        _, _, columnar, _ = build_analysis(
+            MessageStore.empty(), ["ㅋㅋ"], AnalyzeOptions(), keyword_series_format="columnar"
+        )
+        assert columnar.keywords == ["ㅋㅋ"] and columnar.counts == [[]]
+
+
+class TestTrendingTerms:
+    def test_trending_terms_are_opt_in(self):
+        store = TestAnalysisEngines._synthetic_store(6, datetime(1970, 1, 1))
+        _, _, _, highlights = build_analysis(store, ["ㅋㅋ"], AnalyzeOptions(min_highlight_score=0.3))
+        assert highlights and all(highlight.trending_terms is None for highlight in highlights)
+
+        _, _, _, highlights = build_analysis(
+            store, ["ㅋㅋ"], AnalyzeOptions(min_highlight_score=0.3, trending_terms=3)
+        )
+        assert all(highlight.trending_terms is not None for highlight in highlights)
+        assert any(highlight.trending_terms for highlight in highlights)
+        for highlight in highlights:
+            assert len(highlight.trending_terms) <= 3
+            scores = [term.score for term in highlight.trending_terms]
+            assert scores == sorted(scores, reverse=True)
+
+    def test_engines_and_streaming_agree(self):
+        from app.analyzer import build_analysis_streaming
+
+        store = TestAnalysisEngines._synthetic_store(7, datetime(1970, 1, 1))
+        options = AnalyzeOptions(bucket_size_seconds=10, min_highlight_score=0.3, trending_terms=4)
+        results = [
+            TestAnalysisEngines._analyze(store, ["ㅋㅋ", "gg"], options, engine) for engine in ("python", "numpy")
+        ]
+        records = zip(
+            store.offsets,
+            map(store.nickname, range(len(store))),
+            store.iter_contents(),
+            map(store.user_id_hash, range(len(store))),
+        )
+        results.append(build_analysis_streaming(records, ["ㅋㅋ", "gg"], options, engine="python"))
+
+        assert results[0][3] and results[0] == results[1] == results[2]
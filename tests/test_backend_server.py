@@ -86,6 +86,11 @@ class TestParseArgs:
         args = backend_server._parse_args()
         assert args.port is None
 
+    def test_job_concurrency_flag(self, monkeypatch):
+        import backend_server
+        monkeypatch.setattr(sys, "argv", ["backend_server.py", "--job-concurrency", "3"])
+        assert backend_server._parse_args().job_concurrency == 3
+
     def test_no_host_arg(self, monkeypatch):
         """--host 플래그는 존재하지 않아야 한다 (보안 원칙)."""
         import backend_server
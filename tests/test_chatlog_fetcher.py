@@ -0,0 +1,169 @@
+"""tests/test_chatlog_fetcher.py
+
+Chzzk 수집기의 요청 간격 / 429 back-off 를 네트워크 없이 검증한다.
+"""
+
+from __future__ import annotations
+
+from app import chatlog_fetcher
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, headers: dict | None = None) -> None:
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self) -> None:
+        pass
+
+
+class _FakeSession:
+    def __init__(self, responses: list[_FakeResponse]) -> None:
+        self.responses = responses
+
+    def get(self, url, headers, timeout):
+        return self.responses.pop(0)
+
+
+class TestRequestPacing:
+    def test_rate_limit_defers_every_fetch(self, monkeypatch):
+        clock = [100.0]
+        sleeps: list[float] = []
+
+        def fake_sleep(seconds: float) -> None:
+            sleeps.append(round(seconds, 3))
+            clock[0] += seconds
+
+        monkeypatch.setattr(chatlog_fetcher.time, "monotonic", lambda: clock[0])
+        monkeypatch.setattr(chatlog_fetcher.time, "sleep", fake_sleep)
+        monkeypatch.setattr(chatlog_fetcher, "_next_request_at", 0.0)
+
+        session = _FakeSession([_FakeResponse(429, {"Retry-After": "3"}), _FakeResponse(200)])
+        response = chatlog_fetcher._get_page(session, "url", {})
+        assert response.status_code == 200
+        assert sleeps == [3.0]
+
+        # 다른 수집의 다음 요청도 최소 간격을 지킨다
+        chatlog_fetcher._get_page(_FakeSession([_FakeResponse(200)]), "url", {})
+        assert sleeps == [3.0, chatlog_fetcher._MIN_PAGE_DELAY]
+
+    def test_retry_after_is_capped_and_http_date_ignored(self):
+        assert chatlog_fetcher._retry_after_seconds(_FakeResponse(429, {"Retry-After": "9999"})) == 60.0
+        assert chatlog_fetcher._retry_after_seconds(_FakeResponse(429, {"Retry-After": "Wed, 21 Oct"})) is None
+        assert chatlog_fetcher._retry_after_seconds(_FakeResponse(429)) is None
+
+
+class _PageResponse:
+    def __init__(self, payload: dict) -> None:
+        self.payload = payload
+
+    def json(self) -> dict:
+        return self.payload
+
+
+def _page(chats: list[dict], next_time: int | None) -> _PageResponse:
+    return _PageResponse({"code": 200, "content": {"videoChats": chats, "nextPlayerMessageTime": next_time}})
+
+
+class TestSingleFlightFetch:
+    def test_concurrent_callers_share_one_fetch(self, tmp_path, monkeypatch):
+        import threading
+        import time
+
+        release = threading.Event()
+        calls: list[str] = []
+
+        def slow_download(vod_id, destination):
+            calls.append(vod_id)
+            release.wait(5)
+            destination.write_text("log\n", encoding="utf-8")
+            return 3, 1
+
+        monkeypatch.setattr(chatlog_fetcher, "_download_chatlog", slow_download)
+        destination = tmp_path / "chatLog-1.log"
+        results: list[tuple[int, int]] = []
+        threads = [
+            threading.Thread(target=lambda: results.append(chatlog_fetcher.fetch_chatlog_to_file("1", destination)))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while "1" not in chatlog_fetcher._in_flight or chatlog_fetcher._in_flight["1"].waiters < 2:
+            assert time.monotonic() < deadline
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert calls == ["1"]
+        assert results == [(3, 1)] * 3
+        assert "1" not in chatlog_fetcher._in_flight
+
+    def test_failure_is_shared_and_next_call_retries(self, tmp_path, monkeypatch):
+        import pytest
+
+        attempts: list[int] = []
+
+        def failing_download(vod_id, destination):
+            attempts.append(1)
+            raise RuntimeError("429")
+
+        monkeypatch.setattr(chatlog_fetcher, "_download_chatlog", failing_download)
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                chatlog_fetcher.fetch_chatlog_to_file("2", tmp_path / "chatLog-2.log")
+        assert len(attempts) == 2
+
+    def test_partial_download_never_replaces_destination(self, tmp_path, monkeypatch):
+        import pytest
+
+        chat = {"playerMessageTime": 1000, "userIdHash": "u1", "content": "ㅋㅋ", "profile": '{"nickname": "a"}'}
+        pages = [_page([chat], 2000), RuntimeError("connection reset")]
+
+        def fake_get_page(session, url, headers):
+            page = pages.pop(0)
+            if isinstance(page, Exception):
+                raise page
+            return page
+
+        monkeypatch.setattr(chatlog_fetcher, "_get_page", fake_get_page)
+        monkeypatch.setattr(chatlog_fetcher, "_fetch_video_duration", lambda session, vod_id, headers: None)
+        destination = tmp_path / "chatLog-3.log"
+        with pytest.raises(RuntimeError):
+            chatlog_fetcher.fetch_chatlog_to_file("3", destination)
+        assert list(tmp_path.iterdir()) == []
+        assert chatlog_fetcher.get_progress("3") == {"pages": 1, "messages": 1, "done": True}
+
+        pages[:] = [_page([chat], None)]
+        assert chatlog_fetcher.fetch_chatlog_to_file("3", destination) == (1, 1)
+        assert destination.read_text(encoding="utf-8") == "[1970-01-01 00:00:01] a: ㅋㅋ (u1)\n"
+        assert list(tmp_path.iterdir()) == [destination]
+
+
+class TestFetchProgressEvents:
+    def test_pages_publish_position_and_eta(self, tmp_path, monkeypatch):
+        from app.progress_events import progress_broker
+
+        chat = {"playerMessageTime": 1000, "userIdHash": "u1", "content": "ㅋㅋ", "profile": '{"nickname": "a"}'}
+        pages = [_page([chat], 30_000), _page([chat], None)]
+        monkeypatch.setattr(chatlog_fetcher, "_get_page", lambda session, url, headers: pages.pop(0))
+        monkeypatch.setattr(chatlog_fetcher, "_fetch_video_duration", lambda session, vod_id, headers: 120)
+
+        subscription = progress_broker.subscribe("4")
+        try:
+            chatlog_fetcher.fetch_chatlog_to_file("4", tmp_path / "chatLog-4.log")
+            events = []
+            while not subscription.empty():
+                events.append(subscription.get_nowait())
+        finally:
+            progress_broker.unsubscribe("4", subscription)
+
+        assert [event.stage for event in events] == ["fetch"] * 3
+        assert [(event.pages, event.messages, event.position_sec) for event in events] == [
+            (0, 0, None),
+            (1, 1, 30.0),
+            (2, 2, None),
+        ]
+        assert all(event.duration_sec == 120 for event in events)
+        assert events[1].eta_sec is not None and events[1].eta_sec >= 0
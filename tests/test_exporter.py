@@ -0,0 +1,113 @@
+"""tests/test_exporter.py
+
+조각 단위 내보내기가 기존(한 번에 만든) 형식과 같은 바이트를 내는지 검증한다.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import sys
+
+import pytest
+
+from app import exporter, main
+from app.message_store import MessageStore, MessageStoreBuilder
+from app.schemas import AnalyzeRequest, SourceConfig
+
+
+LINES = [
+    "[1970-01-01 00:00:00] a: ㅋㅋ 와 (u1)",
+    '[1970-01-01 00:00:05] b: 헉 "x",y (u2)',
+    "[1970-01-01 00:01:05] c: ㅋㅋ (u1)",
+    "깨진 줄",
+]
+
+
+def _store() -> MessageStore:
+    builder = MessageStoreBuilder()
+    builder.extend([(0, "a", "ㅋㅋ 와", "u1"), (5, "b", '헉 "x",y', "u2"), (65, "c", "ㅋㅋ", "u1")])
+    return builder.build()
+
+
+@pytest.fixture
+def analyzed(write_chatlog):
+    write_chatlog("900", LINES)
+    return main._run_analysis(
+        AnalyzeRequest(source=SourceConfig(vod_id="900"), keywords=["ㅋㅋ", "헉"], options={"bucket_size_seconds": 5}),
+        context="Export",
+    )
+
+
+@pytest.mark.parametrize("dataset", ["summary", "highlights", "volume", "keywords", "parse_errors", "all"])
+def test_json_matches_json_dumps(dataset, analyzed):
+    field = {"volume": "volume_series", "keywords": "keyword_series"}.get(dataset, dataset)
+    dumped = analyzed.model_dump(mode="json")
+    expected = json.dumps(dumped if dataset == "all" else dumped[field], ensure_ascii=False, indent=2)
+
+    export = exporter.export_stream("json", dataset, analyzed=analyzed)
+    assert b"".join(export.chunks).decode("utf-8") == expected
+
+
+def test_csv_chunks_concatenate_to_single_utf8_sig_document(analyzed, monkeypatch):
+    monkeypatch.setattr(exporter, "EXPORT_CHUNK_ROWS", 1)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(exporter._ANALYSIS_COLUMNS["volume"])
+    for row in analyzed.volume_series:
+        writer.writerow(
+            [row.bucket_start, row.bucket_start_offset_sec, row.bucket_start_offset_label, row.total_messages, row.unique_users]
+        )
+
+    chunks = list(exporter.export_stream("csv", "volume", analyzed=analyzed).chunks)
+    assert len(chunks) == len(analyzed.volume_series)
+    assert b"".join(chunks) == buffer.getvalue().encode("utf-8-sig")
+
+
+def test_message_rows_use_vod_offset():
+    rows = list(exporter.export_stream("csv", "messages", messages=_store()).chunks)
+    lines = list(csv.reader(io.StringIO(b"".join(rows).decode("utf-8-sig"))))
+    assert lines[0] == list(exporter.MESSAGE_COLUMNS)
+    assert lines[3] == ["1970-01-01 00:01:05", "65", "00:01:05", "c", "u1", "ㅋㅋ"]
+    assert lines[2][-1] == '헉 "x",y'
+
+    objects = json.loads(b"".join(exporter.export_stream("json", "messages", messages=_store()).chunks))
+    assert objects[0] == {
+        "timestamp": "1970-01-01T00:00:00",
+        "offset_sec": 0,
+        "offset_label": "00:00:00",
+        "nickname": "a",
+        "user_id_hash": "u1",
+        "content": "ㅋㅋ 와",
+    }
+    assert b"".join(exporter.export_stream("json", "messages", messages=MessageStore.empty()).chunks) == b"[]"
+
+
+def test_unsupported_combinations_raise_before_streaming(analyzed, monkeypatch):
+    with pytest.raises(ValueError):
+        exporter.export_stream("csv", "all", analyzed=analyzed)
+    with pytest.raises(ValueError):
+        exporter.export_stream("parquet", "highlights", analyzed=analyzed)
+    # pyarrow 가 없는 설치: parquet 만 쓸 수 없다
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(exporter.ParquetUnavailableError, match="pyarrow"):
+        exporter.export_stream("parquet", "volume", analyzed=analyzed)
+
+
+def test_parquet_round_trip(analyzed):
+    pq = pytest.importorskip("pyarrow.parquet")
+    body = b"".join(exporter.export_stream("parquet", "keywords", analyzed=analyzed).chunks)
+    table = pq.read_table(io.BytesIO(body))
+    assert table.column_names == list(exporter._ANALYSIS_COLUMNS["keywords"])
+    assert table.column("count").to_pylist() == [row.count for row in analyzed.keyword_series]
+
+
+def test_parquet_stream_closed_midway(monkeypatch):
+    pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(exporter, "PARQUET_ROW_GROUP_ROWS", 1)
+    chunks = exporter.export_stream("parquet", "messages", messages=_store()).chunks
+    assert next(chunks)
+    # 클라이언트가 끊긴 경우: 닫은 뒤 더 내지 않고 조용히 끝난다
+    chunks.close()
+    assert next(chunks, None) is None
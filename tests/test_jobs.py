@@ -0,0 +1,90 @@
+"""tests/test_jobs.py
+
+분석 작업 대기열(jobs) 의 동시 실행 수 제한, 중복 제출 병합, 실패 기록, 보관 개수를 검증한다.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from fastapi import HTTPException
+
+from app.jobs import AnalysisJobManager
+
+
+def _wait_until(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class TestAnalysisJobManager:
+    def test_concurrency_limit_and_deduplication(self):
+        manager = AnalysisJobManager(max_workers=1)
+        release = threading.Event()
+
+        def blocked():
+            release.wait(5)
+            return "done"
+
+        first = manager.submit("1", "a", blocked)
+        again = manager.submit("1", "a", blocked)
+        other = manager.submit("2", "b", lambda: "other")
+
+        assert again.job_id == first.job_id and again.deduplicated
+        assert other.job_id != first.job_id
+        _wait_until(lambda: manager.get(first.job_id).status == "running")
+        # 작업자 1개가 막혀 있으므로 두 번째 작업은 대기열에 남는다
+        assert manager.get(other.job_id).status == "queued"
+
+        release.set()
+        _wait_until(lambda: manager.get(other.job_id).status == "succeeded")
+        assert manager.get(first.job_id).result == "done"
+        # 끝난 작업과 같은 요청은 새 작업이 된다
+        assert manager.submit("1", "a", lambda: "again").job_id != first.job_id
+        manager.shutdown()
+
+    def test_failures_keep_status_and_detail(self):
+        manager = AnalysisJobManager(max_workers=2)
+
+        def bad_request():
+            raise HTTPException(status_code=400, detail="bad pattern")
+
+        def crash():
+            raise RuntimeError("boom")
+
+        bad = manager.submit("1", "a", bad_request)
+        crashed = manager.submit("1", "b", crash)
+        _wait_until(lambda: manager.get(crashed.job_id).status == "failed" and manager.get(bad.job_id).finished_at)
+
+        assert manager.get(bad.job_id).describe().model_dump(include={"status", "error_status", "error_detail"}) == {
+            "status": "failed",
+            "error_status": 400,
+            "error_detail": "bad pattern",
+        }
+        assert manager.get(crashed.job_id).error_detail == "internal_error: boom"
+        manager.shutdown()
+
+    def test_only_recent_finished_jobs_are_kept(self):
+        manager = AnalysisJobManager(max_workers=1, history=2)
+        ids = [manager.submit("1", str(index), lambda: "ok").job_id for index in range(4)]
+        _wait_until(lambda: manager.get(ids[-1]) is not None and manager.get(ids[-1]).status == "succeeded")
+
+        assert [manager.get(job_id) is not None for job_id in ids] == [False, False, True, True]
+        manager.shutdown()
+
+    def test_on_finished_is_called_for_deduplicated_submissions(self):
+        manager = AnalysisJobManager(max_workers=1)
+        release = threading.Event()
+        finished = []
+
+        first = manager.submit("1", "a", lambda: release.wait(5) and "done", on_finished=finished.append)
+        again = manager.submit("1", "a", lambda: "unused", on_finished=finished.append)
+        release.set()
+        _wait_until(lambda: len(finished) == 2)
+
+        assert again.job_id == first.job_id
+        assert [job.result for job in finished] == ["done", "done"]
+        manager.shutdown()
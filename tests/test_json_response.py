@@ -0,0 +1,126 @@
+"""tests/test_json_response.py
+
+빠른 응답 경로(검증 없는 모델 생성, FastModelRoute/FastJSONResponse) 가 표준 FastAPI 경로와
+같은 JSON 을 내는지 검증한다.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+from fastapi import FastAPI, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from app import main
+from app.json_response import FastModelRoute, dumps
+from app.schemas import AnalyzeRequest, AnalyzeResponse, KeywordSeriesPoint, SourceConfig, trusted_constructor
+
+
+LINES = [
+    "[1970-01-01 00:00:01] a: ㅋㅋㅋ (u1)",
+    "[1970-01-01 00:00:40] b: 헉 \"따옴표\" \\ (u2)",
+    "깨진 줄",
+    "[1970-01-01 00:00:02] c: 와 ㅋㅋ (u3)",
+]
+
+
+class TestTrustedConstructor:
+    def test_matches_validated_model(self):
+        values = dict(
+            bucket_start=datetime(1970, 1, 1, 0, 0, 5),
+            bucket_start_offset_sec=5,
+            bucket_start_offset_label="00:00:05",
+            keyword="ㅋㅋ",
+            count=3,
+        )
+        trusted = trusted_constructor(KeywordSeriesPoint)(**values)
+        validated = KeywordSeriesPoint(**values)
+
+        assert trusted == validated
+        assert trusted.model_dump_json() == validated.model_dump_json()
+        assert trusted.model_fields_set == validated.model_fields_set
+
+    def test_instances_do_not_share_fields_set(self):
+        construct = trusted_constructor(SourceConfig)
+        first, second = construct(vod_id="1"), construct(vod_id="2")
+        first.model_fields_set.add("extra")
+        assert second.model_fields_set == {"vod_id"}
+
+
+class TestFastJSON:
+    def test_model_bytes_match_standard_encoding(self, write_chatlog):
+        write_chatlog("601", LINES)
+        for keyword_series_format in ("dense", "sparse"):
+            analyzed = main._run_analysis(
+                AnalyzeRequest(
+                    source=SourceConfig(vod_id="601"),
+                    keywords=["ㅋㅋ", "헉"],
+                    keyword_series_format=keyword_series_format,
+                    options={"trending_terms": 2, "min_highlight_score": -5},
+                ),
+                context="Analyze",
+            )
+            body = dumps(analyzed)
+            assert body == analyzed.model_dump_json().encode("utf-8")
+            assert json.loads(body) == jsonable_encoder(analyzed)
+
+    def test_plain_content_matches_json_response(self):
+        content = {"pages": 3, "messages": 1200, "done": False, "label": "수집 \"중\""}
+        assert json.loads(dumps(content)) == content
+        assert dumps({"status": "ok"}) == b'{"status":"ok"}'
+
+
+class TestFastModelRoute:
+    def test_http_body_matches_standard_route(self, write_chatlog, monkeypatch):
+        from app.jobs import AnalysisJobManager
+
+        monkeypatch.setattr(main, "analysis_jobs", AnalysisJobManager(max_workers=1))
+        write_chatlog("602", LINES)
+        payload = AnalyzeRequest(source=SourceConfig(vod_id="602"), keywords=["ㅋㅋ", "헉"])
+        body = payload.model_dump_json()
+        headers = {"Content-Type": "application/json"}
+
+        # 같은 핸들러를 표준 APIRoute (response_model 검증/직렬화) 로 등록한 비교용 앱
+        standard_app = FastAPI()
+        standard_app.router.add_api_route(
+            "/api/analyze",
+            main.analyze,
+            methods=["POST"],
+            response_model=AnalyzeResponse,
+            route_class_override=APIRoute,
+        )
+
+        fast = TestClient(main.app).post("/api/analyze", content=body, headers=headers)
+        standard = TestClient(standard_app).post("/api/analyze", content=body, headers=headers)
+
+        assert fast.status_code == standard.status_code == 200
+        assert fast.headers["content-type"] == "application/json"
+        assert fast.headers["etag"] == standard.headers["etag"]
+        assert fast.json() == standard.json()
+        assert fast.content == main._run_analysis(payload, context="Analyze").model_dump_json().encode("utf-8")
+
+        # 라우트 status_code (202) 와 304 응답은 그대로
+        client = TestClient(main.app)
+        assert client.post("/api/jobs/analyze", content=body, headers=headers).status_code == 202
+        not_modified = client.post(
+            "/api/analyze", content=body, headers={**headers, "If-None-Match": fast.headers["etag"]}
+        )
+        assert not_modified.status_code == 304
+        main.analysis_jobs.shutdown()
+
+    def test_async_endpoint_is_awaited(self):
+        app = FastAPI()
+        app.router.route_class = FastModelRoute
+
+        @app.get("/source", response_model=SourceConfig)
+        async def source(response: Response) -> SourceConfig:
+            response.headers["ETag"] = '"k"'
+            return SourceConfig(vod_id="603")
+
+        result = TestClient(app).get("/source")
+        assert result.status_code == 200
+        assert result.headers["etag"] == '"k"'
+        assert result.json() == {"vod_id": "603"}
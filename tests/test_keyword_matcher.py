@@ -0,0 +1,82 @@
+"""tests/test_keyword_matcher.py
+
+KeywordMatcher 가 키워드별 str.count (contains) / 전체 일치 (exact) 의미를 그대로 유지하는지,
+regex 모드가 패턴별 정규식과 같은 매치를 한 번의 스캔으로 세는지 검증한다.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+
+import pytest
+
+from app.keyword_matcher import AUTOMATON_MIN_KEYWORDS, KeywordMatcher, compile_keyword_patterns
+
+
+def _expected(content: str, keywords: list[str], mode: str) -> dict[int, int]:
+    if mode == "exact":
+        return {index: 1 for index, keyword in enumerate(keywords) if keyword and content == keyword}
+    return {index: content.count(keyword) for index, keyword in enumerate(keywords) if keyword and keyword in content}
+
+
+class TestKeywordMatcher:
+    def test_non_overlapping_like_str_count(self):
+        keywords = ["ㅋㅋ", "ㅋ", "ㅋㅋㅋ", "aa", "aba", "b", "ab", "ba", "없음", "ㅋa"]
+        assert len(keywords) >= AUTOMATON_MIN_KEYWORDS
+        matcher = KeywordMatcher(keywords, "contains")
+
+        # "ㅋㅋㅋ" 안의 "ㅋㅋ" 는 겹치지 않게 1회, "ababa" 안의 "aba" 도 1회
+        counts = matcher.count("ㅋㅋㅋ ababa aaa")
+        assert counts == _expected("ㅋㅋㅋ ababa aaa", keywords, "contains")
+        assert counts[0] == 1 and counts[4] == 1 and counts[3] == 1
+
+    def test_random_contents_match_reference(self):
+        rng = random.Random(3)
+        alphabet = "abㅋㅎ "
+        for _ in range(300):
+            keywords = ["".join(rng.choices(alphabet, k=rng.randint(1, 4))) for _ in range(rng.randint(1, 20))]
+            keywords.append("")
+            matcher = KeywordMatcher(keywords, "contains")
+            for _ in range(10):
+                content = "".join(rng.choices(alphabet + "x", k=rng.randint(0, 30)))
+                assert matcher.count(content) == _expected(content, keywords, "contains")
+
+    def test_exact_mode(self):
+        keywords = ["gg", "ㅋㅋ", "gg", ""]
+        matcher = KeywordMatcher(keywords, "exact")
+        assert matcher.count("gg") == {0: 1, 2: 1}
+        assert matcher.count("gg ㅋㅋ") == {}
+        assert matcher.count("") == {}
+
+
+class TestRegexMode:
+    def test_counts_non_overlapping_first_pattern_wins(self):
+        matcher = KeywordMatcher(["ㄷ{3,}", "미쳐+다", "ㄷ", "GG"], "regex", case_sensitive=False)
+
+        # "ㄷㄷㄷㄷ" 는 첫 패턴이 통째로 가져가고, 남는 "ㄷㄷ" 는 세 번째 패턴이 2회
+        assert matcher.count("ㄷㄷㄷㄷ 미쳐쳐다 gg ㄷㄷ") == {0: 1, 1: 1, 2: 2, 3: 1}
+        assert KeywordMatcher(["GG"], "regex", case_sensitive=True).count("gg GG") == {0: 1}
+
+    def test_single_pattern_matches_finditer(self):
+        rng = random.Random(5)
+        patterns = ["ㅋ+", "a[bㅋ]", "(?:ab)+", "ㅎ{2}", "b$", "^a"]
+        for pattern in patterns:
+            matcher = KeywordMatcher([pattern], "regex")
+            for _ in range(50):
+                content = "".join(rng.choices("abㅋㅎ ", k=rng.randint(0, 20)))
+                expected = len(re.findall(pattern, content))
+                assert matcher.count(content) == ({0: expected} if expected else {})
+
+    @pytest.mark.parametrize(
+        "pattern",
+        ["(", "a{2,1}", "ㅋ*", "a?", "(.)\\1", "(?P<x>a)(?P=x)", "a(?i)b"],
+    )
+    def test_invalid_patterns_raise_value_error(self, pattern):
+        with pytest.raises(ValueError):
+            KeywordMatcher(["gg", pattern], "regex")
+
+    def test_compiled_pattern_is_cached(self):
+        first = compile_keyword_patterns(("ㄷ{3,}", "gg"), False)
+        assert compile_keyword_patterns(("ㄷ{3,}", "gg"), False) is first
+        assert compile_keyword_patterns(("ㄷ{3,}", "gg"), True) is not first
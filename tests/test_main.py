@@ -0,0 +1,480 @@
+"""tests/test_main.py
+
+API 핸들러(main.py) 를 직접 호출하거나 TestClient 로 요청해 엔드포인트 간 동작을 검증한다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+
+from app import chatlog_cache, main, parser
+from app.jobs import AnalysisJobManager
+from app.result_cache import analysis_result_cache
+from app.schemas import (
+    AnalyzeRequest,
+    ExportRequest,
+    MessagesRequest,
+    SearchRequest,
+    SourceConfig,
+    SweepRequest,
+)
+
+
+LINES = [
+    "[1970-01-01 00:00:01] a: ㅋㅋㅋ (u1)",
+    "[1970-01-01 00:00:40] b: 헉 (u2)",
+    "깨진 줄",
+    "[1970-01-01 00:00:02] c: 와 ㅋㅋ (u3)",
+]
+
+
+class TestAnalyzeStreaming:
+    def test_streaming_and_full_parse_give_same_response(self, write_chatlog, analyze_api, monkeypatch):
+        write_chatlog("500", LINES)
+        payload = AnalyzeRequest(source=SourceConfig(vod_id="500"), keywords=["ㅋㅋ", "헉"])
+
+        monkeypatch.setattr(parser, "STREAMING_PARSE_MIN_BYTES", 0)
+        assert parser.prefers_streaming(payload.source)
+        streamed = analyze_api(payload)
+        # 스트리밍 패스가 흘려 쓴 사이드카로 다음 요청은 파싱 없이 분석한다
+        assert not parser.prefers_streaming(payload.source)
+        analysis_result_cache.clear()
+        parser.parsed_log_cache.clear()
+        monkeypatch.setattr(parser, "_parse_lines", lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError()))
+        full = analyze_api(payload)
+
+        assert streamed == full
+        assert streamed.parse_errors[0].line_number == 3
+
+    def test_unordered_log_falls_back_to_full_parse(self, write_chatlog, analyze_api, monkeypatch):
+        write_chatlog("501", LINES)
+        payload = AnalyzeRequest(source=SourceConfig(vod_id="501"), keywords=["ㅋㅋ"])
+        monkeypatch.setattr(main, "prefers_streaming", lambda source: True)
+        # 재정렬 버퍼(기본 4096)보다 큰 역순을 흉내 낸다
+        monkeypatch.setattr(parser, "_REORDER_BUFFER_SIZE", 0)
+
+        response = analyze_api(payload)
+
+        assert response.summary.total_messages == 3
+        assert [point.total_messages for point in response.volume_series] == [2, 1]
+
+
+class TestAnalysisResultCache:
+    def test_etag_and_not_modified(self, write_chatlog, post_analyze):
+        write_chatlog("504", LINES)
+        payload = AnalyzeRequest(source=SourceConfig(vod_id="504"), keywords=["ㅋㅋ"])
+
+        first = post_analyze(payload)
+        etag = first.headers["ETag"]
+        hits = analysis_result_cache.hits
+        second = post_analyze(payload)
+        assert second.content == first.content
+        assert analysis_result_cache.hits == hits + 1
+
+        not_modified = post_analyze(payload, {"If-None-Match": f'W/"other", {etag}'})
+        assert not_modified.status_code == 304
+        assert not_modified.headers["ETag"] == etag
+
+        # 로그가 다시 수집되면 지문이 바뀌어 ETag 도 바뀐다
+        write_chatlog("504", LINES[:2])
+        refreshed = post_analyze(payload, {"If-None-Match": etag})
+        assert refreshed.status_code == 200
+        assert refreshed.headers["ETag"] != etag
+        assert refreshed.json()["summary"]["total_messages"] == 2
+
+    def test_export_reuses_analyze_result(self, write_chatlog, analyze_api, monkeypatch):
+        write_chatlog("505", LINES)
+        analysis = AnalyzeRequest(source=SourceConfig(vod_id="505"), keywords=["ㅋㅋ"])
+        analyze_api(analysis)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("analysis should come from the result cache")
+
+        monkeypatch.setattr(main, "_run_analysis", fail)
+        exported = main.export_analysis(ExportRequest(analysis=analysis, format="json", dataset="summary"))
+        assert exported.status_code == 200
+
+
+class TestExport:
+    def test_messages_dataset_streams_parsed_chat_without_analysis(self, write_chatlog, monkeypatch):
+        write_chatlog("514", LINES)
+        monkeypatch.setattr(main, "_cached_analysis", lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError()))
+        analysis = AnalyzeRequest(source=SourceConfig(vod_id="514"), keywords=["ㅋㅋ"])
+        response = main.export_analysis(ExportRequest(analysis=analysis, format="csv", dataset="messages"))
+
+        async def collect() -> bytes:
+            return b"".join([chunk async for chunk in response.body_iterator])
+
+        assert response.headers["content-disposition"] == 'attachment; filename="analysis-messages.csv"'
+        lines = asyncio.run(collect()).decode("utf-8-sig").splitlines()
+        assert lines[0] == "timestamp,offset_sec,offset_label,nickname,user_id_hash,content"
+        assert [line.split(",")[3] for line in lines[1:]] == ["a", "c", "b"]
+
+    def test_parquet_unsupported_dataset_is_400(self, write_chatlog):
+        write_chatlog("515", LINES)
+        analysis = AnalyzeRequest(source=SourceConfig(vod_id="515"), keywords=["ㅋㅋ"])
+        with pytest.raises(HTTPException) as excinfo:
+            main.export_analysis(ExportRequest(analysis=analysis, format="parquet", dataset="highlights"))
+        assert excinfo.value.status_code == 400
+
+    def test_parquet_without_pyarrow_is_501(self, write_chatlog, monkeypatch):
+        write_chatlog("518", LINES)
+        monkeypatch.setitem(sys.modules, "pyarrow", None)
+        analysis = AnalyzeRequest(source=SourceConfig(vod_id="518"), keywords=["ㅋㅋ"])
+        with pytest.raises(HTTPException) as excinfo:
+            main.export_analysis(ExportRequest(analysis=analysis, format="parquet", dataset="volume"))
+        assert excinfo.value.status_code == 501
+        assert "pyarrow" in excinfo.value.detail
+
+
+class TestAnalyzeJobs:
+    def test_job_result_matches_sync_analyze(self, write_chatlog, analyze_api, monkeypatch):
+        monkeypatch.setattr(main, "analysis_jobs", AnalysisJobManager(max_workers=1))
+        write_chatlog("506", LINES)
+        payload = AnalyzeRequest(source=SourceConfig(vod_id="506"), keywords=["ㅋㅋ"])
+
+        submitted = main.submit_analyze_job(payload)
+        deadline = time.monotonic() + 5
+        while main.analyze_job_status(submitted.job_id).status in ("queued", "running"):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        assert main.analyze_job_status(submitted.job_id).status == "succeeded"
+        assert main.analyze_job_result(submitted.job_id) == analyze_api(payload)
+        main.analysis_jobs.shutdown()
+
+    def test_unknown_and_unfinished_jobs(self, monkeypatch):
+        manager = AnalysisJobManager(max_workers=1)
+        monkeypatch.setattr(main, "analysis_jobs", manager)
+        with pytest.raises(HTTPException) as exc_info:
+            main.analyze_job_status("missing")
+        assert exc_info.value.status_code == 404
+
+        release = threading.Event()
+        job = manager.submit("507", "k", lambda: release.wait(5))
+        with pytest.raises(HTTPException) as exc_info:
+            main.analyze_job_result(job.job_id)
+        assert exc_info.value.status_code == 409
+        release.set()
+        manager.shutdown()
+
+
+class TestProgressStream:
+    @staticmethod
+    def _frames(vod_id: str, trigger=None, disconnected: bool = False) -> list[str]:
+        """구독한 뒤 keep-alive 하나를 받고, 다른 스레드에서 trigger() 를 실행한 뒤의 이벤트 프레임들."""
+        message = {"type": "http.disconnect"} if disconnected else {"type": "http.request", "body": b""}
+
+        async def receive() -> dict:
+            return message
+
+        async def collect() -> list[str]:
+            request = Request({"type": "http", "method": "GET", "headers": []}, receive)
+            stream = main._iter_progress_events(vod_id, request, heartbeat_sec=0.01, max_sec=5)
+            if trigger is not None:
+                # 첫 프레임에서 구독하고, 이벤트가 없으므로 keep-alive 를 보낸다
+                assert await anext(stream) == ": keep-alive\n\n"
+                await asyncio.to_thread(trigger)
+            return [frame async for frame in stream if not frame.startswith(":")]
+
+        return asyncio.run(collect())
+
+    def test_stream_reports_stages_until_done(self, write_chatlog, analyze_api):
+        write_chatlog("508", LINES)
+        frames = self._frames(
+            "508", lambda: analyze_api(AnalyzeRequest(source=SourceConfig(vod_id="508"), keywords=["ㅋㅋ"]))
+        )
+
+        events = [json.loads(frame.split("data: ", 1)[1]) for frame in frames]
+        assert all(frame.startswith("event: progress\n") and frame.endswith("\n\n") for frame in frames)
+        assert [event["stage"] for event in events] == ["parse", "analyze", "done"]
+        assert all(event["vod_id"] == "508" for event in events)
+
+    def test_streaming_analysis_reports_same_stages(self, write_chatlog, post_analyze, monkeypatch):
+        write_chatlog("511", LINES)
+        monkeypatch.setattr(parser, "STREAMING_PARSE_MIN_BYTES", 0)
+        frames = self._frames(
+            "511", lambda: post_analyze(AnalyzeRequest(source=SourceConfig(vod_id="511"), keywords=["ㅋㅋ"]))
+        )
+
+        assert [json.loads(frame.split("data: ", 1)[1])["stage"] for frame in frames] == ["parse", "analyze", "done"]
+
+    def test_failed_fetch_ends_stream(self, chatlog_cache_dir, post_analyze, monkeypatch):
+        def failing_fetch(vod_id, destination):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(parser, "fetch_chatlog_to_file", failing_fetch)
+        frames = self._frames(
+            "509", lambda: post_analyze(AnalyzeRequest(source=SourceConfig(vod_id="509"), keywords=["ㅋㅋ"]))
+        )
+
+        events = [json.loads(frame.split("data: ", 1)[1]) for frame in frames]
+        assert [event["stage"] for event in events] == ["failed"]
+        assert "boom" in events[0]["detail"]
+
+    def test_disconnected_client_ends_stream(self):
+        assert self._frames("510", disconnected=True) == []
+        assert "510" not in main.progress_broker._subscribers  # 구독이 정리된다
+
+
+class TestAnalyzeSectionStream:
+    @staticmethod
+    def _lines(response) -> list[dict]:
+        async def collect() -> list[bytes]:
+            return [chunk async for chunk in response.body_iterator]
+
+        return [json.loads(line) for line in asyncio.run(collect())]
+
+    def test_sections_arrive_in_order_and_match_analyze(self, write_chatlog, post_analyze):
+        write_chatlog("512", LINES)
+        for keyword_series_format, keyword_section in (("dense", "keyword_series"), ("columnar", "keyword_series_columnar")):
+            payload = AnalyzeRequest(
+                source=SourceConfig(vod_id="512"), keywords=["ㅋㅋ", "헉"], keyword_series_format=keyword_series_format
+            )
+            expected = post_analyze(payload).json()
+            analysis_result_cache.clear()
+
+            lines = self._lines(main.analyze_stream(payload))
+            assert [line["section"] for line in lines] == [
+                "summary",
+                "volume_series",
+                "highlights",
+                keyword_section,
+                "parse_errors",
+                "message",
+            ]
+            assert {"keyword_series": [], **{line["section"]: line["data"] for line in lines}} == expected
+            # 스트림이 끝나면 결과 캐시에 저장되고, 캐시에서 보낼 때도 같은 순서/내용
+            assert self._lines(main.analyze_stream(payload)) == lines
+            assert analysis_result_cache.hits >= 1
+
+    def test_validation_error_is_raised_before_streaming(self, write_chatlog):
+        write_chatlog("513", LINES)
+        payload = AnalyzeRequest(
+            source=SourceConfig(vod_id="513"), keywords=["ㅋ("], options={"keyword_options": {"mode": "regex"}}
+        )
+        with pytest.raises(HTTPException) as excinfo:
+            main.analyze_stream(payload)
+        assert excinfo.value.status_code == 400
+
+
+class TestSearch:
+    def test_search_counts_terms_per_bucket(self, write_chatlog):
+        write_chatlog("502", LINES)
+        payload = SearchRequest(source=SourceConfig(vod_id="502"), terms=["ㅋㅋ", "헉"], include_occurrences=True)
+
+        response = main.search(payload)
+
+        assert response.message == "ok"
+        assert [(result.term, result.total_count) for result in response.results] == [("ㅋㅋ", 2), ("헉", 1)]
+        assert [point.count for point in response.results[0].buckets] == [2]
+        assert [occurrence.offset_sec for occurrence in response.results[1].occurrences] == [40]
+
+    def test_blank_term_is_rejected(self, write_chatlog):
+        write_chatlog("503", LINES)
+        with pytest.raises(HTTPException) as excinfo:
+            main.search(SearchRequest(source=SourceConfig(vod_id="503"), terms=["  "]))
+        assert excinfo.value.status_code == 400
+
+
+class TestMessages:
+    def test_window_is_paginated_with_cursor(self, write_chatlog):
+        write_chatlog("516", LINES)
+        request = {"source": SourceConfig(vod_id="516"), "start_offset_sec": 1, "end_offset_sec": 40, "limit": 1}
+
+        first = main.list_messages(MessagesRequest(**request))
+        assert first.total == 2
+        assert [(item.offset_sec, item.nickname, item.content) for item in first.messages] == [(1, "a", "ㅋㅋㅋ")]
+        assert first.next_cursor == 1
+        assert len(first.parse_errors) == 1
+
+        second = main.list_messages(MessagesRequest(**request, cursor=first.next_cursor))
+        assert [item.nickname for item in second.messages] == ["c"]
+        assert second.next_cursor is None
+
+    def test_stream_sends_window_from_cursor(self, write_chatlog):
+        write_chatlog("517", LINES)
+        response = main.stream_messages(MessagesRequest(source=SourceConfig(vod_id="517"), start_offset_sec=2, limit=1))
+
+        async def collect() -> bytes:
+            return b"".join([chunk async for chunk in response.body_iterator])
+
+        lines = [json.loads(line) for line in asyncio.run(collect()).splitlines()]
+        assert response.headers["x-total-count"] == "2"
+        assert [(line["offset_label"], line["nickname"]) for line in lines] == [("00:00:02", "c"), ("00:00:40", "b")]
+
+
+class TestAnalyzeBatch:
+    def _run(self, requests, monkeypatch):
+        manager = self.manager = AnalysisJobManager(max_workers=2)
+        monkeypatch.setattr(main, "analysis_jobs", manager)
+        try:
+            return [json.loads(line) for line in main._iter_batch_results(requests)]
+        finally:
+            manager.shutdown()
+
+    def test_batch_results_match_single_analyze(self, write_chatlog, post_analyze, monkeypatch):
+        write_chatlog("510", LINES)
+        write_chatlog("511", LINES[:2])
+        requests = [
+            AnalyzeRequest(source=SourceConfig(vod_id="510"), keywords=["ㅋㅋ"]),
+            AnalyzeRequest(source=SourceConfig(vod_id="511"), keywords=["헉"]),
+        ]
+        expected = {item.source.vod_id: post_analyze(item).json() for item in requests}
+        hits = analysis_result_cache.hits
+
+        lines = self._run(requests, monkeypatch)
+
+        assert sorted(line["index"] for line in lines) == [0, 1]
+        for line in lines:
+            assert line["status"] == 200
+            assert line["result"] == expected[line["vod_id"]]
+        # 같은 프로세스의 결과 캐시를 쓰고, 끝나면 로그 고정을 모두 푼다
+        assert analysis_result_cache.hits == hits + 2
+        assert not chatlog_cache._pinned_logs
+
+    def test_batch_analyzes_in_processes_and_fills_parent_caches(self, write_chatlog, post_analyze, monkeypatch):
+        path = write_chatlog("514", LINES)
+        request = AnalyzeRequest(source=SourceConfig(vod_id="514"), keywords=["ㅋㅋ"])
+
+        (line,) = self._run([request], monkeypatch)
+
+        # 대기열 스레드는 쓰지 않고, 부모가 워커 결과로 사이드카/파싱 결과 LRU/결과 캐시를 채운다
+        assert self.manager._executor is None
+        assert line["status"] == 200
+        assert path.with_suffix(".parsed").exists()
+        assert parser.parsed_log_cache.contains("514", parser.log_fingerprint(path))
+        hits = analysis_result_cache.hits
+        assert post_analyze(request).json() == line["result"]
+        assert analysis_result_cache.hits == hits + 1
+
+        analysis_result_cache.clear()
+        parser.parsed_log_cache.clear()
+        path.with_suffix(".parsed").unlink()
+        assert post_analyze(request).json() == line["result"]
+
+    def test_fetch_failure_is_reported_per_item(self, write_chatlog, monkeypatch):
+        write_chatlog("512", LINES)
+
+        def fail_fetch(vod_id, destination):
+            raise RuntimeError("429")
+
+        monkeypatch.setattr(parser, "fetch_chatlog_to_file", fail_fetch)
+        lines = self._run(
+            [
+                AnalyzeRequest(source=SourceConfig(vod_id="513")),
+                AnalyzeRequest(source=SourceConfig(vod_id="512")),
+            ],
+            monkeypatch,
+        )
+
+        by_vod = {line["vod_id"]: line for line in lines}
+        assert by_vod["513"]["status"] == 502
+        assert "auto_fetch_failed" in by_vod["513"]["detail"]
+        assert by_vod["512"]["status"] == 200
+        assert not chatlog_cache._pinned_logs
+
+
+class TestSweep:
+    def test_sweep_returns_one_row_per_combination(self, write_chatlog, analyze_api):
+        write_chatlog("520", LINES)
+        payload = SweepRequest(
+            source=SourceConfig(vod_id="520"),
+            keywords=["ㅋㅋ"],
+            bucket_sizes_seconds=[5, 30],
+            min_highlight_scores=[0.1, 5.0],
+            max_merge_buckets=[1],
+        )
+
+        response = main.sweep(payload)
+
+        assert response.total_messages == 3
+        assert [(row.bucket_size_seconds, row.min_highlight_score) for row in response.combinations] == [
+            (5, 0.1),
+            (5, 5.0),
+            (30, 0.1),
+            (30, 5.0),
+        ]
+        expected = analyze_api(
+            AnalyzeRequest(
+                source=SourceConfig(vod_id="520"),
+                keywords=["ㅋㅋ"],
+                options={"bucket_size_seconds": 30, "min_highlight_score": 0.1, "max_merge_buckets": 1},
+            )
+        ).highlights
+        assert [row.start_offset_sec for row in response.combinations[2].highlights] == [
+            item.start_offset_sec for item in expected
+        ]
+
+    def test_grid_size_is_limited(self):
+        with pytest.raises(ValidationError):
+            SweepRequest(
+                source=SourceConfig(vod_id="521"),
+                bucket_sizes_seconds=list(range(5, 25)),
+                min_highlight_scores=[float(value) for value in range(50)],
+                max_merge_buckets=[1, 2, 3],
+            )
+
+
+class TestRegexKeywords:
+    def test_invalid_pattern_is_400(self, write_chatlog, post_analyze):
+        write_chatlog("530", LINES)
+        payload = AnalyzeRequest(
+            source=SourceConfig(vod_id="530"), keywords=["(ㅋ", "헉"], options={"keyword_options": {"mode": "regex"}}
+        )
+        response = post_analyze(payload)
+        assert response.status_code == 400
+        assert "invalid regex keyword" in response.json()["detail"]
+
+    def test_regex_keywords_are_counted(self, write_chatlog, analyze_api):
+        write_chatlog("531", LINES)
+        payload = AnalyzeRequest(
+            source=SourceConfig(vod_id="531"), keywords=["ㅋ{2,}", "헉|허+억"], options={"keyword_options": {"mode": "regex"}}
+        )
+
+        response = analyze_api(payload)
+
+        totals = {}
+        for point in response.keyword_series:
+            totals[point.keyword] = totals.get(point.keyword, 0) + point.count
+        assert totals == {"ㅋ{2,}": 2, "헉|허+억": 1}
+
+
+class TestKeywordSeriesFormat:
+    def test_default_response_shape_is_unchanged(self, write_chatlog, post_analyze):
+        write_chatlog("540", LINES)
+        body = post_analyze(AnalyzeRequest(source=SourceConfig(vod_id="540"), keywords=["ㅋㅋ"])).json()
+
+        assert set(body) == {"summary", "volume_series", "keyword_series", "highlights", "parse_errors", "message"}
+        assert len(body["keyword_series"]) == len(body["volume_series"])
+
+    def test_columnar_response_replaces_keyword_series(self, write_chatlog, post_analyze):
+        write_chatlog("541", LINES)
+        body = post_analyze(
+            AnalyzeRequest(source=SourceConfig(vod_id="541"), keywords=["ㅋㅋ", "헉"], keyword_series_format="columnar")
+        ).json()
+
+        assert body["keyword_series"] == []
+        assert "keyword_series_sparse" not in body
+        assert body["keyword_series_columnar"] == {"keywords": ["ㅋㅋ", "헉"], "counts": [[2, 0], [0, 1]]}
+
+
+class TestTrendingTerms:
+    def test_highlights_carry_trending_terms_only_when_requested(self, write_chatlog, post_analyze):
+        write_chatlog("545", LINES)
+        source = SourceConfig(vod_id="545")
+        options = {"bucket_size_seconds": 10, "min_highlight_score": 0}
+
+        default = post_analyze(AnalyzeRequest(source=source, options=options)).json()
+        assert default["highlights"] and all("trending_terms" not in item for item in default["highlights"])
+
+        body = post_analyze(AnalyzeRequest(source=source, options={**options, "trending_terms": 3})).json()
+        assert all(isinstance(item["trending_terms"], list) for item in body["highlights"])
@@ -0,0 +1,108 @@
+"""tests/test_parsed_cache.py
+
+파싱 결과 메모리 LRU(parsed_cache) 의 적중/무효화/바이트 기반 축출을 검증한다.
+"""
+
+from __future__ import annotations
+
+from app.chatlog_cache import pin_log, prune_cache, unpin_log
+from app.message_store import MessageStore
+from app.parsed_cache import ParsedLogCache, parsed_log_cache
+from app.parser import parse_chat_logs
+from app.schemas import SourceConfig
+from app.token_index import wait_for_token_index_builds
+
+
+LINES = [
+    "[1970-01-01 00:00:01] a: ㅋㅋㅋ (u1)",
+    "[1970-01-01 00:00:02] b: 헉 (u2)",
+]
+
+
+class TestParsedLogCache:
+    def test_second_parse_hits_memory(self, write_chatlog):
+        write_chatlog("600", LINES)
+        first, _ = parse_chat_logs(SourceConfig(vod_id="600"))
+        hits = parsed_log_cache.hits
+
+        second, _ = parse_chat_logs(SourceConfig(vod_id="600"))
+
+        assert second is first
+        assert parsed_log_cache.hits == hits + 1
+
+    def test_refetched_log_is_a_miss(self, write_chatlog):
+        write_chatlog("601", LINES)
+        first, _ = parse_chat_logs(SourceConfig(vod_id="601"))
+
+        write_chatlog("601", LINES + ["[1970-01-01 00:00:03] c: 와 (u3)"])
+        second, _ = parse_chat_logs(SourceConfig(vod_id="601"))
+
+        assert second is not first
+        assert len(second) == 3
+
+    def test_prune_invalidates_entry(self, write_chatlog):
+        write_chatlog("602", LINES)
+        parse_chat_logs(SourceConfig(vod_id="602"))
+        for index in range(5):
+            write_chatlog(f"603{index}", LINES)
+
+        prune_cache(max_files=0)
+
+        assert "602" not in parsed_log_cache._entries
+
+    def test_prune_keeps_pinned_log(self, write_chatlog):
+        path = write_chatlog("604", LINES)
+        parse_chat_logs(SourceConfig(vod_id="604"))
+
+        pin_log(path)
+        try:
+            prune_cache(max_files=0)
+        finally:
+            unpin_log(path)
+
+        assert path.exists()
+        assert "604" in parsed_log_cache._entries
+        prune_cache(max_files=0)
+        assert not path.exists()
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        store = MessageStore.empty()
+        cache = ParsedLogCache(max_bytes=store.nbytes * 2)
+        cache.put("a", "fp", store, [])
+        cache.put("b", "fp", store, [])
+        assert cache.get("a", "fp") is not None  # a 를 최근 사용으로
+
+        cache.put("c", "fp", store, [])
+
+        assert cache.get("b", "fp") is None
+        assert cache.get("a", "fp") is not None
+        assert cache.evictions == 1
+
+
+    def test_derived_columns_are_charged_to_budget(self, write_chatlog):
+        from app.analyzer import build_analysis
+        from app.schemas import AnalyzeOptions
+
+        write_chatlog("605", LINES * 50)
+        write_chatlog("606", LINES)
+        first, _ = parse_chat_logs(SourceConfig(vod_id="605"))
+        second, _ = parse_chat_logs(SourceConfig(vod_id="606"))
+        wait_for_token_index_builds()
+        cache = ParsedLogCache(max_bytes=first.nbytes + second.nbytes + 64 * 1024)
+        cache.put("605", "fp", first, [])
+        cache.put("606", "fp", second, [])
+
+        # 분석이 쌓은 파생 열만큼 예산이 다시 과금된다
+        before = second.nbytes
+        build_analysis(second, ["ㅋㅋ"], AnalyzeOptions())
+        assert second.nbytes > before
+        assert cache._total_bytes == first.nbytes + second.nbytes
+
+        # 남은 예산을 조금 넘는 열을 붙이면 오래된 항목이 축출된다
+        slack = cache.max_bytes - cache._total_bytes
+        second.derived[("test_column",)] = "x" * slack
+        assert cache.get("605", "fp") is None
+        assert cache._total_bytes == second.nbytes
+
+        del second.derived[("test_column",)]
+        assert cache._total_bytes == second.nbytes
@@ -0,0 +1,220 @@
+"""tests/test_parser.py
+
+parser.parse_chat_logs 가 채팅 로그를 MessageStore 로 올바르게 적재하는지 검증한다.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from app.message_store import MessageStore
+from app.parser import parse_chat_logs
+from app.schemas import ChatMessage, SourceConfig
+
+
+SAMPLE_LINES = [
+    "[1970-01-01 00:00:12] 시청자A: ㅋㅋㅋㅋ 미쳤다 (hash-a)",
+    "[1970-01-01 00:00:05]   : 와 (hash-b)",
+    "잘못된 줄",
+    "[1970-13-01 00:00:00] 시청자C: 월 오류 (hash-c)",
+    "[1970-01-01 00:00:05] 시청자A: 헉 (hash-a)",
+]
+
+
+class TestParseChatLogs:
+    def test_messages_sorted_with_interned_users(self, write_chatlog):
+        write_chatlog("100", SAMPLE_LINES)
+        messages, _ = parse_chat_logs(SourceConfig(vod_id="100"))
+
+        assert isinstance(messages, MessageStore)
+        assert len(messages) == 3
+        # 같은 초의 메시지는 원래 순서를 유지 (안정 정렬)
+        assert list(messages.offsets) == [5, 5, 12]
+        assert list(messages.iter_contents()) == ["와", "헉", "ㅋㅋㅋㅋ 미쳤다"]
+        assert messages.nickname(0) == "Unknown"
+        assert messages.user_count == 2
+        assert messages.user_codes[1] == messages.user_codes[2]
+
+    def test_parse_errors_keep_line_numbers(self, write_chatlog):
+        path = write_chatlog("101", SAMPLE_LINES)
+        _, parse_errors = parse_chat_logs(SourceConfig(vod_id="101"))
+
+        assert [(item.line_number, item.reason) for item in parse_errors] == [
+            (3, "invalid_format"),
+            (4, "invalid_timestamp"),
+        ]
+        assert parse_errors[0].file_path == str(path)
+        assert parse_errors[1].raw_line == SAMPLE_LINES[3]
+
+    def test_timestamps_outside_int32_range_are_kept(self, write_chatlog):
+        from app.chatlog_sidecar import load_sidecar
+        from app.chatlog_cache import log_fingerprint
+
+        lines = [
+            "[2040-03-01 10:00:00] 미래: 2038 이후 (hash-a)",
+            "[1850-01-01 00:00:00] 과거: 1901 이전 (hash-b)",
+        ]
+        path = write_chatlog("102", lines)
+        messages, parse_errors = parse_chat_logs(SourceConfig(vod_id="102"))
+
+        assert parse_errors == []
+        assert [message.timestamp for message in messages.to_chat_messages()] == [
+            datetime(1850, 1, 1),
+            datetime(2040, 3, 1, 10),
+        ]
+        # 사이드카도 같은 값을 되돌린다
+        reloaded, _ = load_sidecar(path, log_fingerprint(path))
+        assert list(reloaded.offsets) == list(messages.offsets)
+
+
+class TestMessageStore:
+    def test_round_trip_chat_messages(self):
+        original = [
+            ChatMessage(timestamp=datetime(2024, 5, 1, 12, 0, 3), nickname="b", content="둘", user_id_hash="u2"),
+            ChatMessage(timestamp=datetime(2024, 5, 1, 12, 0, 1), nickname="a", content="", user_id_hash="u1"),
+        ]
+        store = MessageStore.from_chat_messages(original)
+
+        assert store.to_chat_messages() == [original[1], original[0]]
+        assert store.content(0) == ""
+        assert store.timestamp(1) == datetime(2024, 5, 1, 12, 0, 3)
+
+
+class TestParsedSidecar:
+    def test_sidecar_reused_with_identical_result(self, write_chatlog, monkeypatch):
+        from app import parser
+
+        path = write_chatlog("200", SAMPLE_LINES)
+        first_messages, first_errors = parse_chat_logs(SourceConfig(vod_id="200"))
+        assert path.with_suffix(".parsed").exists()
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("sidecar 가 유효하면 재파싱하지 않아야 한다")
+
+        monkeypatch.setattr(parser, "_parse_lines", _fail)
+        parser.parsed_log_cache.clear()  # 메모리 LRU 가 아닌 사이드카 경로를 검증
+        messages, parse_errors = parse_chat_logs(SourceConfig(vod_id="200"))
+
+        assert messages.to_chat_messages() == first_messages.to_chat_messages()
+        assert parse_errors == first_errors
+
+    def test_sidecar_invalidated_when_log_changes(self, write_chatlog):
+        write_chatlog("201", SAMPLE_LINES)
+        parse_chat_logs(SourceConfig(vod_id="201"))
+
+        write_chatlog("201", SAMPLE_LINES + ["[1970-01-01 00:01:00] 시청자D: 추가 (hash-d)"])
+        messages, _ = parse_chat_logs(SourceConfig(vod_id="201"))
+
+        assert len(messages) == 4
+        assert messages.content(3) == "추가"
+
+    def test_corrupted_sidecar_falls_back_to_parse(self, write_chatlog):
+        path = write_chatlog("202", SAMPLE_LINES)
+        path.with_suffix(".parsed").write_bytes(b"garbage")
+
+        messages, parse_errors = parse_chat_logs(SourceConfig(vod_id="202"))
+
+        assert len(messages) == 3
+        assert len(parse_errors) == 2
+
+
+class TestParallelParse:
+    def test_parallel_matches_serial_with_global_line_numbers(self, write_chatlog, monkeypatch):
+        from app import parser
+
+        lines = [
+            f"[1970-01-01 00:{index // 60 % 60:02d}:{index % 60:02d}] 시청자{index % 7}: 메시지 {index} ㅋㅋ (hash-{index % 7})"
+            for index in range(400)
+        ]
+        lines[17] = "잘못된 줄"
+        lines[250] = "[1970-01-01 25:00:00] 시청자: 시각 오류 (hash-x)"
+        lines[399] = "[1970-01-01 00:00:00] 늦은 시청자: 정렬 필요 (hash-late)"
+        path = write_chatlog("300", lines)
+        # CRLF 줄바꿈도 직렬 경로와 같게 처리되어야 한다
+        path.write_bytes(path.read_bytes().replace(b"\n", b"\r\n"))
+
+        serial_messages, serial_errors = parser._parse_log_file(path, "300")
+        path.with_suffix(".parsed").unlink()
+        parser.parsed_log_cache.invalidate("300")
+
+        monkeypatch.setattr(parser, "PARALLEL_PARSE_MIN_BYTES", 0)
+        monkeypatch.setattr(parser, "_PARALLEL_CHUNK_MIN_BYTES", 1024)
+        monkeypatch.setattr(parser.os, "cpu_count", lambda: 4)
+        assert len(parser._split_line_aligned(path, 4)) == 4
+        parallel_messages, parallel_errors = parser._parse_log_file(path, "300")
+
+        assert parallel_messages.to_chat_messages() == serial_messages.to_chat_messages()
+        assert [(item.line_number, item.reason) for item in parallel_errors] == [
+            (18, "invalid_format"),
+            (251, "invalid_timestamp"),
+        ]
+        assert parallel_errors == serial_errors
+
+
+class TestStreamingRecords:
+    def test_reorder_buffer_matches_stable_sort(self):
+        from app.parser import _ordered_records
+
+        records = [(offset, f"n{index}", "", "u") for index, offset in enumerate([3, 1, 2, 2, 5, 4, 6])]
+        ordered = list(_ordered_records(records, buffer_size=2))
+
+        assert ordered == sorted(records, key=lambda record: record[0])
+
+    def test_disorder_beyond_buffer_raises(self):
+        import pytest
+
+        from app.parser import UnorderedLogError, _ordered_records
+
+        records = [(offset, "n", "", "u") for offset in [5, 6, 7, 8, 1]]
+        with pytest.raises(UnorderedLogError):
+            list(_ordered_records(records, buffer_size=2))
+
+    def test_iter_chat_records_collects_parse_errors(self, write_chatlog):
+        from app.parser import iter_chat_records
+
+        write_chatlog("400", SAMPLE_LINES)
+        parse_errors = []
+        records = list(iter_chat_records(SourceConfig(vod_id="400"), parse_errors))
+
+        assert [record[0] for record in records] == [5, 5, 12]
+        assert [item.line_number for item in parse_errors] == [3, 4]
+
+    def test_full_pass_stores_same_result_as_parse(self, write_chatlog):
+        from app import parser
+
+        path = write_chatlog("401", SAMPLE_LINES)
+        list(parser.iter_chat_records(SourceConfig(vod_id="401"), []))
+        assert path.with_suffix(".parsed").exists()
+        streamed_messages, streamed_errors = parse_chat_logs(SourceConfig(vod_id="401"))  # 사이드카
+
+        path.with_suffix(".parsed").unlink()
+        parser.parsed_log_cache.clear()
+        messages, parse_errors = parse_chat_logs(SourceConfig(vod_id="401"))
+
+        assert streamed_messages.to_chat_messages() == messages.to_chat_messages()
+        assert streamed_errors == parse_errors
+
+    def test_streaming_writes_sidecar_without_building_store(self, write_chatlog, monkeypatch):
+        from app import chatlog_sidecar, parser
+
+        path = write_chatlog("402", SAMPLE_LINES * 3)
+        # 여러 번 나눠 흘려 써도 한 번에 쓴 사이드카와 같은 내용이어야 한다
+        with monkeypatch.context() as patch:
+            patch.setattr(chatlog_sidecar, "_WRITER_FLUSH_RECORDS", 2)
+            patch.setattr(parser, "MessageStoreBuilder", None)
+            list(parser.iter_chat_records(SourceConfig(vod_id="402"), []))
+        assert not parser.parsed_log_cache.contains("402", parser.log_fingerprint(path))
+
+        # 유효한 사이드카는 header 만 보고 판단한다
+        with monkeypatch.context() as patch:
+            patch.setattr(parser, "STREAMING_PARSE_MIN_BYTES", 0)
+            patch.setattr(parser, "load_sidecar", None)
+            assert not parser.prefers_streaming(SourceConfig(vod_id="402"))
+
+        streamed_messages, streamed_errors = parse_chat_logs(SourceConfig(vod_id="402"))
+        path.with_suffix(".parsed").unlink()
+        parser.parsed_log_cache.clear()
+        messages, parse_errors = parse_chat_logs(SourceConfig(vod_id="402"))
+
+        assert streamed_messages.to_chat_messages() == messages.to_chat_messages()
+        assert streamed_errors == parse_errors
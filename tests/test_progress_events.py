@@ -0,0 +1,77 @@
+"""tests/test_progress_events.py
+
+진행 이벤트 broker 의 재전송/종료 이벤트 처리, 느린 구독자 큐의 오래된 이벤트 버리기,
+단계 전환 시 수집 값 이어 쓰기를 검증한다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from app import progress_events
+from app.progress_events import ProgressBroker
+from app.schemas import ProgressEvent
+
+
+def _drain(subscription) -> list[ProgressEvent]:
+    events = []
+    while not subscription.empty():
+        events.append(subscription.get_nowait())
+    return events
+
+
+class TestProgressBroker:
+    def test_new_subscriber_gets_latest_unfinished_event(self):
+        broker = ProgressBroker()
+        broker.publish(ProgressEvent(vod_id="1", stage="fetch", pages=3))
+        assert [event.pages for event in _drain(broker.subscribe("1"))] == [3]
+
+        # 끝난 작업의 done 은 다시 보내지 않는다
+        broker.publish(ProgressEvent(vod_id="1", stage="done"))
+        assert _drain(broker.subscribe("1")) == []
+        assert broker.latest("1").stage == "done"
+
+    def test_full_queue_drops_oldest(self, monkeypatch):
+        monkeypatch.setattr(progress_events, "SUBSCRIBER_QUEUE_SIZE", 2)
+        broker = ProgressBroker()
+        subscription = broker.subscribe("2")
+        for pages in range(5):
+            broker.publish(ProgressEvent(vod_id="2", stage="fetch", pages=pages))
+        assert [event.pages for event in _drain(subscription)] == [3, 4]
+
+        broker.unsubscribe("2", subscription)
+        broker.publish(ProgressEvent(vod_id="2", stage="fetch", pages=5))
+        assert subscription.empty()
+
+    def test_async_subscriber_receives_events_from_other_thread(self):
+        broker = ProgressBroker()
+
+        async def receive() -> list[int]:
+            subscription = broker.subscribe_async("4")
+            publisher = threading.Thread(
+                target=lambda: [broker.publish(ProgressEvent(vod_id="4", stage="fetch", pages=n)) for n in (1, 2)]
+            )
+            publisher.start()
+            events = [await asyncio.wait_for(subscription.get(), timeout=5) for _ in range(2)]
+            publisher.join()
+            broker.unsubscribe("4", subscription)
+            return [event.pages for event in events]
+
+        assert asyncio.run(receive()) == [1, 2]
+
+
+class TestPublishProgress:
+    def test_stage_change_carries_fetch_values_until_terminal(self, monkeypatch):
+        broker = ProgressBroker()
+        monkeypatch.setattr(progress_events, "progress_broker", broker)
+
+        progress_events.publish_progress("3", "fetch", pages=2, messages=40, duration_sec=100)
+        progress_events.publish_progress("3", "parse")
+        parsed = broker.latest("3")
+        assert (parsed.stage, parsed.pages, parsed.messages, parsed.duration_sec) == ("parse", 2, 40, 100)
+
+        progress_events.publish_progress("3", "done")
+        progress_events.publish_progress("3", "parse")
+        restarted = broker.latest("3")
+        assert (restarted.pages, restarted.messages, restarted.duration_sec) == (0, 0, None)
@@ -0,0 +1,71 @@
+"""tests/test_result_cache.py
+
+분석 결과 캐시(result_cache) 의 키 정규화, 지문 무효화, 디스크 spill 을 검증한다.
+"""
+
+from __future__ import annotations
+
+from app.result_cache import AnalysisResultCache, analysis_result_key, estimate_response_bytes
+from app.schemas import AnalyzeRequest, AnalyzeResponse, SummaryStats
+
+
+def _response(message: str) -> AnalyzeResponse:
+    summary = SummaryStats(
+        total_messages=0,
+        unique_users=0,
+        start_time=None,
+        end_time=None,
+        vod_duration_sec=0,
+        vod_duration_label="00:00:00",
+        avg_messages_per_minute=0,
+    )
+    return AnalyzeResponse(
+        summary=summary, volume_series=[], keyword_series=[], highlights=[], parse_errors=[], message=message
+    )
+
+
+class TestAnalysisResultKey:
+    def test_equivalent_requests_share_key(self):
+        explicit = AnalyzeRequest.model_validate(
+            {
+                "source": {"vod_id": "1"},
+                "keywords": ["ㅋㅋ"],
+                "options": {"max_highlights": 20, "normalize_repeated_laugh": True},
+            }
+        )
+        implicit = AnalyzeRequest.model_validate({"keywords": ["ㅋㅋ"], "source": {"vod_id": "1"}})
+
+        assert analysis_result_key(explicit, "fp") == analysis_result_key(implicit, "fp")
+        assert analysis_result_key(explicit, "fp") != analysis_result_key(explicit, "other-fp")
+        changed = implicit.model_copy(update={"keyword_series_format": "sparse"})
+        assert analysis_result_key(changed, "fp") != analysis_result_key(implicit, "fp")
+
+
+class TestAnalysisResultCache:
+    def test_evicted_entry_is_reloaded_from_disk(self, chatlog_cache_dir):
+        first, second = _response("first"), _response("second")
+        cache = AnalysisResultCache(max_bytes=estimate_response_bytes(first))
+        cache.put("700", "k1", first)
+        cache.put("700", "k2", second)
+
+        assert (chatlog_cache_dir / "chatLog-700.k1.result").exists()
+        assert cache.get("700", "k2") is second
+        reloaded = cache.get("700", "k1")
+        assert reloaded == first and reloaded is not first
+        assert cache.disk_hits == 1
+
+    def test_spill_disabled_keeps_memory_only(self, chatlog_cache_dir):
+        response = _response("ok")
+        cache = AnalysisResultCache(max_bytes=estimate_response_bytes(response), spill=False)
+        cache.put("701", "k1", response)
+        cache.put("701", "k2", response)
+
+        assert cache.get("701", "k1") is None
+        assert not list(chatlog_cache_dir.glob("*.result"))
+
+    def test_corrupted_spill_file_is_a_miss(self, chatlog_cache_dir):
+        (chatlog_cache_dir / "chatLog-702.k1.result").write_text("{broken", encoding="utf-8")
+        cache = AnalysisResultCache()
+
+        assert cache.get("702", "k1") is None
+        assert not (chatlog_cache_dir / "chatLog-702.k1.result").exists()
@@ -0,0 +1,147 @@
+"""tests/test_token_index.py
+
+역색인(token_index) 기반 검색어 집계가 본문 전체 스캔과 같은 결과를 내는지,
+디스크 저장/재사용이 지문으로 무효화되는지 검증한다.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+from datetime import datetime, timedelta
+
+from app.analyzer import _bucket_start, _normalize_content, normalized_contents, search_terms
+from app.chatlog_cache import get_chatlog_index_path, log_fingerprint
+from app.message_store import MessageStore
+from app.parser import parse_chat_logs
+from app.schemas import AnalyzeOptions, ChatMessage, KeywordOptions, SourceConfig
+from app.token_index import (
+    TokenIndex,
+    get_token_index,
+    load_token_index,
+    wait_for_token_index_builds,
+    write_token_index,
+)
+
+
+def _random_store(seed: int) -> MessageStore:
+    rng = random.Random(seed)
+    words = ["ㅋㅋㅋㅋ", "ㅎㅎ", "허어억", "GG", "gg", "와", "ㅠㅠㅠ", "레전드", "미쳤다", "와와"]
+    start = datetime(1970, 1, 1)
+    second = 0
+    messages = []
+    for _ in range(800):
+        second += rng.randint(0, 5)
+        content = " ".join(rng.choices(words, k=rng.randint(1, 4)))
+        messages.append(
+            ChatMessage(timestamp=start + timedelta(seconds=second), nickname="n", content=content, user_id_hash="u")
+        )
+    return MessageStore.from_chat_messages(messages)
+
+
+def _brute_force(store: MessageStore, term: str, options: AnalyzeOptions) -> dict[int, int]:
+    normalized_term = _normalize_content(term.strip(), options)
+    buckets: dict[int, int] = {}
+    for offset, content in zip(store.offsets, normalized_contents(store, options)):
+        if options.keyword_options.mode == "exact":
+            count = int(content == normalized_term)
+        else:
+            count = content.count(normalized_term)
+        if count:
+            bucket = _bucket_start(offset, options.bucket_size_seconds)
+            buckets[bucket] = buckets.get(bucket, 0) + count
+    return buckets
+
+
+class TestSearchTerms:
+    TERMS = ["ㅋㅋ", "gg", "GG", "와", "와와", "와 ㅋㅋ", "레전드 미쳤다", "허억", "ㅠㅠ", "없는말"]
+
+    def test_index_counts_match_full_scan(self):
+        for seed in (1, 2):
+            store = _random_store(seed)
+            for mode in ("contains", "exact"):
+                for case_sensitive in (False, True):
+                    for normalize in (True, False):
+                        options = AnalyzeOptions(
+                            bucket_size_seconds=10,
+                            keyword_options=KeywordOptions(mode=mode, case_sensitive=case_sensitive),
+                            normalize_repeated_reactions=normalize,
+                        )
+                        index = TokenIndex.build(normalized_contents(store, options))
+                        results = search_terms(store, index, self.TERMS, options)
+                        for term, result in zip(self.TERMS, results):
+                            expected = _brute_force(store, term, options)
+                            actual = {
+                                _bucket_start(point.bucket_start_offset_sec, 10): point.count
+                                for point in result.buckets
+                            }
+                            assert actual == expected, (term, mode, case_sensitive, normalize)
+                            assert result.total_count == sum(expected.values())
+
+    def test_occurrences_are_truncated_in_order(self):
+        store = _random_store(3)
+        options = AnalyzeOptions()
+        index = TokenIndex.build(normalized_contents(store, options))
+
+        (result,) = search_terms(store, index, ["ㅋㅋ"], options, include_occurrences=True, max_occurrences=5)
+
+        assert len(result.occurrences) == 5
+        assert result.occurrences_truncated == (result.message_count > 5)
+        offsets = [occurrence.offset_sec for occurrence in result.occurrences]
+        assert offsets == sorted(offsets)
+
+
+class TestTokenLookup:
+    def test_token_id_matches_vocabulary(self):
+        index = TokenIndex.build(["와 ㅋㅋ", "ㅋㅋ 와와", "a.b ㅋ"])
+        assert [index.token_id(index.token(token_id)) for token_id in range(len(index))] == list(range(len(index)))
+        # 부분 문자열 / 정규식 특수문자는 정확 일치가 아니다
+        assert index.token_id("ㅋ") == 4
+        assert index.token_id("a.") is None
+        assert index.token_id("axb") is None
+        assert TokenIndex.build([]).token_id("와") is None
+
+
+class TestTokenIndexPersistence:
+    LINES = [
+        "[1970-01-01 00:00:01] a: ㅋㅋㅋ 와 (u1)",
+        "[1970-01-01 00:00:02] b: GG (u2)",
+    ]
+
+    def test_round_trip_and_stale_fingerprint(self, tmp_path):
+        index = TokenIndex.build(["ㅋㅋ 와", "gg", "와 와"])
+        path = tmp_path / "x.index"
+        assert write_token_index(path, "fp1", index)
+
+        loaded = load_token_index(path, "fp1")
+        assert loaded is not None
+        assert [loaded.token(i) for i in range(len(loaded))] == ["ㅋㅋ", "와", "gg"]
+        assert list(loaded.postings_of(1)) == [0, 2, 2]
+        assert load_token_index(path, "fp2") is None
+
+    def test_index_is_reused_from_disk(self, write_chatlog, caplog):
+        log_path = write_chatlog("700", self.LINES)
+        options = AnalyzeOptions()
+        messages, _ = parse_chat_logs(SourceConfig(vod_id="700"))
+        wait_for_token_index_builds()
+
+        get_token_index(messages, log_path, False, True, lambda: normalized_contents(messages, options))
+        index_path = get_chatlog_index_path(log_path, False, True)
+        assert load_token_index(index_path, log_fingerprint(log_path)) is not None
+
+        messages.derived.clear()
+        with caplog.at_level(logging.INFO, logger="app.token_index"):
+            get_token_index(messages, log_path, False, True, lambda: [])
+        assert "Token index hit (disk)" in caplog.text
+
+    def test_parse_prebuilds_default_search_index(self, write_chatlog, caplog):
+        log_path = write_chatlog("701", self.LINES)
+        messages, _ = parse_chat_logs(SourceConfig(vod_id="701"))
+        wait_for_token_index_builds()
+
+        # 사이드카와 함께 기본 검색 옵션의 역색인이 디스크와 저장소(LRU 과금 대상)에 준비된다
+        index_path = get_chatlog_index_path(log_path, False, True)
+        assert load_token_index(index_path, log_fingerprint(log_path)) is not None
+        with caplog.at_level(logging.INFO, logger="app.token_index"):
+            get_token_index(messages, log_path, False, True, lambda: [])
+        assert "Token index hit (memory)" in caplog.text
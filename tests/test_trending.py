@@ -0,0 +1,75 @@
+"""tests/test_trending.py
+
+Space-Saving / Count-Min 요약의 오차 보장과 버킷별 떠오르는 단어 선정을 검증한다.
+"""
+
+from __future__ import annotations
+
+import random
+from collections import Counter
+
+from app.trending import CountMinSketch, SpaceSaving, TrendingTracker, merge_trending
+
+
+def _zipf_stream(seed: int, length: int, vocabulary: int) -> list[str]:
+    rng = random.Random(seed)
+    words = [f"w{index}" for index in range(vocabulary)]
+    weights = [1 / (rank + 1) for rank in range(vocabulary)]
+    return rng.choices(words, weights=weights, k=length)
+
+
+class TestSpaceSaving:
+    def test_bounds_hold_against_exact_counts(self):
+        stream = _zipf_stream(1, 5000, 500)
+        exact = Counter(stream)
+        summary = SpaceSaving(32)
+        for item in stream:
+            summary.add(item)
+
+        items = summary.items()
+        assert len(items) == 32
+        for item, count, error in items:
+            assert count - error <= exact[item] <= count
+        # 전체/capacity 보다 많이 나온 항목은 반드시 남는다
+        kept = {item for item, _, _ in items}
+        assert {item for item, count in exact.items() if count > len(stream) / 32} <= kept
+
+    def test_exact_while_under_capacity(self):
+        summary = SpaceSaving(8)
+        for item in "abacab":
+            summary.add(item)
+        assert sorted(summary.items()) == [("a", 3, 0), ("b", 2, 0), ("c", 1, 0)]
+
+
+class TestCountMinSketch:
+    def test_estimate_never_undercounts(self):
+        stream = _zipf_stream(2, 20000, 3000)
+        sketch = CountMinSketch(width=256, depth=4)
+        for item in stream:
+            sketch.add(item)
+        for item, count in Counter(stream).items():
+            assert sketch.estimate(item) >= count
+        assert sketch.estimate("없는토큰") >= 0
+
+
+class TestTrendingTracker:
+    def test_burst_token_trends_in_its_bucket(self):
+        tracker = TrendingTracker(top_k=2)
+        for _ in range(3):
+            for _ in range(50):
+                tracker.add("안녕 ㅋㅋ")
+            assert all(term != "레전드" for term, _, _ in tracker.close_bucket(50))
+
+        for _ in range(40):
+            tracker.add("레전드 레전드 ㅋㅋ")
+        for _ in range(10):
+            tracker.add("안녕")
+        terms = tracker.close_bucket(50)
+        # 한 메시지 안의 반복은 한 번만 센다
+        assert terms[0][:2] == ("레전드", 40)
+        assert len(terms) <= 2
+
+    def test_merge_sums_counts_and_keeps_max_score(self):
+        merged = merge_trending([[("와", 3, 1.5), ("gg", 2, 0.5)], [("와", 4, 0.7)]], top_k=5)
+        assert merged == [("와", 7, 1.5), ("gg", 2, 0.5)]
+        assert merge_trending([[("와", 3, 1.5), ("gg", 2, 0.5)]], top_k=1) == [("와", 3, 1.5)]